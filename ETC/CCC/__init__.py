@@ -1,3 +1,29 @@
 #
-from ETC.CCC.compute_CCC import compute, get_params
-from ETC.CCC.simulate_AR import coupled_AR
+from importlib import import_module
+
+from ETC import _submodule
+
+# Public name -> (module, attribute) from which it is loaded on first access
+_LAZY = {
+    "compute": ("ETC.CCC.compute_CCC", "compute"),
+    "get_params": ("ETC.CCC.compute_CCC", "get_params"),
+    "coupled_AR": ("ETC.CCC.simulate_AR", "coupled_AR"),
+    "coupled_AR_batch": ("ETC.CCC.simulate_AR", "coupled_AR_batch"),
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    # Anything else is loaded as a module of this package, e.g. CCC.simulate_AR
+    if name not in _LAZY:
+        return _submodule(__name__, name)
+
+    module, attribute = _LAZY[name]
+    value = getattr(import_module(module), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
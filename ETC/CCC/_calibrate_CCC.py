@@ -12,11 +12,7 @@ from itertools import product
 from functools import partial
 from multiprocessing import Pool
 from time import perf_counter
-from matplotlib import pyplot as plt
 import pandas as pd
-import seaborn as sns
-
-sns.set()
 
 get1D = partial(compute_1D, order=2, verbose=False, truncate=True)
 get2D = partial(compute_2D, order=2, verbose=False, truncate=True)
@@ -200,6 +196,11 @@ def test_multiple_parallel(seq_x, seq_y):
 
 
 # %%
+# from matplotlib import pyplot as plt
+# import seaborn as sns
+
+# sns.set()
+
 # fig, ax = plt.subplots(1,1)
 # sns.lineplot(data=a2, x='past_win_size', y='ETC_1D_X_past_norm', ax=ax)
 # sns.lineplot(data=a2, x='past_win_size', y='ETC_1D_X_total_norm', ax=ax)
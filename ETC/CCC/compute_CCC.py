@@ -11,6 +11,7 @@ from functools import partial
 from ETC import compute_1D, compute_2D
 from ETC.seq.recode import partition, cast
 from ETC.seq.check import arraytype
+from ETC.seq.cache import cached
 
 import numpy as np
 import array
@@ -43,6 +44,7 @@ def get_params():
     return {"LEN_past": LEN_past, "ADD_meas": ADD_meas, "STEP_size": STEP_size}
 
 
+@cached("CCC", sequences=("seq_x", "seq_y"))
 def compute(seq_x, seq_y, LEN_past, ADD_meas, STEP_size, n_partitions=False):
     """
     Estimate the Compression-Complexity based Causality for two sequences.
@@ -105,9 +107,9 @@ def compute(seq_x, seq_y, LEN_past, ADD_meas, STEP_size, n_partitions=False):
         seq_y = cast(seq_y)
 
     # Set switch for operating differently on native vs numpy arrays
-    if type(seq_x) == np.ndarray or type(seq_y) == np.ndarray:
+    if isinstance(seq_x, np.ndarray) or isinstance(seq_y, np.ndarray):
         combine = lambda x, y: np.hstack([x, y])
-    if type(seq_x) == array.array or type(seq_y) == array.array:
+    elif isinstance(seq_x, array.array) or isinstance(seq_y, array.array):
         combine = lambda x, y: x + y
 
     # Setup variables
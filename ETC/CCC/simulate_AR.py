@@ -6,6 +6,8 @@
 @author: Pranay S. Yadav
 """
 
+from functools import lru_cache
+
 import numpy as np
 
 
@@ -74,3 +76,149 @@ def coupled_AR(length=1000, a=0.9, b=0.8, c=0.8, e=0.01, burn=100, seed=1):
         y[n] = c * y[n - 1] + noise_y[n]
 
     return {"dependent": x, "independent": y}
+
+
+def coupled_AR_batch(
+    realisations,
+    length=1000,
+    a=0.9,
+    b=0.8,
+    c=0.8,
+    e=0.01,
+    burn=100,
+    seed=1,
+    legacy=False,
+):
+    """
+    Generate many realisations of discrete-time coupled AR processes at once.
+
+    Same processes as coupled_AR, iterated by a kernel compiled with Numba on first
+    call & cached on disk. Each realisation draws its initial values & noise from its
+    own np.random.Generator, spawned from np.random.SeedSequence(seed), so that
+    streams are independent and realisation r is the same in any batch containing it.
+    Retained samples use fresh noise, unlike coupled_AR which reuses noise from the
+    start of the burn-in.
+
+    Parameters
+    ----------
+    realisations : int
+        Number of independent realisations, R.
+    length : int, optional
+        Legnth of samples drawn from the process. The default is 1000.
+    a : float or array of shape (R,), optional
+        Coefficient for dependent process, capturing dependency on its own past.
+        The default is 0.9.
+    b : float or array of shape (R,), optional
+        Coefficient for dependent process, capturing dependency on the independent
+        process - causal interaction from independent to dependent. The default is 0.8.
+    c : float or array of shape (R,), optional
+        Coefficient for independent process, capturing dependency on its own past.
+        The default is 0.8.
+    e : float or array of shape (R,), optional
+        Coefficient for uniform random noise mixture. The default is 0.01
+    burn : int, optional
+        Number of initial samples to burn. The default is 100.
+    seed: int, optional
+        Seed value for the SeedSequence of all realisations. The default is 1. None
+        seeds with fresh entropy.
+    legacy : bool, optional
+        Whether to instead draw realisation r from np.random.RandomState(seed + r),
+        exactly as coupled_AR(..., seed=seed + r) does. Slower, for reproducing
+        earlier results only. The default is False.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (R, 2, length), holding samples of the dependent process at
+        [:, 0] and of the independent process at [:, 1].
+
+    """
+    assert length >= 1, "ERROR: Length should be at least 1!"
+
+    # One contiguous value of each parameter per realisation
+    params = np.empty((4, realisations), dtype="float64")
+    params[:] = [np.broadcast_to(p, (realisations,)) for p in (a, b, c, e)]
+
+    init = np.empty((realisations, 2), dtype="float64")
+    if legacy:
+        # Same draws as coupled_AR, whose retained samples restart the noise at 0
+        noise = np.empty((realisations, 2, length + burn), dtype="float64")
+        for r in range(realisations):
+            rng = np.random.RandomState(None if seed is None else seed + r)
+            noise[r, 0] = rng.normal(0, 1, length + burn)
+            noise[r, 1] = rng.normal(0, 1, length + burn)
+            init[r] = rng.uniform(size=2)
+        offset = 0
+    else:
+        # Burn-in uses noise[:burn], retained sample n uses noise[burn + n - 1]
+        noise = np.empty((realisations, 2, length + burn - 1), dtype="float64")
+        children = np.random.SeedSequence(seed).spawn(realisations)
+        for r, child in enumerate(children):
+            rng = np.random.default_rng(child)
+            rng.random(out=init[r])
+            rng.standard_normal(out=noise[r])
+        offset = burn - 1
+
+    traj = np.empty((realisations, 2, length), dtype="float64")
+    return _kernel()(init, noise, params, burn, offset, traj)
+
+
+@lru_cache(maxsize=None)
+def _kernel():
+    """
+    Compile _iterate_batch with Numba, or load it from Numba's on-disk cache
+
+    Numba is imported here, on the first call of coupled_AR_batch, such that
+    importing this module doesn't load it.
+
+    """
+    from numba import njit
+
+    return njit(cache=True)(_iterate_batch)
+
+
+def _iterate_batch(init, noise, params, burn, offset, traj):
+    """
+    Iterate coupled AR processes for every realisation, filling traj in place.
+    Compiled by _kernel(), and runs as plain Python too.
+
+    Parameters
+    ----------
+    init : array, 2D, float64
+        Initial values of (x, y), one row per realisation.
+    noise : array, 3D, float64
+        Standard normal noise of x at [:, 0] & of y at [:, 1], one row per
+        realisation. Scaled by e as it is used.
+    params : array, 2D, float64
+        Rows of coefficients a, b, c & e, one column per realisation.
+    burn : int
+        Number of initial samples to burn, using noise[:, :, :burn].
+    offset : int
+        Retained sample n uses noise[:, :, offset + n].
+    traj : array, 3D, float64
+        Output of shape (R, 2, length).
+
+    Returns
+    -------
+    traj : array, 3D, float64
+        Populated output.
+
+    """
+    for r in range(traj.shape[0]):
+        a, b, c, e = params[0, r], params[1, r], params[2, r], params[3, r]
+
+        # Burn initial samples
+        x, y = init[r, 0], init[r, 1]
+        for n in range(burn):
+            x, y = a * x + b * y + e * noise[r, 0, n], c * y + e * noise[r, 1, n]
+
+        # Store further samples
+        traj[r, 0, 0], traj[r, 1, 0] = x, y
+        for n in range(1, traj.shape[2]):
+            x, y = (
+                a * x + b * y + e * noise[r, 0, offset + n],
+                c * y + e * noise[r, 1, offset + n],
+            )
+            traj[r, 0, n], traj[r, 1, n] = x, y
+
+    return traj
@@ -1,17 +1,22 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
+Simulators of coupled skew-tent maps.
 
+All kernels are compiled by Numba lazily, on first call, and cached on disk
+(cache=True) such that new processes load compiled code instead of recompiling.
+warmup() triggers compilation or loading of every kernel up front and can be
+passed as initializer to a multiprocessing Pool.
 
 @author: Pranay S. Yadav
 """
 
 # Import calls
 import numpy as np
-from numba import vectorize, float64, njit
+from numba import njit, prange
 
 # Compute single step of iteration through skew-tent map
-@vectorize([float64(float64, float64)])
+@njit(cache=True)
 def _skewtent_onestep(value, threshold):
     """
     Computes a single step of iteration through the skew-tent map given an
@@ -39,7 +44,7 @@ def _skewtent_onestep(value, threshold):
 
 
 # Multiple iterations along skew-tent map
-@njit
+@njit(cache=True)
 def _iterate_skewtent(threshold, traj_vec, coupling):
     """
     Computes multiple steps of iteration through the skew-tent map given a
@@ -86,7 +91,7 @@ def _iterate_skewtent(threshold, traj_vec, coupling):
 
 
 # Compute trajectory given initial conditions, threshold and size
-@njit
+@njit(cache=True)
 def _compute_trajectory(init_cond, threshold, length, coupling):
     """
     Computes the trajectory along a skew-tent map with given threshold and an
@@ -120,25 +125,53 @@ def _compute_trajectory(init_cond, threshold, length, coupling):
 
 
 # Warmup for Numba cache initialization
-def warmup():
+def warmup(verbose=True):
     """
-    Runs all the Numba-optimized functions to initialize Numba's JIT.
-    Returns nothing and only prints to stdout.
+    Runs all the Numba-optimized functions once, compiling them or loading them
+    from Numba's on-disk cache, and checks a known value. Meant to be run ahead of
+    time, e.g. once per worker process:
+        Pool(initializer=warmup, initargs=(False,))
+
+    Parameters
+    ----------
+    verbose : bool, optional
+        Whether to print the outcome to stdout. The default is True.
 
     Returns
     -------
-    None.
+    bool
+        True if the known value is reproduced.
 
     """
     initials = np.array([0.1] * 3)
     threshs = np.array([0.2] * 3)
-    couplings = np.array([0] * 2)
+    couplings = np.array([0.0] * 2)
     expected = np.array([0.625] * 3)
+
     # Test for a known value
-    if (_compute_trajectory(initials, threshs, 3, couplings)[:, -1] == expected).all():
-        print("> Numba JIT warmup successful for chaotic_sampler ...")
-    else:
-        print("> Numba JIT warmup failed for chaotic_sampler ...")
+    trajectory = _compute_trajectory(initials, threshs, 3, couplings)
+    success = bool((trajectory[:, -1] == expected).all())
+
+    # Network kernel with a single uncoupled node
+    indptr = np.zeros(2, dtype=np.int64)
+    network = _iterate_network(
+        initials[:1].reshape(1, 1),
+        threshs[:1],
+        indptr,
+        np.zeros(0, dtype=np.int64),
+        np.zeros(0, dtype=np.float64),
+        3,
+        0,
+    )
+    success = success and bool(network[0, 0, -1] == expected[0])
+
+    if verbose:
+        if success:
+            print("> Numba JIT warmup successful for chaotic_sampler ...")
+        else:
+            print("> Numba JIT warmup failed for chaotic_sampler ...")
+
+    return success
 
 
 def compute_trajectory(init_cond, threshold, length, burn, coupling):
@@ -191,3 +224,182 @@ def coupled_TM(threshold, length, burn, coupling, seed):
         "dependent_linear": trajectories[1, :],
         "dependent_nonlinear": trajectories[2, :],
     }
+
+
+# Iterate a network of coupled skew-tent maps, in parallel over realisations
+@njit(parallel=True, cache=True)
+def _iterate_network(init_cond, threshold, indptr, indices, weights, length, burn):
+    """
+    Computes trajectories of a network of coupled skew-tent maps. Each node is
+    iterated as
+        x_i[n] = T_i((1 - sum_j C_ij) * x_i[n - 1] + sum_j C_ij * x_j[n - 1])
+    with the coupling matrix C given in compressed sparse row form. Doesn't
+    validate input. This is called by coupled_TM_network after checking inputs.
+
+    Parameters
+    ----------
+    init_cond : array, 2D, float64
+        Initial values, one row per realisation and one column per node.
+    threshold : vector, float64
+        Threshold value of the skew-tent map of each node.
+    indptr : vector, int64
+        Row pointers of C: couplings into node i are at indptr[i]:indptr[i + 1].
+    indices : vector, int64
+        Source node of each coupling.
+    weights : vector, float64
+        Strength of each coupling.
+    length : scalar, integer
+        Number of samples to keep.
+    burn : scalar, integer
+        Number of initial samples to discard, including the initial condition.
+
+    Returns
+    -------
+    array, 3D, float64
+        Trajectories of shape (realisations, nodes, length).
+
+    """
+    n_real, n_nodes = init_cond.shape
+    traj = np.empty((n_real, n_nodes, length), dtype=np.float64)
+
+    # Weight of each node's own past value
+    self_weight = np.ones(n_nodes, dtype=np.float64)
+    for i in range(n_nodes):
+        for k in range(indptr[i], indptr[i + 1]):
+            self_weight[i] -= weights[k]
+
+    for r in prange(n_real):
+        prev = init_cond[r].copy()
+        curr = np.empty(n_nodes, dtype=np.float64)
+
+        # Keep the initial condition if nothing is burnt
+        if burn == 0 and length > 0:
+            traj[r, :, 0] = prev
+
+        for idx in range(1, length + burn):
+
+            # Mix own past with coupled inputs and pass through the tent map
+            for i in range(n_nodes):
+                mixed = self_weight[i] * prev[i]
+                for k in range(indptr[i], indptr[i + 1]):
+                    mixed += weights[k] * prev[indices[k]]
+                curr[i] = _skewtent_onestep(mixed, threshold[i])
+
+            prev, curr = curr, prev
+
+            if idx >= burn:
+                traj[r, :, idx - burn] = prev
+
+    return traj
+
+
+def coupled_TM_network(
+    coupling, threshold, length, burn=100, seed=None, realisations=None
+):
+    """
+    Simulate a network of coupled skew-tent maps with a known coupling matrix.
+
+    Node i is driven by node j with strength coupling[i, j]:
+        x_i[n] = T_i((1 - sum_j C_ij) * x_i[n - 1] + sum_j C_ij * x_j[n - 1])
+    where T_i is the skew-tent map with threshold[i]. This generalises the
+    nonlinear coupling of coupled_TM to M nodes, for generating ground-truth
+    networks for NCA.
+
+    Parameters
+    ----------
+    coupling : array, 2D, float64 or tuple
+        Square (M x M) matrix of non-negative coupling strengths with zero diagonal
+        and rows summing to at most 1. Sparse couplings are iterated efficiently,
+        and may be given directly in compressed sparse row form as a tuple of
+        (indptr, indices, weights), e.g. from a scipy.sparse.csr_matrix.
+    threshold : scalar or vector of size M, float64
+        Threshold value of the skew-tent map of each node.
+            range: 0 < threshold < 1
+    length : scalar, integer
+        Size of the trajectory to keep, at least 1.
+    burn : scalar, integer, optional
+        Number of initial samples to discard. The default is 100.
+    seed : int, optional
+        Seed value for the root np.random.SeedSequence, from which each realisation
+        spawns its own Generator for initial conditions. The default is None.
+    realisations : int, optional
+        Number of independent realisations, iterated in parallel. The default is
+        None, simulating a single realisation.
+
+    Returns
+    -------
+    array, 2D or 3D, float64
+        Trajectories of shape (M, length), or (realisations, M, length).
+
+    """
+    assert length >= 1, "ERROR: length must be at least 1"
+
+    # Compressed sparse row form of the coupling matrix
+    if isinstance(coupling, tuple):
+        indptr, indices, weights = coupling
+        indptr = np.asarray(indptr, dtype=np.int64)
+        indices = np.asarray(indices, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float64)
+        n_nodes = len(indptr) - 1
+
+        assert (
+            n_nodes > 0
+            and indptr[0] == 0
+            and (np.diff(indptr) >= 0).all()
+            and indptr[-1] == len(indices) == len(weights)
+        ), "ERROR: indptr must rise from 0 to the number of couplings"
+        assert (
+            (indices >= 0) & (indices < n_nodes)
+        ).all(), "ERROR: coupling indices must refer to nodes"
+
+    else:
+        coupling = np.asarray(coupling, dtype=np.float64)
+        n_nodes = coupling.shape[0]
+
+        assert (
+            coupling.ndim == 2 and coupling.shape[1] == n_nodes
+        ), "ERROR: coupling must be a square matrix"
+
+        rows, indices = np.nonzero(coupling)
+        indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n_nodes), out=indptr[1:])
+        weights = coupling[rows, indices]
+        indices = indices.astype(np.int64)
+
+    # Target node of each coupling
+    rows = np.repeat(np.arange(n_nodes), np.diff(indptr))
+
+    assert (weights >= 0).all(), "ERROR: couplings must be non-negative"
+    assert (rows != indices).all(), "ERROR: coupling diagonal must be zero"
+    assert (
+        np.bincount(rows, weights, minlength=n_nodes) <= 1 + 1e-12
+    ).all(), "ERROR: couplings into each node must sum to at most 1"
+
+    thresholds = np.broadcast_to(np.asarray(threshold, dtype=np.float64), (n_nodes,))
+    assert (
+        (thresholds > 0) & (thresholds < 1)
+    ).all(), "ERROR: thresholds must lie in (0, 1)"
+
+    # Initial conditions from an independent stream per realisation
+    n_real = 1 if realisations is None else realisations
+    init_cond = np.array(
+        [
+            np.random.default_rng(child).uniform(size=n_nodes)
+            for child in np.random.SeedSequence(seed).spawn(n_real)
+        ]
+    ).reshape(n_real, n_nodes)
+
+    traj = _iterate_network(
+        init_cond,
+        np.ascontiguousarray(thresholds),
+        indptr,
+        indices,
+        weights,
+        length,
+        burn,
+    )
+
+    if realisations is None:
+        return traj[0]
+
+    return traj
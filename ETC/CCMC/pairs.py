@@ -11,12 +11,19 @@ Three functions are exposed for application on array.array data types:
 
 Each model returns a causal direction and strength of evidence in favor of that direction
 
+Estimates from ETC_causality and LZ_causality are served from a persistent cache on
+disk when one has been enabled, see ETC.seq.cache
+
 @author: Pranay S. Yadav
 """
 # Import libraries
-import ETC
+from ETC.NSRWS import instrument
 from ETC.NSRWS.x1D import core
+from ETC.NSRWS.x1D.etc import compute as compute_1D
 from ETC.LZ76.lzc import compute_complexity as LZ
+from ETC.seq.cache import cached
+from ETC.seq.check import arraytype
+from ETC.seq.recode import cast
 
 # from entropy import lziv_complexity as LZ
 
@@ -89,7 +96,7 @@ def _external_substitution(seq, trajectory):
 
     """
     # Assign proper type
-    seq = ETC.cast(seq)
+    seq = cast(seq)
 
     # Initialize ETC to 0
     etc = 0
@@ -99,11 +106,28 @@ def _external_substitution(seq, trajectory):
 
         pair = step.get("window")
 
+        # Initialize phase timer, None if instrumentation is disabled
+        timer = instrument.start()
+
         # Substitute only if the sequence is atleast 2 symbols long
-        if len(seq) > 1 and _check_pair(tuple(pair), seq):
+        present = len(seq) > 1 and _check_pair(tuple(pair), seq)
+        if timer is not None:
+            timer = instrument.mark("CCMC", "lookup", timer)
+
+        if present:
+
+            # Get value for substitution of the pair with
+            sub_value = max(seq) + 1
+            if timer is not None:
+                timer = instrument.mark("CCMC", "maximum", timer)
 
             # Cython function call
-            seq = ETC.cast(core.substitute_pairs(seq, pair, max(seq) + 1))
+            seq = core.substitute_pairs(seq, pair, sub_value)
+            if timer is not None:
+                timer = instrument.mark("CCMC", "substitute", timer)
+            seq = cast(seq)
+            if timer is not None:
+                instrument.mark("CCMC", "cast", timer)
             etc += 1
 
         # If sequence has been fully compressed, stop
@@ -135,12 +159,13 @@ def _ETC_residual(residual_sequence):
     if len(residual_sequence) > 1:
 
         # Compress
-        return ETC.compute_1D(residual_sequence).get("ETC1D")
+        return compute_1D(residual_sequence).get("ETC1D")
 
     # Already compressed, no residual left
     return 0
 
 
+@cached("ETC_causality")
 def ETC_causality(x, y, penalty_threshold=1, efficacy_tolerance=0, lengths=True):
     """
     Causal discovery and estimation using ETC for a pair of discrete symbolic sequences
@@ -169,11 +194,11 @@ def ETC_causality(x, y, penalty_threshold=1, efficacy_tolerance=0, lengths=True)
 
     """
     # If either was not successfully converted to array, break
-    if not (ETC.check.arraytype(x) and ETC.check.arraytype(y)):
+    if not (arraytype(x) and arraytype(y)):
 
         # Convert inputs to arrays
-        x = ETC.cast(x)
-        y = ETC.cast(y)
+        x = cast(x)
+        y = cast(y)
 
         # If unsuccessful, break
         if (x is None) or (y is None):
@@ -187,8 +212,8 @@ def ETC_causality(x, y, penalty_threshold=1, efficacy_tolerance=0, lengths=True)
         result.update({"length_x": len(x), "length_y": len(y)})
 
     # Compute ETC for the 2 sequences
-    out_x = ETC.compute_1D(x, order=2, verbose=True, truncate=False)
-    out_y = ETC.compute_1D(y, order=2, verbose=True, truncate=False)
+    out_x = compute_1D(x, order=2, verbose=True, truncate=False)
+    out_y = compute_1D(y, order=2, verbose=True, truncate=False)
 
     # Store the estimates separately
     etc_x = out_x.get("ETC1D")
@@ -304,6 +329,7 @@ def ETC_causality(x, y, penalty_threshold=1, efficacy_tolerance=0, lengths=True)
 #     return seq
 
 
+@cached("LZ_causality")
 def LZ_causality(x, y, penalty_threshold=1, lengths=True):
     """
     Causal discovery and estimation using LZ for a pair of discrete symbolic sequences
@@ -331,11 +357,11 @@ def LZ_causality(x, y, penalty_threshold=1, lengths=True):
 
     """
     # If either was not successfully converted to array, break
-    if not (ETC.check.arraytype(x) and ETC.check.arraytype(y)):
+    if not (arraytype(x) and arraytype(y)):
 
         # Convert inputs to arrays
-        x = ETC.cast(x)
-        y = ETC.cast(y)
+        x = cast(x)
+        y = cast(y)
 
         # If unsuccessful, break
         if (x is None) or (y is None):
@@ -8,8 +8,10 @@
 from ETC.LZ76 import core
 from ETC.seq.recode import cast
 from ETC.seq.check import arraytype
+from ETC.seq.memo import memoize
 
 
+@memoize("LZC")
 def compute_complexity(seq):
 
     # Coerce input to appropriate array type, if not possible throw a fit & exit
@@ -1,2 +1,29 @@
 #
-from ETC.NCA.compute import compute_CCC, compute_CCM, get_causal, get_NCA
+from importlib import import_module
+
+from ETC import _submodule
+
+# Public name -> (module, attribute) from which it is loaded on first access
+_LAZY = {
+    "compute_CCC": ("ETC.NCA.compute", "compute_CCC"),
+    "compute_CCM": ("ETC.NCA.compute", "compute_CCM"),
+    "get_causal": ("ETC.NCA.compute", "get_causal"),
+    "get_NCA": ("ETC.NCA.compute", "get_NCA"),
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    # Anything else is loaded as a module of this package, e.g. NCA.compute
+    if name not in _LAZY:
+        return _submodule(__name__, name)
+
+    module, attribute = _LAZY[name]
+    value = getattr(import_module(module), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Append-only local store for checkpointing long-running NCA estimation.
+
+Completed rowpair estimates are written in batches to a SQLite database, one row per
+pair, keyed by (index_x, index_y, params_hash). Each row also holds a digest of the
+two sequences it was computed from. A run that is interrupted can be restarted with
+the same store: pairs already present with matching data are skipped and the stored
+estimates are merged back into the final output, while pairs whose data has changed
+are computed again and overwritten.
+
+@author: Pranay S. Yadav
+"""
+# Import calls
+import json
+import sqlite3
+from hashlib import blake2b
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+
+
+def _to_builtin(value):
+    """
+    Convert NumPy scalars to native Python types for JSON serialization
+
+    Parameters
+    ----------
+    value : object
+        Value that the json module could not serialize by itself.
+
+    Returns
+    -------
+    int, float, bool or str
+        Native Python equivalent of value.
+
+    Raises
+    ------
+    TypeError
+        If value is not a NumPy scalar, so that nothing is silently stored as str.
+
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} can't be checkpointed")
+
+
+def params_hash(params):
+    """
+    Compute a stable digest of estimation parameters
+
+    Parameters
+    ----------
+    params : dict
+        Parameters that identify a run, such as the kernel name and CCC parameters.
+
+    Returns
+    -------
+    str
+        Hexadecimal blake2b digest of the parameters, independent of key order.
+
+    """
+    serialized = json.dumps(params, sort_keys=True, default=_to_builtin)
+    return blake2b(serialized.encode(), digest_size=16).hexdigest()
+
+
+def data_hash(seq_x, seq_y):
+    """
+    Compute a digest of the data of a rowpair
+
+    Parameters
+    ----------
+    seq_x : array-like, 1D
+        Data of first row in the pair.
+    seq_y : array-like, 1D
+        Data of second row in the pair.
+
+    Returns
+    -------
+    str
+        Hexadecimal blake2b digest of dtype, length and contents of both sequences.
+
+    """
+    digest = blake2b(digest_size=16)
+    for seq in (seq_x, seq_y):
+        arr = np.ascontiguousarray(seq)
+        digest.update(f"{arr.dtype.str}:{arr.shape}:".encode())
+        digest.update(arr.tobytes())
+    return digest.hexdigest()
+
+
+def _connect(filepath):
+    """
+    Open the SQLite store at filepath, creating the table if it doesn't exist
+
+    Parameters
+    ----------
+    filepath : str or Path object
+        Path to the store on disk.
+
+    Returns
+    -------
+    sqlite3.Connection
+        Open connection to the store.
+
+    """
+    if not isinstance(filepath, Path):
+        filepath = Path(filepath)
+
+    # Create parent directories if needed
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+
+    # Write-ahead logging lets readers proceed while a batch is being committed
+    conn = sqlite3.connect(str(filepath), timeout=60)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS estimates ("
+        "index_x INTEGER NOT NULL, "
+        "index_y INTEGER NOT NULL, "
+        "params_hash TEXT NOT NULL, "
+        "data_hash TEXT NOT NULL, "
+        "result TEXT NOT NULL, "
+        "PRIMARY KEY (index_x, index_y, params_hash))"
+    )
+    return conn
+
+
+def completed(filepath, key):
+    """
+    Get identifiers and data digests of all rowpairs stored for a parameter hash
+
+    Parameters
+    ----------
+    filepath : str or Path object
+        Path to the store on disk.
+    key : str
+        Parameter hash, as returned by params_hash().
+
+    Returns
+    -------
+    dict
+        Mapping of (index_x, index_y) tuples to the data digest stored with them.
+
+    """
+    conn = _connect(filepath)
+    try:
+        rows = conn.execute(
+            "SELECT index_x, index_y, data_hash FROM estimates WHERE params_hash = ?",
+            (key,),
+        )
+        return {(idx_x, idx_y): digest for idx_x, idx_y, digest in rows}
+    finally:
+        conn.close()
+
+
+def write(filepath, results, key, digests):
+    """
+    Append a batch of rowpair estimates to the store in a single transaction
+
+    Results for pairs that are already present are replaced, so that estimates
+    computed from changed data supersede stale ones.
+
+    Parameters
+    ----------
+    filepath : str or Path object
+        Path to the store on disk.
+    results : list of dict
+        Estimates for each rowpair, each containing "index_x" and "index_y".
+    key : str
+        Parameter hash, as returned by params_hash().
+    digests : dict
+        Mapping of (index_x, index_y) tuples to data digests, as populated by
+        pending().
+
+    Returns
+    -------
+    None.
+
+    """
+    rows = [
+        (
+            int(out["index_x"]),
+            int(out["index_y"]),
+            key,
+            digests[(out["index_x"], out["index_y"])],
+            json.dumps(out, default=_to_builtin),
+        )
+        for out in results
+    ]
+
+    conn = _connect(filepath)
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO estimates VALUES (?, ?, ?, ?, ?)", rows
+            )
+    finally:
+        conn.close()
+
+
+def load(filepath, key, pairs=None):
+    """
+    Load stored rowpair estimates for a given parameter hash
+
+    Parameters
+    ----------
+    filepath : str or Path object
+        Path to the store on disk.
+    key : str
+        Parameter hash, as returned by params_hash().
+    pairs : dict, optional
+        Mapping of (index_x, index_y) tuples to data digests, as populated by
+        pending(). Only rowpairs present in it with a matching digest are returned.
+        The default is None, returning everything stored for key.
+
+    Returns
+    -------
+    list of dict elements
+        Stored estimates, ordered by index_pair.
+
+    """
+    conn = _connect(filepath)
+    try:
+        rows = conn.execute(
+            "SELECT index_x, index_y, data_hash, result FROM estimates "
+            "WHERE params_hash = ?",
+            (key,),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    out = [
+        json.loads(result)
+        for idx_x, idx_y, digest, result in rows
+        if pairs is None or pairs.get((idx_x, idx_y)) == digest
+    ]
+
+    return sorted(out, key=lambda elem: elem["index_pair"])
+
+
+def pending(pairs, done, requested):
+    """
+    Enumerate rowpairs and skip those that have already been computed on the same data
+
+    Enumeration happens before skipping so that index_pair stays identical across
+    restarts of the same run.
+
+    Parameters
+    ----------
+    pairs : list/tuple/generator
+        Collection of rowpairs, as produced by get_rowpairs().
+    done : dict
+        Mapping of (index_x, index_y) tuples to data digests already in the store,
+        as returned by completed().
+    requested : dict
+        Empty dict, populated in place with the data digest of every rowpair seen,
+        keyed by (index_x, index_y).
+
+    Yields
+    ------
+    tuple
+        (index_pair, rowpair) for each rowpair not present in done with the same
+        data digest.
+
+    """
+    for elem in enumerate(pairs):
+        idx_x, idx_y, seq_x, seq_y = elem[1]
+        digest = data_hash(seq_x, seq_y)
+        requested[(idx_x, idx_y)] = digest
+        if done.get((idx_x, idx_y)) != digest:
+            yield elem
+
+
+def batched(iterable, size):
+    """
+    Split an iterable into lists of at most size elements
+
+    Parameters
+    ----------
+    iterable : list/tuple/generator
+        Collection of elements to split.
+    size : int
+        Maximum number of elements in each batch.
+
+    Yields
+    ------
+    list
+        Successive batches of elements.
+
+    """
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
@@ -9,7 +9,7 @@ import pandas as pd
 from ETC.NCA import parallelize_jl as NCAP
 
 
-def compute_CCC(matrix, CCC_params):
+def compute_CCC(matrix, CCC_params, checkpoint=None):
     """
     Compute causal complexity estimates for all pairs of rows of input matrix
 
@@ -22,6 +22,10 @@ def compute_CCC(matrix, CCC_params):
     CCC_params : dict
         CCC parameters with the following names for keys:
             "LEN_past", "ADD_meas", "STEP_size"
+    checkpoint : str or Path object, optional
+        Path to a store on disk for resumable runs. Completed rowpairs are written to
+        it in batches and skipped when the run is restarted on the same data. The
+        default is None.
 
     Returns
     -------
@@ -33,13 +37,13 @@ def compute_CCC(matrix, CCC_params):
     rowpairs = NCAP.get_rowpairs(matrix)
 
     # Compute causal estimates in parallel across rowpairs
-    estimates = NCAP.parallelized_CCC(rowpairs, CCC_params)
+    estimates = NCAP.parallelized_CCC(rowpairs, CCC_params, checkpoint=checkpoint)
 
     # Convert estimates to a DataFrame and return
     return pd.DataFrame(estimates)
 
 
-def compute_CCM(matrix, kernel="LZ"):
+def compute_CCM(matrix, kernel="LZ", checkpoint=None):
     """
     Compute causal complexity estimates for all pairs of rows of input matrix
 
@@ -52,6 +56,10 @@ def compute_CCM(matrix, kernel="LZ"):
     CCC_params : dict
         CCC parameters with the following names for keys:
             "LEN_past", "ADD_meas", "STEP_size"
+    checkpoint : str or Path object, optional
+        Path to a store on disk for resumable runs. Completed rowpairs are written to
+        it in batches and skipped when the run is restarted on the same data. The
+        default is None.
 
     Returns
     -------
@@ -63,7 +71,7 @@ def compute_CCM(matrix, kernel="LZ"):
     rowpairs = NCAP.get_rowpairs(matrix)
 
     # Compute causal estimates in parallel across rowpairs
-    estimates = NCAP.parallelized_CCM(rowpairs, kernel)
+    estimates = NCAP.parallelized_CCM(rowpairs, kernel, checkpoint=checkpoint)
 
     # Convert estimates to a DataFrame and return
     return pd.DataFrame(estimates)
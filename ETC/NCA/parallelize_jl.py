@@ -8,12 +8,14 @@ Parallelized NCA estimation using joblib
 from ETC.CCMC.pairs import ETC_causality as ETC_compute
 from ETC.CCMC.pairs import LZ_causality as LZ_compute
 from ETC.CCC.compute_CCC import compute as CCC_compute
+from ETC.NCA import checkpoint as ckpt
+from ETC.seq import cache
 from joblib import Parallel, delayed
 from functools import partial
 from itertools import combinations
 
 
-def _kernel_CCC(inputs, CCC_params):
+def _kernel_CCC(inputs, CCC_params, cache_settings=None):
     """
     Wrapper for computing causality estimates on a sequence pair
 
@@ -41,6 +43,9 @@ def _kernel_CCC(inputs, CCC_params):
             Parameter "delta": Step-size for sliding chunks across both sequences. An overlap
             of 20-50% between successive chunks or windows suggested.
         The dictionary can be generated interactively using CCC.get_params()
+    cache_settings : dict, optional
+        Settings of the persistent cache in the dispatching process, as returned by
+        cache.settings(). The default is None, leaving those of the worker as is.
 
     Returns
     -------
@@ -58,16 +63,19 @@ def _kernel_CCC(inputs, CCC_params):
     # Initialize dictionary of output estimates with index
     out = {"index_pair": idx, "index_x": idx_x, "index_y": idx_y}
 
-    # Execute CCC_compute on the sequence pair in one direction
-    out.update({"CCC_y_to_x": CCC_compute(seq_x, seq_y, **CCC_params)})
+    # Workers may have started before the cache was enabled, apply current settings
+    with cache.applied(cache_settings or {}):
 
-    # Execute CCC_compute on the sequence pair in the other direction
-    out.update({"CCC_x_to_y": CCC_compute(seq_y, seq_x, **CCC_params)})
+        # Execute CCC_compute on the sequence pair in one direction
+        out.update({"CCC_y_to_x": CCC_compute(seq_x, seq_y, **CCC_params)})
+
+        # Execute CCC_compute on the sequence pair in the other direction
+        out.update({"CCC_x_to_y": CCC_compute(seq_y, seq_x, **CCC_params)})
 
     return out
 
 
-def _kernel_ETC(inputs):
+def _kernel_ETC(inputs, cache_settings=None):
     """
     Wrapper for computing causality estimates on a sequence pair
 
@@ -84,6 +92,9 @@ def _kernel_ETC(inputs):
         usually passed in by zip-ping larger iterables or itertools' product/combinations.
         a, the index, is passed to keep track of order in case of asynchronous execution
         Should look like this: (index, (sequence_x, sequence_y)
+    cache_settings : dict, optional
+        Settings of the persistent cache in the dispatching process, as returned by
+        cache.settings(). The default is None, leaving those of the worker as is.
 
     Returns
     -------
@@ -101,13 +112,16 @@ def _kernel_ETC(inputs):
     # Initialize dictionary of output estimates with index
     out = {"index_pair": idx, "index_x": idx_x, "index_y": idx_y}
 
-    # Execute ETC_compute on the sequence pair
-    out.update(ETC_compute(seq_x, seq_y))
+    # Workers may have started before the cache was enabled, apply current settings
+    with cache.applied(cache_settings or {}):
+
+        # Execute ETC_compute on the sequence pair
+        out.update(ETC_compute(seq_x, seq_y))
 
     return out
 
 
-def _kernel_LZ(inputs):
+def _kernel_LZ(inputs, cache_settings=None):
     """
     Wrapper for computing causality estimates on a sequence pair
 
@@ -124,6 +138,9 @@ def _kernel_LZ(inputs):
         usually passed in by zip-ping larger iterables or itertools' product/combinations.
         a, the index, is passed to keep track of order in case of asynchronous execution
         Should look like this: (index, (sequence_x, sequence_y)
+    cache_settings : dict, optional
+        Settings of the persistent cache in the dispatching process, as returned by
+        cache.settings(). The default is None, leaving those of the worker as is.
 
     Returns
     -------
@@ -141,8 +158,11 @@ def _kernel_LZ(inputs):
     # Initialize dictionary of output estimates with index
     out = {"index_pair": idx, "index_x": idx_x, "index_y": idx_y}
 
-    # Execute LZ_compute on the sequence pair
-    out.update(LZ_compute(seq_x, seq_y))
+    # Workers may have started before the cache was enabled, apply current settings
+    with cache.applied(cache_settings or {}):
+
+        # Execute LZ_compute on the sequence pair
+        out.update(LZ_compute(seq_x, seq_y))
 
     return out
 
@@ -172,7 +192,53 @@ def get_rowpairs(matrix):
         yield (row1, row2, matrix[row1, :], matrix[row2, :])
 
 
-def parallelized_CCC(pairs, CCC_params):
+def _run_checkpointed(exec_kernel, pairs, filepath, key, batch_size):
+    """
+    Run a kernel over rowpairs in batches, persisting each completed batch to disk
+
+    Rowpairs already present in the store for the same data are skipped, and stored
+    estimates are merged with newly computed ones in the returned output. Rowpairs
+    whose data differs from what was stored are computed again.
+
+    Parameters
+    ----------
+    exec_kernel : function
+        Kernel to execute on each (index, rowpair) element.
+    pairs : list/tuple/generator
+        Collection of pairs of integer sequences.
+    filepath : str or Path object
+        Path to the checkpoint store on disk.
+    key : str
+        Parameter hash identifying this run, as returned by checkpoint.params_hash().
+    batch_size : int
+        Number of rowpairs to compute before writing results to disk.
+
+    Returns
+    -------
+    list of dict elements
+        Estimates for every rowpair in pairs, ordered by index_pair.
+
+    """
+    # Get rowpairs already completed in a previous run
+    done = ckpt.completed(filepath, key)
+    if done:
+        print(f"> Resuming from checkpoint: {len(done)} rowpairs already computed")
+
+    # Collect identifiers and data digests of all rowpairs while skipping completed ones
+    requested = dict()
+
+    # Compute remaining rowpairs batch by batch and write each batch to disk
+    for batch in ckpt.batched(ckpt.pending(pairs, done, requested), batch_size):
+        out = Parallel(n_jobs=-1, verbose=50)(
+            delayed(exec_kernel)(rowElem) for rowElem in batch
+        )
+        ckpt.write(filepath, out, key, requested)
+
+    # Merge everything from the store that belongs to this input and return
+    return ckpt.load(filepath, key, pairs=requested)
+
+
+def parallelized_CCC(pairs, CCC_params, checkpoint=None, batch_size=256):
     """
     This function operates concurrently on a collection of sequence pairs and computes
     estimates using the chosen kernel function.
@@ -198,6 +264,14 @@ def parallelized_CCC(pairs, CCC_params):
             Parameter "delta": Step-size for sliding chunks across both sequences. An overlap
             of 20-50% between successive chunks or windows suggested.
         The dictionary can be generated interactively using CCC.get_params()
+    checkpoint : str or Path object, optional
+        Path to a store on disk to which completed rowpairs are written in batches.
+        If the store already holds estimates for the same parameters and data, those
+        rowpairs are skipped and the stored estimates are merged into the output.
+        The default is None, for no checkpointing.
+    batch_size : int, optional
+        Number of rowpairs computed between writes to the checkpoint store. Ignored
+        if checkpoint is None. The default is 256.
 
     Returns
     -------
@@ -206,11 +280,18 @@ def parallelized_CCC(pairs, CCC_params):
 
     """
 
-    exec_kernel = partial(_kernel_CCC, CCC_params=CCC_params)
+    exec_kernel = partial(
+        _kernel_CCC, CCC_params=CCC_params, cache_settings=cache.settings()
+    )
 
     # Confirm to stdout
     print("Computing CCC estimates in parallel ... ")
 
+    # Checkpointed execution, resumable from the store on disk
+    if checkpoint is not None:
+        key = ckpt.params_hash({"kernel": "CCC", **CCC_params})
+        return _run_checkpointed(exec_kernel, pairs, checkpoint, key, batch_size)
+
     # joblib's paralellization
     out = Parallel(n_jobs=-1, verbose=50)(
         delayed(exec_kernel)(rowElem) for rowElem in enumerate(pairs)
@@ -220,7 +301,7 @@ def parallelized_CCC(pairs, CCC_params):
     return out
 
 
-def parallelized_CCM(pairs, kernel="LZ"):
+def parallelized_CCM(pairs, kernel="LZ", checkpoint=None, batch_size=256):
     """
     This function operates concurrently on a collection of sequence pairs and computes
     estimates using the chosen kernel function.
@@ -238,6 +319,14 @@ def parallelized_CCM(pairs, kernel="LZ"):
     kernel : str, optional
         Name of an estimator function. Currently available: "ETC" and "LZ". The
         default is "LZ".
+    checkpoint : str or Path object, optional
+        Path to a store on disk to which completed rowpairs are written in batches.
+        If the store already holds estimates for the same kernel and data, those
+        rowpairs are skipped and the stored estimates are merged into the output.
+        The default is None, for no checkpointing.
+    batch_size : int, optional
+        Number of rowpairs computed between writes to the checkpoint store. Ignored
+        if checkpoint is None. The default is 256.
 
     Returns
     -------
@@ -247,9 +336,9 @@ def parallelized_CCM(pairs, kernel="LZ"):
     """
 
     if kernel == "LZ":
-        exec_kernel = _kernel_LZ
+        exec_kernel = partial(_kernel_LZ, cache_settings=cache.settings())
     elif kernel == "ETC":
-        exec_kernel = _kernel_ETC
+        exec_kernel = partial(_kernel_ETC, cache_settings=cache.settings())
     else:
         print("Invalid kernel selected")
         return None
@@ -257,6 +346,11 @@ def parallelized_CCM(pairs, kernel="LZ"):
     # Confirm to stdout
     print(f"Computing CCM estimates in parallel using {kernel} ... ")
 
+    # Checkpointed execution, resumable from the store on disk
+    if checkpoint is not None:
+        key = ckpt.params_hash({"kernel": kernel})
+        return _run_checkpointed(exec_kernel, pairs, checkpoint, key, batch_size)
+
     # joblib's paralellization
     out = Parallel(n_jobs=-1, verbose=50)(
         delayed(exec_kernel)(rowElem) for rowElem in enumerate(pairs)
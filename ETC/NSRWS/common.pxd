@@ -0,0 +1,20 @@
+# Declarations of kernels shared by the compiled cores of x1D, x2D & xND
+
+# Base of the polynomial (rolling) hashes over windows & columns, and multiplier for
+# spreading hashes over slots of a table (Fibonacci hashing), as C constants
+cdef extern from *:
+    """
+    #define ETC_HASH_BASE 1000003ULL
+    #define ETC_HASH_SPREAD 11400714819323198485ULL
+    """
+    const unsigned long long HASH_BASE "ETC_HASH_BASE"
+    const unsigned long long HASH_SPREAD "ETC_HASH_SPREAD"
+
+cdef Py_ssize_t _relabel(
+    const unsigned long long *keys,
+    Py_ssize_t size,
+    unsigned long long top,
+    unsigned int *codes,
+) except -1
+
+cdef tuple _count_codes(const unsigned int *codes, Py_ssize_t size, Py_ssize_t k)
@@ -0,0 +1,138 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, nonecheck=False, emit_code_comments=True, cdivision=True, embedsignature=True
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kernels shared by the compiled cores of x1D, x2D & xND, declared in common.pxd.
+
+@author: Pranay S. Yadav
+"""
+# Import stuff
+from libc.stdlib cimport malloc, calloc, free
+cimport cython
+
+# Function for relabelling keys to live symbols 0, 1, ... in order of first occurrence
+cdef Py_ssize_t _relabel(
+    const unsigned long long *keys,
+    Py_ssize_t size,
+    unsigned long long top,
+    unsigned int *codes,
+) except -1:
+    """
+    Write the live symbol of each key into codes and return the number of live
+    symbols. Keys no larger than a few times size are relabelled through a dense
+    lookup array, larger ones through an open-addressing table.
+    """
+    cdef Py_ssize_t n, slot, capacity = 1, slot_mask
+    cdef Py_ssize_t k = 0
+    cdef int shift = 64
+    cdef unsigned int *lookup
+    cdef unsigned long long *table_keys
+    cdef unsigned int *table_codes
+
+    # Dense lookup, 0 for keys not seen yet
+    if top < <unsigned long long> (4 * size + 65536):
+        lookup = <unsigned int *> calloc(top + 1, sizeof(unsigned int))
+        if not lookup:
+            raise MemoryError()
+        for n in range(size):
+            if not lookup[keys[n]]:
+                k += 1
+                lookup[keys[n]] = k
+            codes[n] = lookup[keys[n]] - 1
+        free(lookup)
+        return k
+
+    # Open-addressing table of at least twice as many slots as keys, code 0 if empty
+    while capacity < 2 * size:
+        capacity <<= 1
+        shift -= 1
+    slot_mask = capacity - 1
+    table_keys = <unsigned long long *> malloc(capacity * sizeof(unsigned long long))
+    table_codes = <unsigned int *> calloc(capacity, sizeof(unsigned int))
+    try:
+        if not (table_keys and table_codes):
+            raise MemoryError()
+        for n in range(size):
+            slot = <Py_ssize_t> (((keys[n] + 1) * HASH_SPREAD) >> shift)
+            while table_codes[slot] and table_keys[slot] != keys[n]:
+                slot = (slot + 1) & slot_mask
+            if not table_codes[slot]:
+                k += 1
+                table_keys[slot] = keys[n]
+                table_codes[slot] = k
+            codes[n] = table_codes[slot] - 1
+    finally:
+        free(table_keys)
+        free(table_codes)
+
+    return k
+
+# Function for counting non-overlapping pairs of live symbols
+cdef tuple _count_codes(const unsigned int *codes, Py_ssize_t size, Py_ssize_t k):
+    """
+    Count pairs of live symbols as get_mask_pairs & _mask_and_count do, and return the
+    first position of the most frequent pair with its count. Counts live in a dense
+    k x k array if it is no larger than a few times size, else in an open-addressing
+    table sized by the number of pairs.
+    """
+    cdef Py_ssize_t n, slot, capacity = 1, slot_mask
+    cdef Py_ssize_t best = 0
+    cdef int shift = 64
+    cdef unsigned long long key
+    cdef Py_ssize_t *counts
+    cdef unsigned long long *keys = NULL
+    cdef bint dense = k * k <= 4 * size + 65536
+
+    # Allocate dense array, or table of at least twice as many slots as pairs
+    if dense:
+        counts = <Py_ssize_t *> calloc(k * k, sizeof(Py_ssize_t))
+    else:
+        while capacity < 2 * size:
+            capacity <<= 1
+            shift -= 1
+        slot_mask = capacity - 1
+        counts = <Py_ssize_t *> calloc(capacity, sizeof(Py_ssize_t))
+        keys = <unsigned long long *> malloc(capacity * sizeof(unsigned long long))
+
+    try:
+        if not counts or not (dense or keys):
+            raise MemoryError()
+
+        # Count pairs, skipping over a pair that overlaps an identical one before
+        n = 0
+        while n < size - 1:
+            key = <unsigned long long> codes[n] * k + codes[n + 1]
+            if dense:
+                slot = <Py_ssize_t> key
+            else:
+                slot = <Py_ssize_t> (((key + 1) * HASH_SPREAD) >> shift)
+                while counts[slot] and keys[slot] != key:
+                    slot = (slot + 1) & slot_mask
+                keys[slot] = key
+            counts[slot] += 1
+            if counts[slot] > best:
+                best = counts[slot]
+            if codes[n] == codes[n + 1] and n + 2 < size and codes[n + 2] == codes[n]:
+                n += 2
+            else:
+                n += 1
+
+        # Most frequent pair, earliest first occurrence among ties
+        n = 0
+        while True:
+            key = <unsigned long long> codes[n] * k + codes[n + 1]
+            if dense:
+                slot = <Py_ssize_t> key
+            else:
+                slot = <Py_ssize_t> (((key + 1) * HASH_SPREAD) >> shift)
+                while keys[slot] != key:
+                    slot = (slot + 1) & slot_mask
+            if counts[slot] == best:
+                break
+            n += 1
+
+    finally:
+        free(counts)
+        free(keys)
+
+    return n, best
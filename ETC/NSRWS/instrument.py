@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Opt-in per-phase instrumentation of NSRWS steps.
+
+When enabled, each step of NSRWS in 1D and 2D, and each step of external substitution
+in CCMC, reports time spent in its phases: counting non-overlapping windows & finding
+the most frequent one ("count"), finding the largest symbol to get a new one for
+substitution ("maximum"), substituting it ("substitute"), casting results back to
+arrays ("cast") and checking for equality of all symbols ("equality"). Early steps of
+compute_1D that run natively on dense pair counts are timed together ("dense"). CCMC
+checks whether a pair is present ("lookup") instead of counting. Cumulative time
+and number of calls are kept per scope ("1D", "2D" and "CCMC") and phase, and every
+phase can optionally be kept as an event for export in the Chrome trace format
+(chrome://tracing or https://ui.perfetto.dev).
+
+When disabled, which is the default, each step pays for a single global check and
+each phase for a comparison with None. Recording is per process.
+
+Usage:
+    from ETC.NSRWS import instrument
+    with instrument.recording(trace=True) as recorder:
+        ETC.compute_1D(seq)
+    instrument.summary(recorder)
+    instrument.chrome_trace(recorder, "trace.json")
+
+or, with a callback receiving the summary when recording stops:
+    instrument.enable(callback=print)
+    ...
+    instrument.disable()
+
+@author: Pranay S. Yadav
+"""
+# Import calls
+import json
+import os
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+# Active recorder, None when instrumentation is disabled
+_recorder = None
+
+
+def _new_recorder(callback=None, trace=False):
+    """
+    Create an empty recorder
+
+    Parameters
+    ----------
+    callback : callable, optional
+        Called with the summary when recording stops. The default is None.
+    trace : bool, optional
+        Whether to keep every phase as an event. The default is False.
+
+    Returns
+    -------
+    dict
+        Totals per (scope, phase), events if traced, callback & time of creation.
+
+    """
+    return {
+        "totals": {},
+        "events": [] if trace else None,
+        "callback": callback,
+        "origin": perf_counter(),
+    }
+
+
+def enable(callback=None, trace=False):
+    """
+    Turn on instrumentation for this process, starting from an empty recorder
+
+    Parameters
+    ----------
+    callback : callable, optional
+        Called with the summary when disable() is called. The default is None.
+    trace : bool, optional
+        Whether to keep every phase as an event, for export with chrome_trace().
+        Memory grows with the number of steps. The default is False.
+
+    Returns
+    -------
+    dict
+        The active recorder.
+
+    """
+    global _recorder
+    _recorder = _new_recorder(callback, trace)
+    return _recorder
+
+
+def disable():
+    """
+    Turn off instrumentation, passing the summary to the callback if one was given
+
+    Returns
+    -------
+    dict or None
+        The recorder that was active, None if instrumentation was not enabled.
+
+    """
+    global _recorder
+
+    recorder, _recorder = _recorder, None
+    if recorder is not None and recorder["callback"] is not None:
+        recorder["callback"](summary(recorder))
+
+    return recorder
+
+
+@contextmanager
+def recording(callback=None, trace=False):
+    """
+    Context manager that enables instrumentation within its scope
+
+    Parameters
+    ----------
+    callback : callable, optional
+        Called with the summary on exit. The default is None.
+    trace : bool, optional
+        Whether to keep every phase as an event. The default is False.
+
+    Yields
+    ------
+    dict
+        Recorder holding results, to be passed to summary() or chrome_trace().
+
+    """
+    global _recorder
+
+    previous = _recorder
+    recorder = enable(callback, trace)
+    try:
+        yield recorder
+    finally:
+        disable()
+        _recorder = previous
+
+
+def start():
+    """
+    Start timing a step
+
+    Returns
+    -------
+    float or None
+        Current time, None if instrumentation is disabled.
+
+    """
+    if _recorder is None:
+        return None
+    return perf_counter()
+
+
+def mark(scope, phase, since):
+    """
+    Record the end of a phase that started at a given time
+
+    Parameters
+    ----------
+    scope : str
+        Where the phase ran: "1D", "2D" or "CCMC".
+    phase : str
+        Name of the phase.
+    since : float
+        Time at which the phase started, as returned by start() or mark().
+
+    Returns
+    -------
+    float
+        Current time, which is when the next phase starts.
+
+    """
+    now = perf_counter()
+    recorder = _recorder
+
+    # Disabled in the middle of a step
+    if recorder is None:
+        return now
+
+    totals = recorder["totals"].setdefault((scope, phase), [0, 0.0])
+    totals[0] += 1
+    totals[1] += now - since
+
+    if recorder["events"] is not None:
+        recorder["events"].append((scope, phase, since, now - since))
+
+    # Exclude time taken for recording from the next phase
+    return perf_counter()
+
+
+def summary(recorder=None):
+    """
+    Summarize cumulative time and number of calls per scope and phase
+
+    Parameters
+    ----------
+    recorder : dict, optional
+        Recorder to summarize. The default is None, using the active recorder.
+
+    Returns
+    -------
+    dict
+        Nested as {scope: {phase: {"calls": int, "time": float}}}, with time in
+        seconds. Empty if there is nothing to summarize.
+
+    """
+    recorder = _recorder if recorder is None else recorder
+    if recorder is None:
+        return {}
+
+    out = {}
+    for (scope, phase), (calls, time) in recorder["totals"].items():
+        out.setdefault(scope, {})[phase] = {"calls": calls, "time": time}
+
+    return out
+
+
+def chrome_trace(recorder=None, filepath=None):
+    """
+    Export recorded phases in the Chrome trace event format
+
+    Parameters
+    ----------
+    recorder : dict, optional
+        Recorder created with trace=True. The default is None, using the active one.
+    filepath : str or Path object, optional
+        If given, the trace is also written to this file as JSON. The default is None.
+
+    Returns
+    -------
+    dict
+        Trace with one complete ("X") event per phase, timestamps in microseconds
+        from the start of recording. None if the recorder didn't keep events.
+
+    """
+    recorder = _recorder if recorder is None else recorder
+    if recorder is None or recorder["events"] is None:
+        print("> ERROR: No events recorded, enable instrumentation with trace=True")
+        return None
+
+    pid, tid, origin = os.getpid(), threading.get_ident(), recorder["origin"]
+    trace = {
+        "traceEvents": [
+            {
+                "name": phase,
+                "cat": scope,
+                "ph": "X",
+                "ts": (since - origin) * 1e6,
+                "dur": duration * 1e6,
+                "pid": pid,
+                "tid": tid,
+            }
+            for scope, phase, since, duration in recorder["events"]
+        ],
+        "displayTimeUnit": "ms",
+    }
+
+    if filepath is not None:
+        with open(filepath, "w") as file:
+            json.dump(trace, file)
+
+    return trace
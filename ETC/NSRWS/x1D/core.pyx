@@ -8,9 +8,13 @@
 """
 # Import stuff
 from cpython cimport array, bool
+from libc.stdlib cimport malloc, calloc, free
+from libc.string cimport memset
 cimport cython
 import array
 
+from ETC.NSRWS.common cimport HASH_BASE, HASH_SPREAD, _relabel, _count_codes
+
 # Function for getting mask for pairs
 cpdef array.array get_mask_pairs(const unsigned int[::1] x):
     """
@@ -58,6 +62,54 @@ cpdef array.array get_mask_pairs(const unsigned int[::1] x):
 
     return mask
 
+# Function for counting non-overlapping pairs over live symbols
+cpdef tuple count_pairs(const unsigned int[::1] x):
+    """
+    INPUT
+    -----
+    x : array.array
+        Array object containing 32-bit unsigned integers, at least 2 long.
+
+    OUTPUT
+    ------
+    tuple of 2 ints
+        Index of the first occurrence of the most frequent pair, and the number of
+        times it occurs without overlapping itself.
+
+    Equivalent to counting pairs left unmasked by get_mask_pairs and picking the most
+    common one with ties broken by first occurrence. Symbols grow with every step of
+    NSRPS while only a few remain live, so they are first relabelled to live symbols
+    and pairs are counted in an array indexed by them, without hashing.
+    """
+    cdef Py_ssize_t x_size = x.shape[0]
+    cdef Py_ssize_t n, k
+    cdef unsigned long long top = 0
+
+    if x_size < 2:
+        return 0, 0
+
+    # Buffers for symbols as keys, and live symbols
+    cdef unsigned long long *keys = <unsigned long long *> malloc(
+        x_size * sizeof(unsigned long long)
+    )
+    cdef unsigned int *codes = <unsigned int *> malloc(x_size * sizeof(unsigned int))
+
+    try:
+        if not (keys and codes):
+            raise MemoryError()
+
+        for n in range(x_size):
+            keys[n] = x[n]
+            if x[n] > top:
+                top = x[n]
+
+        k = _relabel(keys, x_size, top, codes)
+        return _count_codes(codes, x_size, k)
+
+    finally:
+        free(keys)
+        free(codes)
+
 # Function for substituting pairs
 cpdef list substitute_pairs(unsigned int[::1] x, unsigned int[::1] pair, unsigned int value):
     """
@@ -210,8 +262,123 @@ cpdef array.array get_mask_windows(const unsigned int[::1] x, unsigned int order
 
     return mask
 
+# Function for counting non-overlapping windows of any length in a single pass
+cpdef tuple count_windows(const unsigned int[::1] x, unsigned int order):
+    """
+    INPUT
+    -----
+    x : array.array
+        Array object containing 32-bit unsigned integers, at least order long.
+
+    order: unsigned 32-bit int
+        Length of the window to slide across input
+
+    OUTPUT
+    ------
+    tuple of 2 ints
+        Index in x of the first occurrence of the most frequent window, and the number
+        of times it occurs without overlapping itself.
+
+    Equivalent to counting windows left unmasked by get_mask_windows, including
+    its early exit near the end of x, and picking the most common one with ties
+    broken by first occurrence. Windows are hashed with a rolling polynomial hash
+    and grouped in an open-addressing table, with hash matches confirmed
+    element-wise. Self-overlap is detected from the distance to the last counted
+    occurrence of the same window, which must be at least order.
+    """
+    # Number of windows and index beyond which get_mask_windows exits early
+    cdef Py_ssize_t n_windows = x.shape[0] - order + 1
+    cdef Py_ssize_t cutoff = n_windows - order + 1
+
+    # Table size: smallest power of 2 at least twice the number of windows
+    cdef int shift = 64
+    cdef Py_ssize_t capacity = 1
+    while capacity < 2 * n_windows:
+        capacity <<= 1
+        shift -= 1
+    cdef Py_ssize_t slot_mask = capacity - 1
+
+    # Table slots: hash, first occurrence, last counted occurrence & count per window
+    cdef unsigned long long *hashes = <unsigned long long *> malloc(
+        capacity * sizeof(unsigned long long)
+    )
+    cdef Py_ssize_t *first = <Py_ssize_t *> malloc(capacity * sizeof(Py_ssize_t))
+    cdef Py_ssize_t *last = <Py_ssize_t *> malloc(capacity * sizeof(Py_ssize_t))
+    cdef Py_ssize_t *counts = <Py_ssize_t *> malloc(capacity * sizeof(Py_ssize_t))
+
+    # Initialize looping variables
+    cdef Py_ssize_t n, m, slot
+    cdef unsigned long long h = 0, lead = 1
+    cdef bint frozen = False
+    cdef Py_ssize_t best_first = 0, best_count = 0
+
+    try:
+        if not (hashes and first and last and counts):
+            raise MemoryError()
+
+        for slot in range(capacity):
+            first[slot] = -1
+
+        # Hash of the first window, and place value of its leading element
+        for m in range(order):
+            h = h * HASH_BASE + x[m]
+            if m:
+                lead *= HASH_BASE
+
+        for n in range(n_windows):
+
+            # Roll hash over by one element
+            if n:
+                h = (h - x[n - 1] * lead) * HASH_BASE + x[n + order - 1]
+
+            # Find slot of this window, probing linearly past collisions
+            slot = <Py_ssize_t> ((h * HASH_SPREAD) >> shift)
+            while first[slot] != -1:
+                if hashes[slot] == h:
+                    m = 0
+                    while m < order and x[first[slot] + m] == x[n + m]:
+                        m += 1
+                    if m == order:
+                        break
+                slot = (slot + 1) & slot_mask
+
+            # New window, as good as counted once far enough before
+            if first[slot] == -1:
+                hashes[slot] = h
+                first[slot] = n
+                last[slot] = n - order
+                counts[slot] = 0
+
+            # Count only if it doesn't overlap the last counted occurrence
+            if n - last[slot] >= order:
+                counts[slot] += 1
+
+                # get_mask_windows stops masking after the first counted window
+                # whose followers run past the end of input
+                if not frozen:
+                    last[slot] = n
+                    frozen = n >= cutoff
+
+        # Most frequent window, earliest first occurrence among ties
+        for slot in range(capacity):
+            if first[slot] == -1:
+                continue
+            if counts[slot] > best_count or (
+                counts[slot] == best_count and first[slot] < best_first
+            ):
+                best_count = counts[slot]
+                best_first = first[slot]
+
+    finally:
+        free(hashes)
+        free(first)
+        free(last)
+        free(counts)
+
+    return best_first, best_count
+
 # Function for substituting windows of any length
-cpdef list substitute_windows(unsigned int[::1] x, unsigned int order, unsigned int[::1] window, unsigned int value):
+cpdef list substitute_windows(const unsigned int[::1] x, unsigned int order, const unsigned int[::1] window, unsigned int value):
     """
     INPUT
     -----
@@ -221,64 +388,201 @@ cpdef list substitute_windows(unsigned int[::1] x, unsigned int order, unsigned
     order: unsigned 32-bit int
         Length of the window to slide across input
 
-    window : array.array, length = 2
-        Array object containing 2 32-bit unsigned integers.
+    window : array.array, length = order
+        Array object containing order 32-bit unsigned integers.
 
     value : unsigned 32-bit int
-        Value to substitute the first element of pair with
+        Value to substitute each occurrence of window with
 
     OUTPUT
     ------
     out : list
-        Array object containing 32-bit integers, with supplied pair replaced everywhere
-        by the supplied value.
+        Array object containing 32-bit integers, with non-overlapping occurrences of
+        supplied window replaced from left to right by the supplied value.
+
+    Occurrences are found with a single Knuth-Morris-Pratt scan, restarting after
+    each match so that substituted occurrences never overlap.
     """
     # Initialize looping variables and output list
-    cdef Py_ssize_t n = 0 # Outer loop
-    cdef Py_ssize_t m = 0 # Inner loop
+    cdef Py_ssize_t n = 0, q = 0
     cdef Py_ssize_t x_size = len(x)
     cdef list out = []
 
-    # Tracking variable for counting matching elements in pairwise window comparison
-    cdef unsigned int track = 0
-
-    # Iterate over input values except one less than the last 'order' values
-    # Logic: last window, say triplet must begin from 3rd-last index, leaving 2 values
-    for n in range(x_size-order+1):
-
-        # Slide window of given order and do element-wise comparison
-        for m in range(order):
-
-            # Reset tracker
-
-
-            # Track comparison of input elements with window elements
-            if x[n+m] == window[m]:
-                track += 1
-            # # If mismatch, break
+    # Failure table: length of the longest proper border of each prefix of window
+    cdef Py_ssize_t *failure = <Py_ssize_t *> malloc(order * sizeof(Py_ssize_t))
+
+    # Flags for starting indices of substituted occurrences
+    cdef unsigned char *starts = <unsigned char *> malloc(x_size + 1)
+
+    try:
+        if not (failure and starts):
+            raise MemoryError()
+
+        for n in range(x_size):
+            starts[n] = 0
+
+        # Build failure table
+        failure[0] = 0
+        for n in range(1, order):
+            while q > 0 and window[n] != window[q]:
+                q = failure[q - 1]
+            if window[n] == window[q]:
+                q += 1
+            failure[n] = q
+
+        # Scan input, restarting from scratch after each match
+        q = 0
+        for n in range(x_size):
+            while q > 0 and x[n] != window[q]:
+                q = failure[q - 1]
+            if x[n] == window[q]:
+                q += 1
+            if q == order:
+                starts[n - order + 1] = 1
+                q = 0
+
+        # Collect substituted values and remaining non-zero values
+        n = 0
+        while n < x_size:
+            if starts[n]:
+                out.append(value)
+                n += order
             else:
-                break
+                if x[n]:
+                    out.append(x[n])
+                n += 1
 
-        # If all compared elements match for current window
-        if track == order:
+    finally:
+        free(failure)
+        free(starts)
 
-            # Replace the first element with provided value
-            x[n] = value
+    return out
 
-            # Replace the remaining subsequent values with zeros
-            for m in range(1, order):
-                x[n+m] = 0
+# Function for running steps of NSRPS on dense pair counts while the alphabet is small
+cpdef tuple dense_pairs(const unsigned int[::1] x, unsigned int limit):
+    """
+    INPUT
+    -----
+    x : array.array
+        Array object containing 32-bit unsigned integers, all non-zero.
 
-        # Reset tracker
-        track = 0
-    # Reset indexing variable
-    n = 0
+    limit : unsigned 32-bit int
+        Largest alphabet, i.e. largest symbol + 1, for which to count pairs densely.
+        At most 256.
 
-    # Loop over mutated input and append non-zero values to list
+    OUTPUT
+    ------
+    tuple of (array.array, int)
+        Sequence after the steps taken, as an array object of 32-bit unsigned
+        integers, and the number of steps taken.
+
+    Runs the same steps as get_mask_pairs, _mask_and_count & substitute_pairs, on
+    symbols packed into one byte each. Pairs (a, b) are counted in a dense table
+    indexed by a * alphabet + b, so no hashing is needed. Stops without taking a step
+    once all symbols are equal, the sequence is shorter than 2, all pairs are distinct
+    (leaving truncation to the caller), or the next substituted symbol would make the
+    alphabet reach limit or its square exceed the length of the sequence.
+    """
+    # Get size of input & largest symbol
+    cdef Py_ssize_t x_size = x.shape[0]
+    cdef Py_ssize_t n, w, cell
+    cdef unsigned int top = 0
     for n in range(x_size):
+        if x[n] > top:
+            top = x[n]
 
-        if x[n]:
+    # Initialize output, unchanged if no step can be taken
+    cdef array.array int_template = array.array('I', [])
+    cdef array.array out
+    cdef unsigned int[:] out_view
+
+    if limit > 256:
+        limit = 256
+    if top + 2 > limit or x_size < 2:
+        out = array.clone(int_template, x_size, zero=False)
+        out_view = out
+        for n in range(x_size):
+            out_view[n] = x[n]
+        return out, 0
+
+    # Packed copy of input & dense table of pair counts
+    cdef unsigned char *buf = <unsigned char *> malloc(x_size)
+    cdef Py_ssize_t *counts = <Py_ssize_t *> calloc(limit * limit, sizeof(Py_ssize_t))
+
+    # Initialize looping variables
+    cdef Py_ssize_t size = x_size, steps = 0, best
+    cdef Py_ssize_t alphabet
+    cdef unsigned char a, b
+
+    try:
+        if not (buf and counts):
+            raise MemoryError()
+
+        for n in range(x_size):
+            buf[n] = <unsigned char> x[n]
+
+        while size >= 2:
+
+            # Stop if the next substituted symbol doesn't fit the dense table
+            alphabet = top + 1
+            if top + 2 > limit or alphabet * alphabet > size:
+                break
 
-            out.append(x[n])
+            # Stop if all symbols are equal
+            n = 1
+            while n < size and buf[n] == buf[0]:
+                n += 1
+            if n == size:
+                break
+
+            # Count pairs, skipping over a pair that overlaps an identical one before
+            memset(counts, 0, alphabet * alphabet * sizeof(Py_ssize_t))
+            best = 0
+            n = 0
+            while n < size - 1:
+                cell = buf[n] * alphabet + buf[n + 1]
+                counts[cell] += 1
+                if counts[cell] > best:
+                    best = counts[cell]
+                if buf[n] == buf[n + 1] and n + 2 < size and buf[n + 2] == buf[n]:
+                    n += 2
+                else:
+                    n += 1
+
+            # Stop if all pairs are distinct, for truncation
+            if best == 1:
+                break
 
-    return out
\ No newline at end of file
+            # Most frequent pair, earliest first occurrence among ties
+            n = 0
+            while counts[buf[n] * alphabet + buf[n + 1]] != best:
+                n += 1
+            a, b = buf[n], buf[n + 1]
+
+            # Substitute the pair with a new symbol, left to right without overlap,
+            # starting from its first occurrence
+            top += 1
+            w = n
+            while n < size:
+                if n < size - 1 and buf[n] == a and buf[n + 1] == b:
+                    buf[w] = <unsigned char> top
+                    n += 2
+                else:
+                    buf[w] = buf[n]
+                    n += 1
+                w += 1
+
+            size = w
+            steps += 1
+
+        # Unpack into array of 32-bit unsigned integers
+        out = array.clone(int_template, size, zero=False)
+        out_view = out
+        for n in range(size):
+            out_view[n] = buf[n]
+
+    finally:
+        free(buf)
+        free(counts)
+
+    return out, steps
@@ -7,16 +7,23 @@
 """
 
 
+from collections import Counter
 from functools import partial
-from itertools import islice
+from heapq import heappush, heappushpop
+from itertools import combinations, islice
 
 # Import functions from standard library modules
 from multiprocessing import Pool
 
+# Import external modules
+import numpy as np
+from joblib import Parallel, delayed, effective_n_jobs
+
 # Import local modules
-import ETC
+from ETC.NSRWS.x1D.etc import compute as compute_1D, _compute_compact_truncated
+from ETC.seq.recode import _code_points, cast, recode_lexical
 
-get1D = partial(ETC.compute_1D, order=2, verbose=False, truncate=True)
+get1D = partial(compute_1D, order=2, verbose=False, truncate=True)
 
 
 def _compute_distance(inputs):
@@ -38,8 +45,8 @@ def _compute_distance(inputs):
     """
     idx, seqs = inputs
 
-    S1 = ETC.seq.recode.recode_lexical(seqs[0])
-    S2 = ETC.seq.recode.recode_lexical(seqs[1])
+    S1 = recode_lexical(seqs[0])
+    S2 = recode_lexical(seqs[1])
 
     # Prepare output dictionary
     out = {"item": idx, "length_seq1": len(S1), "length_seq2": len(S2)}
@@ -65,6 +72,357 @@ def _compute_distance(inputs):
     return out
 
 
+def _recode_all(sequences, joint=True):
+    """
+    Recode a collection of sequences once, each into a uint32 NumPy array.
+
+    Strings are recoded lexically, either over the alphabet shared by all sequences
+    (joint=True) or over each sequence's own alphabet as done by _compute_distance
+    (joint=False). Integer sequences are cast as is.
+
+    Parameters
+    ----------
+    sequences : list or tuple
+        Collection of strings or integer sequences.
+    joint : bool, optional
+        Whether to recode strings over a shared alphabet. The default is True.
+
+    Returns
+    -------
+    tuple or None
+        List of recoded sequences & the shared alphabet as sorted code points (None
+        if not recoded jointly). None if any sequence could not be recoded.
+
+    """
+    # Build the shared alphabet, as sorted code points, if all inputs are strings
+    alphabet = None
+    if joint and sequences and all(isinstance(seq, str) for seq in sequences):
+        alphabet = np.unique(
+            np.concatenate([np.unique(_code_points(seq)) for seq in sequences])
+        )
+
+    out = []
+    for seq in sequences:
+        if alphabet is not None:
+            # Lexical symbol of each character is its position in the alphabet
+            seq = np.searchsorted(alphabet, _code_points(seq)).astype("uint32") + 1
+        elif isinstance(seq, str):
+            seq = recode_lexical(seq)
+        else:
+            seq = cast(seq)
+
+        if seq is None:
+            return None
+
+        # View array.array buffers as NumPy arrays without copying
+        if not isinstance(seq, np.ndarray):
+            seq = np.frombuffer(seq, dtype="uint32")
+        out.append(seq)
+
+    return out, alphabet
+
+
+def _compute_single(seq):
+    """
+    Compute ETC for a single recoded sequence without modifying it
+
+    Parameters
+    ----------
+    seq : np.ndarray
+        Sequence of uint32 integers.
+
+    Returns
+    -------
+    int
+        ETC estimate.
+
+    """
+    return _compute_compact_truncated(seq.copy())
+
+
+def _compute_concatenated(seq1, seq2):
+    """
+    Compute ETC for both concatenations of a pair of recoded sequences
+
+    Each concatenation is written once into a fresh contiguous buffer which the
+    NSRPS engine then consumes in place.
+
+    Parameters
+    ----------
+    seq1 : np.ndarray
+        Sequence of uint32 integers.
+    seq2 : np.ndarray
+        Sequence of uint32 integers.
+
+    Returns
+    -------
+    tuple of int
+        ETC of seq1 followed by seq2, and of seq2 followed by seq1.
+
+    """
+    return (
+        _compute_compact_truncated(np.concatenate((seq1, seq2))),
+        _compute_compact_truncated(np.concatenate((seq2, seq1))),
+    )
+
+
+def distance_matrix(sequences, n_jobs=-1, joint=True):
+    """
+    Compute pairwise ETC distances between all sequences in a collection.
+
+    The distance between sequences S1 and S2 is
+        0.5 * (ETC(S1 + S2) + ETC(S2 + S1) - ETC(S1) - ETC(S2))
+    as in _compute_distance, with ETC estimated using NSRPS (order 2, truncated). Each
+    sequence is recoded and its ETC computed only once, such that only the 2*C(N,2)
+    concatenations are estimated pairwise.
+
+    Parameters
+    ----------
+    sequences : list or tuple
+        Collection of N strings or integer sequences.
+    n_jobs : int, optional
+        Number of parallel workers passed on to joblib. The default is -1 (all cores).
+    joint : bool, optional
+        Whether to recode strings over the alphabet shared by all sequences, such that
+        a character maps to the same symbol in every sequence. Set to False to recode
+        each string over its own alphabet, reproducing _compute_distance.
+        The default is True.
+
+    Returns
+    -------
+    np.ndarray or None
+        Condensed distance vector of length N*(N-1)/2, ordered as expected by
+        scipy.spatial.distance.squareform and scipy.cluster.hierarchy.linkage.
+
+    """
+    # Recode every sequence once
+    recoded = _recode_all(sequences, joint)
+    if recoded is None:
+        print("> ERROR: Sequences could not be recoded")
+        return None
+    recoded, _ = recoded
+
+    # Compute ETC once per sequence
+    single = Parallel(n_jobs=n_jobs)(delayed(_compute_single)(seq) for seq in recoded)
+    single = np.array(single, dtype="float64")
+
+    # Compute ETC for both concatenations of each pair, in condensed order
+    pairs = list(combinations(range(len(recoded)), 2))
+    joint_etc = Parallel(n_jobs=n_jobs)(
+        delayed(_compute_concatenated)(recoded[i], recoded[j]) for i, j in pairs
+    )
+
+    # Assemble condensed distance vector
+    if not pairs:
+        return np.zeros(0, dtype="float64")
+    idx_i, idx_j = np.array(pairs).T
+    joint_etc = np.array(joint_etc, dtype="float64")
+
+    return 0.5 * (joint_etc.sum(axis=1) - single[idx_i] - single[idx_j])
+
+
+def build_index(references, labels=None, n_jobs=-1):
+    """
+    Build a reference index for nearest-neighbour search over ETC distance.
+
+    Each reference is recoded once over the alphabet shared by all references and its
+    ETC is computed once, such that queries only need to estimate concatenations.
+
+    Parameters
+    ----------
+    references : list or tuple
+        Collection of reference strings or integer sequences.
+    labels : list or tuple, optional
+        Class label of each reference. The default is None, using positions.
+    n_jobs : int, optional
+        Number of parallel workers passed on to joblib. The default is -1 (all cores).
+
+    Returns
+    -------
+    dict or None
+        Index holding recoded references, their ETC, labels and the alphabet as
+        sorted code points (None unless all references are strings).
+
+    """
+    if labels is None:
+        labels = list(range(len(references)))
+
+    assert len(labels) == len(references), "ERROR: Labels and references differ in size"
+
+    # Recode every reference once, over the alphabet shared by all
+    recoded = _recode_all(references, joint=True)
+    if recoded is None:
+        print("> ERROR: References could not be recoded")
+        return None
+    recoded, alphabet = recoded
+
+    # Compute ETC once per reference
+    single = Parallel(n_jobs=n_jobs)(delayed(_compute_single)(seq) for seq in recoded)
+
+    return {
+        "sequences": recoded,
+        "etc": np.array(single, dtype="float64"),
+        "labels": list(labels),
+        "alphabet": alphabet,
+    }
+
+
+def _recode_query(index, seq):
+    """
+    Recode a query sequence consistently with the references of an index
+
+    Characters absent from the references are mapped to fresh symbols, following
+    those of the references in sorted order.
+
+    Parameters
+    ----------
+    index : dict
+        Reference index, as returned by build_index().
+    seq : str, list or tuple
+        Query string or integer sequence.
+
+    Returns
+    -------
+    np.ndarray or None
+        Recoded query, None if it could not be recoded.
+
+    """
+    alphabet = index["alphabet"]
+
+    if alphabet is None or not isinstance(seq, str):
+        seq = cast(seq)
+    else:
+        points = _code_points(seq)
+        unseen = np.setdiff1d(points, alphabet)
+
+        # Position in the alphabet if seen, else after it among the unseen
+        seq = np.where(
+            np.isin(points, alphabet),
+            np.searchsorted(alphabet, points),
+            len(alphabet) + np.searchsorted(unseen, points),
+        ).astype("uint32") + 1
+
+    if seq is None:
+        return None
+
+    # View array.array buffers as NumPy arrays without copying
+    if not isinstance(seq, np.ndarray):
+        seq = np.frombuffer(seq, dtype="uint32")
+
+    return seq
+
+
+def query(index, seq, k=1, n_jobs=-1, batch_size=None, prune=True):
+    """
+    Find the k nearest references to a query sequence by ETC distance.
+
+    References are visited in increasing order of a cheap lower bound on their
+    distance, 0.5 * |ETC(query) - ETC(reference)|, and their concatenation ETCs are
+    evaluated in parallel batches. Search stops as soon as the k-th best distance
+    found so far is no larger than the bound of the next candidate.
+
+    The bound holds whenever the ETC of a concatenation is at least the ETC of either
+    part. This is nearly always the case but is not guaranteed by NSRPS, so pruning
+    is a heuristic: set prune=False for an exhaustive search.
+
+    Parameters
+    ----------
+    index : dict
+        Reference index, as returned by build_index().
+    seq : str, list or tuple
+        Query string or integer sequence.
+    k : int, optional
+        Number of neighbours to return. The default is 1.
+    n_jobs : int, optional
+        Number of parallel workers passed on to joblib. The default is -1 (all cores).
+    batch_size : int, optional
+        Number of candidates evaluated per parallel batch. The default is None, which
+        uses 4 times the number of workers.
+    prune : bool, optional
+        Whether to stop early using the lower bound. The default is True.
+
+    Returns
+    -------
+    list of dict elements or None
+        Nearest references ordered by distance, each with position, label & distance.
+
+    """
+    # Recode the query and compute its ETC once
+    seq = _recode_query(index, seq)
+    if seq is None:
+        print("> ERROR: Query could not be recoded")
+        return None
+    etc_query = _compute_single(seq)
+
+    # Order candidates by their lower bound on distance
+    bounds = 0.5 * np.abs(index["etc"] - etc_query)
+    order = np.argsort(bounds, kind="stable")
+
+    if batch_size is None:
+        batch_size = 4 * effective_n_jobs(n_jobs)
+
+    # Max-heap of the k best (negated distance, position) found so far
+    best = []
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for start in range(0, len(order), batch_size):
+
+            # Stop if no remaining candidate can beat the current k-th best
+            if prune and len(best) == k and -best[0][0] <= bounds[order[start]]:
+                break
+
+            batch = order[start : start + batch_size].tolist()
+            references = [index["sequences"][n] for n in batch]
+            out = parallel(
+                delayed(_compute_concatenated)(seq, ref) for ref in references
+            )
+
+            # Update the k best with distances from this batch
+            for n, (etc_qr, etc_rq) in zip(batch, out):
+                dist = 0.5 * (etc_qr + etc_rq - etc_query - float(index["etc"][n]))
+                if len(best) < k:
+                    heappush(best, (-dist, -n))
+                elif -dist > best[0][0]:
+                    heappushpop(best, (-dist, -n))
+
+    # Order neighbours by distance, then by position
+    neighbours = sorted((-dist, -n) for dist, n in best)
+
+    return [
+        {"index": n, "label": index["labels"][n], "distance": dist}
+        for dist, n in neighbours
+    ]
+
+
+def classify(index, seq, k=1, n_jobs=-1):
+    """
+    Assign the most common label among the k nearest references to a query.
+
+    Ties are broken in favour of the label of the nearer reference.
+
+    Parameters
+    ----------
+    index : dict
+        Reference index, as returned by build_index().
+    seq : str, list or tuple
+        Query string or integer sequence.
+    k : int, optional
+        Number of neighbours voting. The default is 1.
+    n_jobs : int, optional
+        Number of parallel workers passed on to joblib. The default is -1 (all cores).
+
+    Returns
+    -------
+    object or None
+        Predicted label.
+
+    """
+    neighbours = query(index, seq, k=k, n_jobs=n_jobs)
+    if not neighbours:
+        return None
+
+    return Counter(elem["label"] for elem in neighbours).most_common(1)[0][0]
+
+
 def _overlapping_chunks(seq, size, offset=1):
     """
     This function takes an input sequence and produces chunks of chosen size.
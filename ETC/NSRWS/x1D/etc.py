@@ -9,8 +9,8 @@
 from ETC.seq import estimates as ce
 from ETC.seq.recode import cast
 from ETC.seq.IO import save
-from ETC.NSRWS.x1D import core as cc
-from ETC.NSRWS.x1D.onestep import _onestep
+from ETC.seq.memo import memoize
+from ETC.NSRWS.x1D.onestep import _all_equal, _dense_pairs, _onestep
 
 
 def _compute_verbose_truncated(seq, order=2):
@@ -63,7 +63,7 @@ def _compute_verbose_truncated(seq, order=2):
     )
 
     # Check if all elements are equal and break if so
-    if cc.check_equality(seq):
+    if _all_equal(seq):
         return etc, output
 
     # Initialize a boolean for tracking truncation step
@@ -71,7 +71,7 @@ def _compute_verbose_truncated(seq, order=2):
 
     # Execute iteration loop until either all elements are equal or sequence is
     # reduced to less than size of the window being substituted (order)
-    while not signal and len(seq) >= order and not cc.check_equality(seq):
+    while not signal and len(seq) >= order and not _all_equal(seq):
 
         # Run one step of NSRWS in verbose mode (returns window and count)
         seq, signal, freq_win, count, time = _onestep(seq, order, verbose=True)
@@ -93,7 +93,7 @@ def _compute_verbose_truncated(seq, order=2):
 
     if signal:  # Run 5 times for estimating entropy
         n = 0
-        while len(seq) >= order and not cc.check_equality(seq) and n < 5:
+        while len(seq) >= order and not _all_equal(seq) and n < 5:
 
             # Run one step of NSRWS in verbose mode (returns window and count)
             seq, signal, freq_win, count, time = _onestep(seq, order, verbose=True)
@@ -175,12 +175,12 @@ def _compute_verbose_full(seq, order=2):
     )
 
     # Check if all elements are equal and break if so
-    if cc.check_equality(seq):
+    if _all_equal(seq):
         return etc, output
 
     # Execute iteration loop until either all elements are equal or sequence is
     # reduced to less than size of the window being substituted (order)
-    while len(seq) >= order and not cc.check_equality(seq):
+    while len(seq) >= order and not _all_equal(seq):
 
         # Run one step of NSRWS in verbose mode (returns window and count)
         seq, signal, freq_win, count, time = _onestep(seq, order, verbose=True)
@@ -232,15 +232,19 @@ def _compute_compact_truncated(seq, order=2):
     etc = 0
 
     # Check if all elements are equal and break if so
-    if cc.check_equality(seq):
+    if _all_equal(seq):
         return etc
 
+    # Run early steps of NSRPS on dense pair counts while the alphabet is small
+    if order == 2:
+        seq, etc = _dense_pairs(seq)
+
     # Initialize a boolean for tracking truncation step
     signal = False
 
     # Execute iteration loop until either all elements are equal or sequence is
     # reduced to less than size of the window being substituted (order)
-    while not signal and len(seq) >= order and not cc.check_equality(seq):
+    while not signal and len(seq) >= order and not _all_equal(seq):
 
         # Run one step of NSRWS
         seq, signal = _onestep(seq, order, verbose=False)
@@ -303,12 +307,16 @@ def _compute_compact_full(seq, order=2):
     etc = 0
 
     # Check if all elements are equal and break if so
-    if cc.check_equality(seq):
+    if _all_equal(seq):
         return etc
 
+    # Run early steps of NSRPS on dense pair counts while the alphabet is small
+    if order == 2:
+        seq, etc = _dense_pairs(seq)
+
     # Execute iteration loop until either all elements are equal or sequence is
     # reduced to less than size of the window being substituted (order)
-    while len(seq) >= order and not cc.check_equality(seq):
+    while len(seq) >= order and not _all_equal(seq):
 
         # Run one step of NSRWS
         seq, signal = _onestep(seq, order, verbose=False)
@@ -321,7 +329,106 @@ def _compute_compact_full(seq, order=2):
     return etc
 
 
-def compute(seq, order=2, verbose=False, truncate=True):
+def _remaining(length, order=2):
+    """
+    Upper bound on the number of NSRWS steps left for a sequence of given length.
+
+    Each step shortens the sequence by at least (order - 1) elements, and the
+    iteration stops once it is shorter than the window being substituted.
+
+    Parameters
+    ----------
+    length : int
+        Length of the sequence.
+    order : int, optional
+        Number of elements in window for substitution.
+        The default is 2 for pairs.
+
+    Returns
+    -------
+    int
+        Largest number of steps that can still be taken.
+
+    """
+    if length < order:
+        return 0
+
+    return (length - order) // (order - 1) + 1
+
+
+def _compute_compact_bounded(
+    seq, order=2, truncate=True, max_steps=None, stop_when=None
+):
+    """
+    This function runs the NSRWS algorithm for estimation of ETC, like the other
+    compact versions, but stops as soon as a budget of steps is spent or the
+    estimate is known to lie on either side of a cutoff.
+
+    Before each step, the final estimate is bounded below by one more than the
+    steps taken so far, and above by adding the most steps the current length
+    allows (see _remaining). If the iteration runs to completion, both bounds
+    equal the ETC estimate.
+
+    Parameters
+    ----------
+    seq : list or tuple
+        Sequence of integers.
+    order : int, optional
+        Number of elements in window for substitution.
+        The default is 2 for pairs.
+    truncate: bool, optional
+        Whether to halt iterative estimation once fully saturated 'axiom' has been
+        reached. The default is True.
+    max_steps : int, optional
+        Largest number of steps to take. The default is None, for no budget.
+    stop_when : int, optional
+        Cutoff on ETC: stop once the estimate is known to exceed it (lower bound
+        greater than cutoff) or not (upper bound less than or equal to cutoff).
+        The default is None, for no cutoff.
+
+    Returns
+    -------
+    lower : int
+        Lower bound on the Effort-To-Compress estimate for given seq and order.
+    upper : int
+        Upper bound on the Effort-To-Compress estimate for given seq and order.
+    stopped : bool
+        Whether iteration stopped before completion.
+
+    """
+    # Initialize ETC to 0 & a boolean for tracking truncation step
+    etc = 0
+    signal = False
+
+    # Execute iteration loop until either all elements are equal or sequence is
+    # reduced to less than size of the window being substituted (order)
+    while len(seq) >= order and not _all_equal(seq):
+
+        # All windows are distinct, remaining steps follow in closed form
+        if truncate and signal:
+            etc += _compute_compact_truncated(seq, order)
+            break
+
+        # Bound the final estimate & stop if budget is spent or cutoff is decided
+        lower, upper = etc + 1, etc + _remaining(len(seq), order)
+        if (max_steps is not None and etc >= max_steps) or (
+            stop_when is not None and (lower > stop_when or upper <= stop_when)
+        ):
+            return lower, upper, True
+
+        # Run one step of NSRWS
+        seq, signal = _onestep(seq, order, verbose=False)
+
+        # Increment ETC
+        etc += 1
+
+    return etc, etc, False
+
+
+@memoize("compute_1D")
+def compute(
+    seq, order=2, verbose=False, truncate=True, max_steps=None, stop_when=None
+):
     """
     Estimate the Effort-To-Compress for a given sequence using the NSRPS algorithm.
 
@@ -339,16 +446,37 @@ def compute(seq, order=2, verbose=False, truncate=True):
         Whether to compute additional metrics. The default is True.
     truncate: bool, optional
         Whether to halt iterative estimation once fully saturated 'axiom' has been reached
+    max_steps : int, optional
+        Largest number of steps to take before stopping early. Implies compact mode,
+        verbose is ignored. The default is None, for no budget.
+    stop_when : int, optional
+        Cutoff on ETC: stop early once the estimate is known to exceed it or not.
+        Implies compact mode, verbose is ignored. The default is None, for no cutoff.
 
     Returns
     -------
     dict
         ETC1D (int), NETC1D (float) & optionally, trajectory of algorithm if verbose=True
+        If max_steps or stop_when is given, also whether iteration stopped early
+        (Stopped) and bounds on ETC1D (Bounds). If stopped early, ETC1D is the
+        lower bound.
 
     """
     # Create a copy of the original sequence with the appropriate type
     seq = cast(seq)
 
+    # If budget or cutoff is given, run the bounded compact version and return
+    if max_steps is not None or stop_when is not None:
+        lower, upper, stopped = _compute_compact_bounded(
+            seq, order, truncate, max_steps, stop_when
+        )
+        return {
+            "ETC1D": lower,
+            "NETC1D": lower / (len(seq) - 1),
+            "Stopped": stopped,
+            "Bounds": (lower, upper),
+        }
+
     if truncate:
         # If verbose, run the verbose version and return accordingly
         if verbose:
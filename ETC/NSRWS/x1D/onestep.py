@@ -9,10 +9,37 @@ from collections import Counter
 from itertools import compress, islice
 from time import perf_counter
 
+from ETC.NSRWS import instrument
 from ETC.NSRWS.x1D import core
 from ETC.seq.recode import cast
 from ETC.seq.check import arraytype
 
+# Largest alphabet (largest symbol + 1) for which NSRPS counts pairs in a dense table
+DENSE_ALPHABET = 256
+
+
+def _all_equal(seq):
+    """
+    Check whether all symbols in a sequence are equal, timed if instrumentation is on
+
+    Parameters
+    ----------
+    seq : array.array
+        Discrete symbolic sequence containing 32-bit unsigned integers.
+
+    Returns
+    -------
+    bool
+        True if all symbols are equal.
+
+    """
+    timer = instrument.start()
+    equal = core.check_equality(seq)
+    if timer is not None:
+        instrument.mark("1D", "equality", timer)
+
+    return equal
+
 
 def _mask_and_count(seq, mask, order):
     """
@@ -102,10 +129,13 @@ def _onestep_pairs(seq, verbose=True):
     """
     Execute one full step of NSRPS (NSRWS with order=2) for a given sequence
 
-    Makes use of 2 functions written in Cython & _mask_and_count in the following steps:
-        1. Find overlapping pairs & store their indices for masking -> get_mask_pairs()
-        2. Apply the mask and find most frequent pair -> _mask_and_count()
-        3. Substitute all occurrences of the most frequent pair -> substitute_pairs()
+    Makes use of 2 functions written in Cython in the following steps:
+        1. Count non-overlapping pairs & find the most frequent one -> count_pairs()
+        2. Substitute all occurrences of the most frequent pair -> substitute_pairs()
+
+    count_pairs() gives the same pair & count as masking with get_mask_pairs()
+    followed by _mask_and_count(). It relabels symbols to the few that are still
+    live, so that pairs are counted in an array instead of a Counter of tuples.
 
     This function is different from _onestep_windows because:
         1. It is *much* faster due to fewer nested loops
@@ -115,8 +145,6 @@ def _onestep_pairs(seq, verbose=True):
     The implementation will benefit from:
         1. Decorators for timing
         2. Decorators for verbosity of output
-        3. Cython implementation of the slowest part: _mask_and_count
-            problem: counting windows in C?
 
     Parameters
     ----------
@@ -152,26 +180,38 @@ def _onestep_pairs(seq, verbose=True):
     # Initialize timer
     before = perf_counter()
 
+    # Initialize phase timer, None if instrumentation is disabled
+    timer = instrument.start()
+
     # Initialize signal for tracking sequence state with all distinct pairs
     signal = False
 
-    # Compute mask for overlapping pairs
-    mask = core.get_mask_pairs(seq)
-
-    # Apply mask and find most frequent pair
-    freq_pair, count = _mask_and_count(seq, mask, 2)
+    # Count non-overlapping pairs and find the most frequent one
+    start, count = core.count_pairs(seq)
+    freq_pair = cast(seq[start : start + 2])
+    if timer is not None:
+        timer = instrument.mark("1D", "count", timer)
 
     # Get value for substitution of the most frequent pair with
     sub_value = 1 + max(seq)
+    if timer is not None:
+        timer = instrument.mark("1D", "maximum", timer)
 
     # If all distinct pairs, substitute the first one & set signal to True
     if count == 1:
         out = cast(seq[1:])
         out[0] = sub_value
         signal = True
+        if timer is not None:
+            instrument.mark("1D", "cast", timer)
     # Else, substitute all instances of the frequent pair
     else:
-        out = cast(core.substitute_pairs(seq, freq_pair, sub_value))
+        out = core.substitute_pairs(seq, freq_pair, sub_value)
+        if timer is not None:
+            timer = instrument.mark("1D", "substitute", timer)
+        out = cast(out)
+        if timer is not None:
+            instrument.mark("1D", "cast", timer)
 
     # Completion timer
     after = perf_counter()
@@ -189,22 +229,18 @@ def _onestep_windows(seq, order, verbose=True):
     """
     Execute one full step of NSRWS with order>=2 for a given sequence
 
-    Makes use of 2 functions written in Cython & _mask_and_count in the following steps:
-        1. Find overlapping windows & store their indices as mask -> get_mask_windows()
-        2. Apply the mask and find most frequent window -> _mask_and_count()
-        3. Substitute all occurrences of most frequent window -> substitute_windows()
+    Makes use of 2 functions written in Cython in the following steps:
+        1. Count non-overlapping windows & find the most frequent one -> count_windows()
+        2. Substitute all occurrences of most frequent window -> substitute_windows()
+
+    count_windows() gives the same window & count as masking with get_mask_windows()
+    followed by _mask_and_count(), in a single pass with a rolling hash.
 
     This function is different from _onestep_pairs because:
-        1. This is slower due to more nested loops and checks
+        1. This does more work per window, hashing & comparing whole windows
         2. Of course, it handles the generalized case for different window orders
         3. For higher window orders, correctness needs to be proved outside of tests
 
-    The implementation will benefit from:
-        1. Decorators for timing
-        2. Decorators for verbosity of output
-        3. Cython implementation of the slowest part: _mask_and_count
-            problem: counting windows in C?
-
     Parameters
     ----------
     seq : array.array
@@ -241,26 +277,38 @@ def _onestep_windows(seq, order, verbose=True):
     # Initialize timer
     before = perf_counter()
 
+    # Initialize phase timer, None if instrumentation is disabled
+    timer = instrument.start()
+
     # Initialize signal for tracking sequence state with all distinct windows
     signal = False
 
-    # Compute mask for overlapping windows
-    mask = core.get_mask_windows(seq, order)
-
-    # Apply mask and find most frequent window
-    freq_window, count = _mask_and_count(seq, mask, order)
+    # Count non-overlapping windows and find the most frequent one
+    start, count = core.count_windows(seq, order)
+    freq_window = cast(seq[start : start + order])
+    if timer is not None:
+        timer = instrument.mark("1D", "count", timer)
 
     # Get value for substitution of the most frequent window with
     sub_value = 1 + max(seq)
+    if timer is not None:
+        timer = instrument.mark("1D", "maximum", timer)
 
     # If all distinct windows, substitute the first one & set signal to True
     if count == 1:
         out = cast(seq[order - 1 :])
         out[0] = sub_value
         signal = True
+        if timer is not None:
+            instrument.mark("1D", "cast", timer)
     # Else, substitute all instances of the frequent window
     else:
-        out = cast(core.substitute_windows(seq, order, freq_window, sub_value))
+        out = core.substitute_windows(seq, order, freq_window, sub_value)
+        if timer is not None:
+            timer = instrument.mark("1D", "substitute", timer)
+        out = cast(out)
+        if timer is not None:
+            instrument.mark("1D", "cast", timer)
 
     # Completion timer
     after = perf_counter()
@@ -273,6 +321,39 @@ def _onestep_windows(seq, order, verbose=True):
     return out, signal
 
 
+def _dense_pairs(seq):
+    """
+    Execute steps of NSRPS (NSRWS with order=2) natively while the alphabet is small
+
+    Symbols are packed one per byte and pairs are counted in a dense table of size
+    alphabet x alphabet, instead of masking and counting tuples with a Counter. Steps
+    are identical to those of _onestep_pairs. Stops before a step that would grow the
+    alphabet past DENSE_ALPHABET or past the square root of the sequence length, or
+    that has all pairs distinct, leaving the rest to the general engine.
+
+    Parameters
+    ----------
+    seq : array.array
+        Discrete symbolic sequence containing 32-bit unsigned integers.
+
+    Returns
+    -------
+    seq : array.array
+        Discrete symbolic sequence containing 32-bit unsigned integers, after the
+        steps taken.
+
+    steps : int
+        Number of steps taken, 0 if symbols are too large to begin with.
+
+    """
+    timer = instrument.start()
+    seq, steps = core.dense_pairs(seq, DENSE_ALPHABET)
+    if timer is not None:
+        instrument.mark("1D", "dense", timer)
+
+    return seq, steps
+
+
 def _onestep(seq, order, verbose=True):
     """
     Wrapper that switches routine (pairs vs windows) depending on order
@@ -12,14 +12,16 @@ from itertools import islice
 from multiprocessing import Pool
 
 # Import local modules
-import ETC
+from ETC.seq import IO
 from ETC.seq.process import entropy
+from ETC.seq.recode import recode_lexical
+from ETC.NSRWS.x1D.etc import compute, compute_save
 
 # from ETC.seq.process import entropy
 import numpy as np
 
 # Function definitions
-def _compute_single_file(filepath, order=2):
+def _compute_single_file(filepath, order=2, fmt=None):
     """
     This function operates on a single file - reads sequence, computes ETC
     and writes to disk.
@@ -27,7 +29,13 @@ def _compute_single_file(filepath, order=2):
     Parameters
     ----------
     filepath : str or Path object
-        Valid path to a file containing sequence.
+        Valid path to a file containing sequence, or to a binary sequence store
+        (suffix ".etcseq") written by ETC.seq.IO.write_store().
+    order : int, optional
+        Number of elements in window for substitution. The default is 2.
+    fmt : str, optional
+        Format passed on to ETC.seq.IO.stream() for reading the file in blocks and
+        recoding it lexically. The default is None, reading the whole file as text.
 
     Returns
     -------
@@ -35,9 +43,14 @@ def _compute_single_file(filepath, order=2):
         filename, length of sequence and ETC estimate.
 
     """
-    # Read file as a sequence
-    seq = ETC.seq.IO.read(filepath)
-    seq = ETC.seq.recode.recode_lexical(seq)
+    # Read file as a sequence: open stores directly, stream if a format is given
+    if filepath.suffix == IO.STORE_SUFFIX:
+        seq = IO.open_store(filepath)
+    elif fmt is None:
+        seq = IO.read(filepath)
+        seq = recode_lexical(seq)
+    else:
+        seq = IO.read_recoded(filepath, fmt=fmt)
 
     # Filename for writing output of ETC computation
     fname = filepath.with_name(filepath.stem + f"_ETC_order{order}.csv")
@@ -46,12 +59,12 @@ def _compute_single_file(filepath, order=2):
     out = {"file": filepath.name, "length": len(seq), "entropy": entropy(seq)}
 
     # Compute ETC, write to file and update output dictionary
-    out.update(ETC.NSRWS.x1D.etc.compute_save(seq, fname, order=order, truncate=True))
+    out.update(compute_save(seq, fname, order=order, truncate=True))
 
     return out
 
 
-def pcompute_files(filelist, order=2):
+def pcompute_files(filelist, order=2, fmt=None):
     """
     This function operates concurrently on a list of files. Reads each as a
     sequence, computes ETC and writes output to disk.
@@ -63,6 +76,12 @@ def pcompute_files(filelist, order=2):
     ----------
     filelist : list/tuple/generator
         Collection of filenames of files containing sequence data.
+    order : int, optional
+        Number of elements in window for substitution. The default is 2.
+    fmt : str, optional
+        If given, files are streamed in blocks with ETC.seq.IO.read_recoded() in
+        this format ("fasta", "fastq", "text", "raw" or "auto"), which also handles
+        compressed files. The default is None, reading each file whole as text.
 
     Returns
     -------
@@ -72,7 +91,7 @@ def pcompute_files(filelist, order=2):
     """
     # Initialize pool of parallel workers
     pool = Pool()
-    func = partial(_compute_single_file, order=order)
+    func = partial(_compute_single_file, order=order, fmt=fmt)
     # Map-execute function across files
     out = pool.map_async(func, filelist)
 
@@ -84,7 +103,7 @@ def pcompute_files(filelist, order=2):
     return out.get()
 
 
-def _compute_single_seq(seq):
+def _compute_single_seq(seq, max_steps=None, stop_when=None):
     """
     This function operates on a single sequence and computes ETC.
 
@@ -94,6 +113,10 @@ def _compute_single_seq(seq):
         1st element is index for tracking.
         2nd element is a sequence of integers used for ETC computation.
         Output of enumerate.
+    max_steps : int, optional
+        Budget of steps, passed on to compute. The default is None.
+    stop_when : int, optional
+        Cutoff on ETC, passed on to compute. The default is None.
 
     Returns
     -------
@@ -105,7 +128,16 @@ def _compute_single_seq(seq):
     out = {"index": seq[0], "length": len(seq[1]), "entropy": entropy(seq[1])}
 
     # Compute ETC and update output dictionary
-    out.update(ETC.compute_1D(seq[1], order=2, verbose=False, truncate=True))
+    out.update(
+        compute(
+            seq[1],
+            order=2,
+            verbose=False,
+            truncate=True,
+            max_steps=max_steps,
+            stop_when=stop_when,
+        )
+    )
 
     return out
 
@@ -128,19 +160,19 @@ def _compute_single_seq(seq):
 #         index of sequence, length of sequence and ETC estimate.
 
 #     """
-#     data = ETC.seq.recode.recode_lexical(seq[1])
+#     data = recode_lexical(seq[1])
 
 #     # Prepare output dictionary
 #     out = {"item": seq[0], "length": len(data)}
 
 #     # Compute ETC and update output dictionary
-#     out.update(ETC.compute_1D(data, order=2, verbose=False, truncate=True))
+#     out.update(compute(data, order=2, verbose=False, truncate=True))
 #     out.update({"Entropy": entropy(data, legacy=False)})
 
 #     return out
 
 
-def pcompute_multiple_seq(iterable):
+def pcompute_multiple_seq(iterable, processes=None, max_steps=None, stop_when=None):
     """
     This function operates concurrently on a collection of sequences. Loads
     each sequence and computes ETC.
@@ -152,6 +184,14 @@ def pcompute_multiple_seq(iterable):
     ----------
     iterable : list/tuple/generator
         Collection of integer sequences.
+    processes : int, optional
+        Number of worker processes. The default is None, using all available CPUs.
+    max_steps : int, optional
+        Stop estimation for a sequence after this many steps, see compute. The
+        default is None.
+    stop_when : int, optional
+        Stop estimation for a sequence once its ETC is known to exceed this cutoff
+        or not, see compute. The default is None.
 
     Returns
     -------
@@ -160,10 +200,13 @@ def pcompute_multiple_seq(iterable):
 
     """
     # Initialize pool of parallel workers
-    pool = Pool()
+    pool = Pool(processes)
 
     # Map-execute function across sequences
-    out = pool.map_async(_compute_single_seq, enumerate(iterable))
+    out = pool.map_async(
+        partial(_compute_single_seq, max_steps=max_steps, stop_when=stop_when),
+        enumerate(iterable),
+    )
 
     # Graceful exit
     pool.close()
@@ -223,7 +266,9 @@ def _non_overlapping_chunks(seq, size):
     return zip(*[iter(seq)] * size)
 
 
-def pcompute_single(seq, size, offset=1):
+def pcompute_single(
+    seq, size, offset=1, processes=None, max_steps=None, stop_when=None
+):
     """
     This function operates concurrently on chunks of a given sequence. Gets
     each chunk and computes ETC one-by-one. Offset parameter controls degree of
@@ -242,6 +287,14 @@ def pcompute_single(seq, size, offset=1):
         Number of elements to shift each chunk by. The default is 1.
         Setting this to any value less than size allows control of overlap.
         Setting this >= size produces non-overlapping chunks.
+    processes : int, optional
+        Number of worker processes. The default is None, using all available CPUs.
+    max_steps : int, optional
+        Stop estimation for a sequence after this many steps, see compute. The
+        default is None.
+    stop_when : int, optional
+        Stop estimation for a sequence once its ETC is known to exceed this cutoff
+        or not, see compute. The default is None.
 
     Returns
     -------
@@ -258,10 +311,10 @@ def pcompute_single(seq, size, offset=1):
         iterable = _overlapping_chunks(seq, size, offset)
 
     # Execute parallel computation over chunks
-    return pcompute_multiple_seq(iterable)
+    return pcompute_multiple_seq(iterable, processes, max_steps, stop_when)
 
 
-def pcompute_numpy(nparr):
+def pcompute_numpy(nparr, processes=None, max_steps=None, stop_when=None):
     """
     This function operates concurrently row-wise on a 2D NumPy array. Loads
     each sequence and computes ETC.
@@ -273,6 +326,14 @@ def pcompute_numpy(nparr):
     ----------
     nparr : numpy array, int, 2D
         Sequence present as column, each row representing a different sequence
+    processes : int, optional
+        Number of worker processes. The default is None, using all available CPUs.
+    max_steps : int, optional
+        Stop estimation for a sequence after this many steps, see compute. The
+        default is None.
+    stop_when : int, optional
+        Stop estimation for a sequence once its ETC is known to exceed this cutoff
+        or not, see compute. The default is None.
 
     Returns
     -------
@@ -284,11 +345,12 @@ def pcompute_numpy(nparr):
         isinstance(nparr, np.ndarray) and nparr.ndim == 2 and nparr.dtype == np.uint32
     ), ">ERROR: Input must be 2D NumPy array of 32-bit unsigned integers (np.uint32)"
     # Initialize pool of parallel workers
-    pool = Pool()
+    pool = Pool(processes)
 
     # Map-execute function across sequences
     out = pool.map_async(
-        _compute_single_seq, enumerate([nparr[idx] for idx in range(nparr.shape[0])])
+        partial(_compute_single_seq, max_steps=max_steps, stop_when=stop_when),
+        enumerate([nparr[idx] for idx in range(nparr.shape[0])]),
     )
 
     # Graceful exit
@@ -8,9 +8,12 @@
 """
 # Import stuff
 from cpython cimport array, bool
+from libc.stdlib cimport malloc, calloc, free
 cimport cython
 import array
 
+from ETC.NSRWS.common cimport HASH_BASE, HASH_SPREAD, _relabel, _count_codes
+
 # Function for getting mask for pairs
 cpdef array.array get_mask_pairs(const unsigned int[::1] x, const unsigned int[::1] y):
     """
@@ -58,6 +61,71 @@ cpdef array.array get_mask_pairs(const unsigned int[::1] x, const unsigned int[:
 
     return mask
 
+# Function for counting non-overlapping joint pairs over live joint symbols
+cpdef tuple count_pairs(const unsigned int[::1] x, const unsigned int[::1] y):
+    """
+    INPUT
+    -----
+    x : array.array
+        Array object containing 32-bit unsigned integers, at least 2 long.
+
+    y : array.array
+        Array object containing 32-bit unsigned integers, same length as x.
+
+    OUTPUT
+    ------
+    tuple of 2 ints
+        Index of the first occurrence of the most frequent joint pair, and the number
+        of times it occurs without overlapping itself.
+
+    Equivalent to counting joint pairs left unmasked by get_mask_pairs and picking the
+    most common one with ties broken by first occurrence. Symbols of x & y are each
+    relabelled to live symbols, which are combined & relabelled again to live joint
+    symbols, and pairs are counted in an array indexed by them, without hashing.
+    """
+    cdef Py_ssize_t x_size = x.shape[0]
+    cdef Py_ssize_t n, k_x, k_y, k
+    cdef unsigned long long top_x = 0, top_y = 0
+
+    if x_size < 2:
+        return 0, 0
+
+    # Buffers for symbols as keys, and live symbols of x, y & joint
+    cdef unsigned long long *keys = <unsigned long long *> malloc(
+        x_size * sizeof(unsigned long long)
+    )
+    cdef unsigned int *codes_x = <unsigned int *> malloc(x_size * sizeof(unsigned int))
+    cdef unsigned int *codes_y = <unsigned int *> malloc(x_size * sizeof(unsigned int))
+
+    try:
+        if not (keys and codes_x and codes_y):
+            raise MemoryError()
+
+        # Relabel x & y separately
+        for n in range(x_size):
+            keys[n] = x[n]
+            if x[n] > top_x:
+                top_x = x[n]
+        k_x = _relabel(keys, x_size, top_x, codes_x)
+
+        for n in range(x_size):
+            keys[n] = y[n]
+            if y[n] > top_y:
+                top_y = y[n]
+        k_y = _relabel(keys, x_size, top_y, codes_y)
+
+        # Combine into joint keys & relabel these
+        for n in range(x_size):
+            keys[n] = <unsigned long long> codes_x[n] * k_y + codes_y[n]
+        k = _relabel(keys, x_size, <unsigned long long> k_x * k_y - 1, codes_x)
+
+        return _count_codes(codes_x, x_size, k)
+
+    finally:
+        free(keys)
+        free(codes_x)
+        free(codes_y)
+
 # Function for substituting pairs (old non-ideal version, uses for loop)
 # cpdef substitute_pairs_old(unsigned int[::1] x, unsigned int[::1] y, unsigned int[::1] pair_x, unsigned int[::1] pair_y, unsigned int value_x, unsigned int value_y):
 #     """
@@ -195,144 +263,271 @@ cpdef bint check_equality(const unsigned int[::1] x, const unsigned int[::1] y):
 
     return True
 
-# # Function for getting mask for windows of any length
-# cpdef array.array get_mask_windows(const unsigned int[::1] x, unsigned int order):
-#     """
-#     INPUT
-#     -----
-#     x : array.array
-#         Array object containing 32-bit integers.
-
-#     order: unsigned 32-bit int
-#         Length of the window to slide across input
-
-#     OUTPUT
-#     ------
-#     mask : array.array
-#         Array object containing 32-bit integers - 0s or 1s corresponding to values in
-#         x for which successive overlapping pairs occur.
-#     """
-#     # Get size of input
-#     cdef Py_ssize_t x_size = len(x)
-
-#     # Initialize a mask of Falses
-#     cdef array.array int_template = array.array('I', [])
-#     cdef array.array mask = array.clone(int_template, x_size, zero=True)
-#     cdef unsigned int[:] mask_view = mask
-
-#      # Initialize variable for iteration
-#     cdef Py_ssize_t n = 0
-
-#     # Turn all values in mask to Trues
-#     for n in range(x_size):
-#         mask_view[n] += 1
-
-#     # Initialize variables for iteration across input
-#     cdef Py_ssize_t k = 0 # Outer loop
-#     cdef Py_ssize_t m = 0 # Inner loop
-
-#     # Tracking variable for counting matching elements in pairwise window comparison
-#     cdef unsigned int track = 0
-
-#     # Iterate over input values except the last 'order' values [Outermost master loop]
-#     n = 0
-#     for n in range(x_size-order):
-
-#         # proceed only if mask is True for current element
-#         if mask_view[n]:
-
-#             # Outer loop for sliding the 'next' window by unit step (current vs next)
-#             for k in range(1,order):  # Start from 1 - begin comparing from next window
+# Function for getting mask for joint windows of any length
+cpdef array.array get_mask_windows(const unsigned int[::1] x, const unsigned int[::1] y, unsigned int order):
+    """
+    INPUT
+    -----
+    x : array.array
+        Array object containing 32-bit integers.
 
-#                 # Inner loop for comparing elements in current and next windows
-#                 for m in range(order):
+    y : array.array
+        Array object containing 32-bit integers, same length as x.
 
-#                     # If elements match, increment tracker
-#                     if x[n+m] == x[n+m+k]:
-#                         track += 1
+    order: unsigned 32-bit int
+        Length of the window to slide across input
 
-#                     # Else stop iteration over this comparison of windows
-#                     else:
-#                         break
+    OUTPUT
+    ------
+    mask : array.array
+        Array object containing 32-bit integers - 0s or 1s corresponding to joint
+        windows of x & y which overlap an identical, unmasked window before them.
+    """
+    # Get size of input
+    cdef Py_ssize_t x_size = len(x)
 
-#                 # Trick: preserve mask only if track doesn't equal order
-#                 # If track == order, short-circuit eval takes precedence, returning 0
-#                 mask_view[n+k] = track!=order and mask_view[n+k]
+    # Initialize a mask of Trues
+    cdef array.array int_template = array.array('I', [])
+    cdef array.array mask = array.clone(int_template, x_size - (order-1), zero=True)
+    cdef unsigned int[:] mask_view = mask
 
-#                 # Reset tracker
-#                 track = 0
+    # Initialize variables for iteration
+    cdef Py_ssize_t n, k, m
 
-#     return mask
+    for n in range(x_size - order + 1):
+        mask_view[n] = 1
 
-# # Function for substituting windows of any length
-# cpdef list substitute_windows(unsigned int[::1] x, unsigned int order, unsigned int[::1] window, unsigned int value):
-#     """
-#     INPUT
-#     -----
-#     x : array.array
-#         Array object containing 32-bit unsigned integers.
+    # Iterate over starting indices of windows
+    for n in range(x_size - (order-1)):
 
-#     order: unsigned 32-bit int
-#         Length of the window to slide across input
+        # proceed only if mask is True for current window
+        if mask_view[n]:
 
-#     window : array.array, length = 2
-#         Array object containing 2 32-bit unsigned integers.
+            # Compare with each following window that overlaps it
+            for k in range(1, order):
 
-#     value : unsigned 32-bit int
-#         Value to substitute the first element of pair with
+                # Same early exit as 1D: stop once windows run past the end of input
+                if n + k + order - 1 >= x_size:
+                    return mask
 
-#     OUTPUT
-#     ------
-#     out : list
-#         Array object containing 32-bit integers, with supplied pair replaced everywhere
-#         by the supplied value.
-#     """
-#     # Initialize looping variables and output list
-#     cdef Py_ssize_t n = 0 # Outer loop
-#     cdef Py_ssize_t m = 0 # Inner loop
-#     cdef Py_ssize_t x_size = len(x)
-#     cdef list out = []
+                # Compare element-wise, both in x & y
+                m = 0
+                while m < order and x[n+m] == x[n+m+k] and y[n+m] == y[n+m+k]:
+                    m += 1
 
-#     # Tracking variable for counting matching elements in pairwise window comparison
-#     cdef unsigned int track = 0
+                # Mask out identical overlapping window
+                if m == order:
+                    mask_view[n+k] = 0
 
-#     # Iterate over input values except one less than the last 'order' values
-#     # Logic: last window, say triplet must begin from 3rd-last index, leaving 2 values
-#     for n in range(x_size-order+1):
+    return mask
 
-#         # Slide window of given order and do element-wise comparison
-#         for m in range(order):
+# Function for counting non-overlapping joint windows of any length in a single pass
+cpdef tuple count_windows(const unsigned int[::1] x, const unsigned int[::1] y, unsigned int order):
+    """
+    INPUT
+    -----
+    x : array.array
+        Array object containing 32-bit unsigned integers, at least order long.
 
-#             # Reset tracker
+    y : array.array
+        Array object containing 32-bit unsigned integers, same length as x.
 
+    order: unsigned 32-bit int
+        Length of the window to slide across input
 
-#             # Track comparison of input elements with window elements
-#             if x[n+m] == window[m]:
-#                 track += 1
-#             # # If mismatch, break
-#             else:
-#                 break
+    OUTPUT
+    ------
+    tuple of 2 ints
+        Index of the first occurrence of the most frequent joint window, and the number
+        of times it occurs without overlapping itself.
+
+    Equivalent to counting windows left unmasked by get_mask_windows and picking the
+    most common one with ties broken by first occurrence. Each pair of symbols is
+    packed into a single 64-bit joint symbol, and windows of joint symbols are
+    counted as in the 1D count_windows.
+    """
+    # Number of windows and index beyond which get_mask_windows exits early
+    cdef Py_ssize_t n_windows = x.shape[0] - order + 1
+    cdef Py_ssize_t cutoff = n_windows - order + 1
+
+    # Table size: smallest power of 2 at least twice the number of windows
+    cdef int shift = 64
+    cdef Py_ssize_t capacity = 1
+    while capacity < 2 * n_windows:
+        capacity <<= 1
+        shift -= 1
+    cdef Py_ssize_t slot_mask = capacity - 1
+
+    # Table slots: hash, first occurrence, last counted occurrence & count per window
+    cdef unsigned long long *hashes = <unsigned long long *> malloc(
+        capacity * sizeof(unsigned long long)
+    )
+    cdef Py_ssize_t *first = <Py_ssize_t *> malloc(capacity * sizeof(Py_ssize_t))
+    cdef Py_ssize_t *last = <Py_ssize_t *> malloc(capacity * sizeof(Py_ssize_t))
+    cdef Py_ssize_t *counts = <Py_ssize_t *> malloc(capacity * sizeof(Py_ssize_t))
+
+    # Initialize looping variables
+    cdef Py_ssize_t n, m, slot
+    cdef unsigned long long h = 0, lead = 1
+    cdef bint frozen = False
+    cdef Py_ssize_t best_first = 0, best_count = 0
+
+    try:
+        if not (hashes and first and last and counts):
+            raise MemoryError()
+
+        for slot in range(capacity):
+            first[slot] = -1
+
+        # Hash of the first window, and place value of its leading joint symbol
+        for m in range(order):
+            h = h * HASH_BASE + ((<unsigned long long> x[m] << 32) | y[m])
+            if m:
+                lead *= HASH_BASE
+
+        for n in range(n_windows):
+
+            # Roll hash over by one joint symbol
+            if n:
+                h = (
+                    (h - ((<unsigned long long> x[n - 1] << 32) | y[n - 1]) * lead)
+                    * HASH_BASE
+                    + ((<unsigned long long> x[n + order - 1] << 32) | y[n + order - 1])
+                )
+
+            # Find slot of this window, probing linearly past collisions
+            slot = <Py_ssize_t> ((h * HASH_SPREAD) >> shift)
+            while first[slot] != -1:
+                if hashes[slot] == h:
+                    m = 0
+                    while (
+                        m < order
+                        and x[first[slot] + m] == x[n + m]
+                        and y[first[slot] + m] == y[n + m]
+                    ):
+                        m += 1
+                    if m == order:
+                        break
+                slot = (slot + 1) & slot_mask
+
+            # New window, as good as counted once far enough before
+            if first[slot] == -1:
+                hashes[slot] = h
+                first[slot] = n
+                last[slot] = n - order
+                counts[slot] = 0
+
+            # Count only if it doesn't overlap the last counted occurrence
+            if n - last[slot] >= order:
+                counts[slot] += 1
+
+                # get_mask_windows stops masking after the first counted window
+                # whose followers run past the end of input
+                if not frozen:
+                    last[slot] = n
+                    frozen = n >= cutoff
+
+        # Most frequent window, earliest first occurrence among ties
+        for slot in range(capacity):
+            if first[slot] == -1:
+                continue
+            if counts[slot] > best_count or (
+                counts[slot] == best_count and first[slot] < best_first
+            ):
+                best_count = counts[slot]
+                best_first = first[slot]
+
+    finally:
+        free(hashes)
+        free(first)
+        free(last)
+        free(counts)
+
+    return best_first, best_count
+
+# Function for substituting joint windows of any length
+cpdef substitute_windows(const unsigned int[::1] x, const unsigned int[::1] y, unsigned int order, const unsigned int[::1] window_x, const unsigned int[::1] window_y, unsigned int value_x, unsigned int value_y):
+    """
+    INPUT
+    -----
+    x : array.array
+        Array object containing 32-bit unsigned integers.
 
-#         # If all compared elements match for current window
-#         if track == order:
+    y : array.array
+        Array object containing 32-bit unsigned integers, same length as x.
 
-#             # Replace the first element with provided value
-#             x[n] = value
+    order: unsigned 32-bit int
+        Length of the window to slide across input
 
-#             # Replace the remaining subsequent values with zeros
-#             for m in range(1, order):
-#                 x[n+m] = 0
+    window_x, window_y : array.array, length = order
+        Array objects containing the joint window, order 32-bit unsigned integers each.
 
-#         # Reset tracker
-#         track = 0
-#     # Reset indexing variable
-#     n = 0
+    value_x, value_y : unsigned 32-bit int
+        Values to substitute each occurrence of the joint window with
 
-#     # Loop over mutated input and append non-zero values to list
-#     for n in range(x_size):
+    OUTPUT
+    ------
+    out_x, out_y : list
+        Array objects containing 32-bit integers, with non-overlapping occurrences of
+        supplied joint window replaced from left to right by the supplied values.
 
-#         if x[n]:
+    Occurrences are found with a single Knuth-Morris-Pratt scan over joint symbols,
+    restarting after each match so that substituted occurrences never overlap.
+    """
+    # Initialize looping variables and output lists
+    cdef Py_ssize_t n = 0, q = 0
+    cdef Py_ssize_t x_size = len(x)
+    cdef list out_x = []
+    cdef list out_y = []
 
-#             out.append(x[n])
+    # Failure table: length of the longest proper border of each prefix of window
+    cdef Py_ssize_t *failure = <Py_ssize_t *> malloc(order * sizeof(Py_ssize_t))
+
+    # Flags for starting indices of substituted occurrences
+    cdef unsigned char *starts = <unsigned char *> malloc(x_size + 1)
+
+    try:
+        if not (failure and starts):
+            raise MemoryError()
+
+        for n in range(x_size):
+            starts[n] = 0
+
+        # Build failure table
+        failure[0] = 0
+        for n in range(1, order):
+            while q > 0 and (window_x[n] != window_x[q] or window_y[n] != window_y[q]):
+                q = failure[q - 1]
+            if window_x[n] == window_x[q] and window_y[n] == window_y[q]:
+                q += 1
+            failure[n] = q
+
+        # Scan input, restarting from scratch after each match
+        q = 0
+        for n in range(x_size):
+            while q > 0 and (x[n] != window_x[q] or y[n] != window_y[q]):
+                q = failure[q - 1]
+            if x[n] == window_x[q] and y[n] == window_y[q]:
+                q += 1
+            if q == order:
+                starts[n - order + 1] = 1
+                q = 0
+
+        # Collect substituted values and remaining non-zero values
+        n = 0
+        while n < x_size:
+            if starts[n]:
+                out_x.append(value_x)
+                out_y.append(value_y)
+                n += order
+            else:
+                if x[n]: # Check only for x as both x & y can only be simultaneously 0
+                    out_x.append(x[n])
+                    out_y.append(y[n])
+                n += 1
+
+    finally:
+        free(failure)
+        free(starts)
 
-#     return out
\ No newline at end of file
+    return out_x, out_y
@@ -11,8 +11,8 @@ from array import array
 from ETC.seq import estimates as ce
 from ETC.seq.recode import cast
 from ETC.seq.IO import save
-from ETC.NSRWS.x2D import core as cc
-from ETC.NSRWS.x2D.onestep import _onestep
+from ETC.seq.memo import memoize
+from ETC.NSRWS.x2D.onestep import _all_equal, _onestep
 
 
 def _compute_verbose_truncated(seq_x, seq_y, order=2):
@@ -68,12 +68,12 @@ def _compute_verbose_truncated(seq_x, seq_y, order=2):
         }
     )
 
-    if cc.check_equality(seq_x, seq_y):
+    if _all_equal(seq_x, seq_y):
         return etc, output
 
     # Execute iteration loop until either all elements are equal or sequence is
     # reduced to less than size of the window being substituted (order)
-    while not signal and len(seq_x) >= order and not cc.check_equality(seq_x, seq_y):
+    while not signal and len(seq_x) >= order and not _all_equal(seq_x, seq_y):
 
         # Run one step of NSRWS in verbose mode (returns window and count)
         seq_x, seq_y, signal, pair_x, pair_y, count, time = _onestep(
@@ -97,7 +97,7 @@ def _compute_verbose_truncated(seq_x, seq_y, order=2):
             }
         )
     n = 0
-    if signal and not cc.check_equality(seq_x, seq_y):
+    if signal and not _all_equal(seq_x, seq_y):
 
         while len(seq_x) >= order and n < 5:
             # Run one step of NSRWS in verbose mode (returns window and count)
@@ -183,12 +183,12 @@ def _compute_verbose_full(seq_x, seq_y, order=2):
         }
     )
 
-    if cc.check_equality(seq_x, seq_y):
+    if _all_equal(seq_x, seq_y):
         return etc, output
 
     # Execute iteration loop until either all elements are equal or sequence is
     # reduced to less than size of the window being substituted (order)
-    while len(seq_x) >= order and not cc.check_equality(seq_x, seq_y):
+    while len(seq_x) >= order and not _all_equal(seq_x, seq_y):
 
         # Run one step of NSRWS in verbose mode (returns window and count)
         seq_x, seq_y, signal, pair_x, pair_y, count, time = _onestep(
@@ -243,14 +243,14 @@ def _compute_compact_truncated(seq_x, seq_y, order=2):
     # Initialize ETC to 0
     etc = 0
 
-    if cc.check_equality(seq_x, seq_y):
+    if _all_equal(seq_x, seq_y):
         return etc
 
     signal = False
     # Execute iteration loop until either all elements are equal or sequence is
     # reduced to less than size of the window being substituted (order)
     # while len(seq) >= order and not equality(seq):
-    while not signal and len(seq_x) >= order and not cc.check_equality(seq_x, seq_y):
+    while not signal and len(seq_x) >= order and not _all_equal(seq_x, seq_y):
 
         # Run one step of NSRWS
         seq_x, seq_y, signal = _onestep(seq_x, seq_y, order, verbose=False)
@@ -259,7 +259,7 @@ def _compute_compact_truncated(seq_x, seq_y, order=2):
         etc += 1
 
     n = 0
-    if signal and not cc.check_equality(seq_x, seq_y):
+    if signal and not _all_equal(seq_x, seq_y):
 
         while len(seq_x) >= order and n < 5:
             # Run one step of NSRWS in verbose mode (returns window and count)
@@ -308,13 +308,13 @@ def _compute_compact_full(seq_x, seq_y, order=2):
     # Initialize ETC to 0
     etc = 0
 
-    if cc.check_equality(seq_x, seq_y):
+    if _all_equal(seq_x, seq_y):
         return etc
 
     # Execute iteration loop until either all elements are equal or sequence is
     # reduced to less than size of the window being substituted (order)
     # while len(seq) >= order and not equality(seq):
-    while len(seq_x) >= order and not cc.check_equality(seq_x, seq_y):
+    while len(seq_x) >= order and not _all_equal(seq_x, seq_y):
 
         # Run one step of NSRWS
         seq_x, seq_y, signal = _onestep(seq_x, seq_y, order, verbose=False)
@@ -327,7 +327,108 @@ def _compute_compact_full(seq_x, seq_y, order=2):
     return etc
 
 
-def compute(seq_x, seq_y, order=2, verbose=True, truncate=True):
+def _remaining(length, order=2):
+    """
+    Upper bound on the number of NSRWS steps left for a sequence of given length.
+
+    Each step shortens the sequence by at least (order - 1) elements, and the
+    iteration stops once it is shorter than the window being substituted.
+
+    Parameters
+    ----------
+    length : int
+        Length of the sequence.
+    order : int, optional
+        Number of elements in window for substitution.
+        The default is 2 for pairs.
+
+    Returns
+    -------
+    int
+        Largest number of steps that can still be taken.
+
+    """
+    if length < order:
+        return 0
+
+    return (length - order) // (order - 1) + 1
+
+
+def _compute_compact_bounded(
+    seq_x, seq_y, order=2, truncate=True, max_steps=None, stop_when=None
+):
+    """
+    This function runs the NSRWS algorithm for estimation of ETC, like the other
+    compact versions, but stops as soon as a budget of steps is spent or the
+    estimate is known to lie on either side of a cutoff.
+
+    Before each step, the final estimate is bounded below by one more than the
+    steps taken so far, and above by adding the most steps the current length
+    allows (see _remaining). If the iteration runs to completion, both bounds
+    equal the ETC estimate.
+
+    Parameters
+    ----------
+    seq_x : array.array
+        Sequence of integers.
+    seq_y : array.array
+        Sequence of integers, same length as seq_x.
+    order : int, optional
+        Number of elements in window for substitution.
+        The default is 2 for pairs.
+    truncate: bool, optional
+        Whether to halt iterative estimation once fully saturated 'axiom' has been
+        reached. The default is True.
+    max_steps : int, optional
+        Largest number of steps to take. The default is None, for no budget.
+    stop_when : int, optional
+        Cutoff on ETC: stop once the estimate is known to exceed it (lower bound
+        greater than cutoff) or not (upper bound less than or equal to cutoff).
+        The default is None, for no cutoff.
+
+    Returns
+    -------
+    lower : int
+        Lower bound on the Effort-To-Compress estimate for given sequences and order.
+    upper : int
+        Upper bound on the Effort-To-Compress estimate for given sequences and order.
+    stopped : bool
+        Whether iteration stopped before completion.
+
+    """
+    # Initialize ETC to 0 & a boolean for tracking truncation step
+    etc = 0
+    signal = False
+
+    # Execute iteration loop until either all elements are equal or sequence is
+    # reduced to less than size of the window being substituted (order)
+    while len(seq_x) >= order and not _all_equal(seq_x, seq_y):
+
+        # All windows are distinct, remaining steps follow in closed form
+        if truncate and signal:
+            etc += _compute_compact_truncated(seq_x, seq_y, order)
+            break
+
+        # Bound the final estimate & stop if budget is spent or cutoff is decided
+        lower, upper = etc + 1, etc + _remaining(len(seq_x), order)
+        if (max_steps is not None and etc >= max_steps) or (
+            stop_when is not None and (lower > stop_when or upper <= stop_when)
+        ):
+            return lower, upper, True
+
+        # Run one step of NSRWS
+        seq_x, seq_y, signal = _onestep(seq_x, seq_y, order, verbose=False)
+
+        # Increment ETC
+        etc += 1
+
+    return etc, etc, False
+
+
+@memoize("compute_2D", sequences=("seq_x", "seq_y"))
+def compute(
+    seq_x, seq_y, order=2, verbose=True, truncate=True, max_steps=None, stop_when=None
+):
     """
     This function estimates the Effort-To-Compress for a given sequence. It
     wraps around other functions and executes them based on input options.
@@ -341,11 +442,20 @@ def compute(seq_x, seq_y, order=2, verbose=True, truncate=True):
         The default is 2 for pairs.
     verbose : bool, optional
         Whether to compute additional metrics. The default is True.
+    max_steps : int, optional
+        Largest number of steps to take before stopping early. Implies compact mode,
+        verbose is ignored. The default is None, for no budget.
+    stop_when : int, optional
+        Cutoff on ETC: stop early once the estimate is known to exceed it or not.
+        Implies compact mode, verbose is ignored. The default is None, for no cutoff.
 
     Returns
     -------
     dict
         ETC (int) & optionally, trajectory of NSRWS algorithm if verbose=True.
+        If max_steps or stop_when is given, also whether iteration stopped early
+        (Stopped) and bounds on ETC2D (Bounds). If stopped early, ETC2D is the
+        lower bound.
 
     """
     assert len(seq_x) == len(seq_y), "ERROR: The 2 sequences should have the same length!"
@@ -354,6 +464,18 @@ def compute(seq_x, seq_y, order=2, verbose=True, truncate=True):
     seq_x = cast(seq_x)
     seq_y = cast(seq_y)
 
+    # If budget or cutoff is given, run the bounded compact version and return
+    if max_steps is not None or stop_when is not None:
+        lower, upper, stopped = _compute_compact_bounded(
+            seq_x, seq_y, order, truncate, max_steps, stop_when
+        )
+        return {
+            "ETC2D": lower,
+            "NETC2D": lower / (len(seq_x) - 1),
+            "Stopped": stopped,
+            "Bounds": (lower, upper),
+        }
+
     if truncate:
         # If verbose, run the verbose version and return accordingly
         if verbose:
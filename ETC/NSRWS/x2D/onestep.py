@@ -9,11 +9,37 @@ from collections import Counter
 from itertools import compress, islice
 from time import perf_counter
 
+from ETC.NSRWS import instrument
 from ETC.NSRWS.x2D import core
 from ETC.seq.recode import cast
 from ETC.seq.check import arraytype
 
 
+def _all_equal(seq_x, seq_y):
+    """
+    Check whether all joint symbols are equal, timed if instrumentation is on
+
+    Parameters
+    ----------
+    seq_x : array.array
+        Discrete symbolic sequence containing 32-bit unsigned integers.
+    seq_y : array.array
+        Discrete symbolic sequence containing 32-bit unsigned integers.
+
+    Returns
+    -------
+    bool
+        True if all pairs of symbols are equal.
+
+    """
+    timer = instrument.start()
+    equal = core.check_equality(seq_x, seq_y)
+    if timer is not None:
+        instrument.mark("2D", "equality", timer)
+
+    return equal
+
+
 def _mask_and_count(seq_x, seq_y, mask, order):
     """
     Apply binary mask to a pair of sequences & count most frequently jointly occurring windows
@@ -93,10 +119,13 @@ def _onestep_pairs(seq_x, seq_y, verbose=True):
     """
     Execute one full step of NSRPS (NSRWS with order=2) for a given sequence
 
-    Makes use of 2 functions written in Cython & _mask_and_count in the following steps:
-        1. Find overlapping pairs & store their indices for masking -> get_mask_pairs()
-        2. Apply the mask and find most frequent pair -> _mask_and_count()
-        3. Substitute all occurrences of the most frequent pair -> substitute_pairs()
+    Makes use of 2 functions written in Cython in the following steps:
+        1. Count non-overlapping pairs & find the most frequent one -> count_pairs()
+        2. Substitute all occurrences of the most frequent pair -> substitute_pairs()
+
+    count_pairs() gives the same pair & count as masking with get_mask_pairs()
+    followed by _mask_and_count(). It relabels symbols to the few that are still
+    live, so that pairs are counted in an array instead of a Counter of tuples.
 
     This function is different from _onestep_windows because:
         1. It is *much* faster due to fewer nested loops
@@ -106,8 +135,6 @@ def _onestep_pairs(seq_x, seq_y, verbose=True):
     The implementation will benefit from:
         1. Decorators for timing
         2. Decorators for verbosity of output
-        3. Cython implementation of the slowest part: _mask_and_count
-            problem: counting windows in C?
 
     Parameters
     ----------
@@ -151,18 +178,24 @@ def _onestep_pairs(seq_x, seq_y, verbose=True):
     # Initialize timer
     before = perf_counter()
 
+    # Initialize phase timer, None if instrumentation is disabled
+    timer = instrument.start()
+
     # Initialize signal for tracking sequence state with all distinct pairs
     signal = False
 
-    # Compute mask for overlapping pairs
-    mask = core.get_mask_pairs(seq_x, seq_y)
-
-    # Apply mask and find most frequent pair
-    pair_x, pair_y, count = _mask_and_count(seq_x, seq_y, mask, 2)
+    # Count non-overlapping joint pairs and find the most frequent one
+    start, count = core.count_pairs(seq_x, seq_y)
+    pair_x = cast(seq_x[start : start + 2])
+    pair_y = cast(seq_y[start : start + 2])
+    if timer is not None:
+        timer = instrument.mark("2D", "count", timer)
 
     # Get values for substitution of the most frequent pair with
     sub_value_x = 1 + max(seq_x)
     sub_value_y = 1 + max(seq_y)
+    if timer is not None:
+        timer = instrument.mark("2D", "maximum", timer)
 
     # If all distinct pairs, substitute the first one & set signal to True
     if count == 1:
@@ -173,13 +206,19 @@ def _onestep_pairs(seq_x, seq_y, verbose=True):
         out_y[0] = sub_value_y
 
         signal = True
+        if timer is not None:
+            instrument.mark("2D", "cast", timer)
     # Else, substitute all instances of the frequent pair
     else:
         out_x, out_y = core.substitute_pairs(
             seq_x, seq_y, pair_x, pair_y, sub_value_x, sub_value_y
         )
+        if timer is not None:
+            timer = instrument.mark("2D", "substitute", timer)
         out_x = cast(out_x)
         out_y = cast(out_y)
+        if timer is not None:
+            instrument.mark("2D", "cast", timer)
 
     # Completion timer
     after = perf_counter()
@@ -193,31 +232,119 @@ def _onestep_pairs(seq_x, seq_y, verbose=True):
     return out_x, out_y, signal
 
 
-# def _onestep_windows(seq, order, verbose=True):
+def _onestep_windows(seq_x, seq_y, order, verbose=True):
+    """
+    Execute one full step of NSRWS with order>=2 for a given pair of sequences
+
+    Makes use of 2 functions written in Cython in the following steps:
+        1. Count non-overlapping joint windows & find the most frequent one
+            -> count_windows()
+        2. Substitute all occurrences of most frequent joint window
+            -> substitute_windows()
+
+    count_windows() gives the same window & count as masking with get_mask_windows()
+    followed by _mask_and_count(), in a single pass with a rolling hash over pairs of
+    symbols packed into joint symbols.
+
+    This function is different from _onestep_pairs because:
+        1. This does more work per window, hashing & comparing whole windows
+        2. Of course, it handles the generalized case for different window orders
+
+    Parameters
+    ----------
+    seq_x : array.array
+        Discrete symbolic sequence containing 32-bit unsigned integers.
+    seq_y : array.array
+        Discrete symbolic sequence containing 32-bit unsigned integers.
+    order : int
+        Size of window for NSRWS, 2 or greater.
+    verbose : bool, optional
+        Whether to report extra details. These include the frequent window that was
+        substituted, its counts & total time taken. The default is True.
+
+    Returns
+    -------
+    tuple, of the following fixed elements:
+        seq_x : array.array
+            Discrete symbolic sequence containing 32-bit unsigned integers, with most
+            frequently occurring non-sequentially overlapping window substituted.
+
+        seq_y : array.array
+            Discrete symbolic sequence containing 32-bit unsigned integers, with most
+            frequently occurring non-sequentially overlapping window substituted.
+
+        signal : bool
+            indicator for the state of sequence with all distinct windows (count=1)
+
+    optional elements of tuple that depend on verbosity:
+        freq_window_x : array.array
+            Frequent window substituted in seq_x
 
-#     before = perf_counter()
-#     mask = core.get_mask_windows(seq, order)[: -(order - 1)]
-#     z_windowed = compress(zip(*(islice(seq, i, None) for i in range(order))), mask)
-#     z_windowed = tuple(z_windowed)
-#     freq_window, count = Counter(z_windowed).most_common(1)[0]
-#     sub_value = 1 + max(seq)
-#     window = array("I", freq_window)
-#     if count == 1:
-#         out = array("I", seq[order - 1 :])
-#         out[0] = sub_value
-#         signal = True
-#     else:
-#         out = array("I", core.substitute_windows(seq, order, window, sub_value))
-#         signal = False
-#     out = array("I", core.substitute_windows(seq, order, window, sub_value))
-#     after = perf_counter()
-#     if verbose:
-#         return out, freq_window, count, after - before, signal
-#     return out, signal
+        freq_window_y : array.array
+            Frequent window substituted in seq_y
+
+        count : int
+            Number of times the frequent window occurred in the sequence
+
+        time_taken : float
+            Time taken to execute step
 
+    """
+    # Initialize timer
+    before = perf_counter()
+
+    # Initialize phase timer, None if instrumentation is disabled
+    timer = instrument.start()
+
+    # Initialize signal for tracking sequence state with all distinct windows
+    signal = False
+
+    # Count non-overlapping joint windows and find the most frequent one
+    start, count = core.count_windows(seq_x, seq_y, order)
+    window_x = cast(seq_x[start : start + order])
+    window_y = cast(seq_y[start : start + order])
+    if timer is not None:
+        timer = instrument.mark("2D", "count", timer)
+
+    # Get values for substitution of the most frequent window with
+    sub_value_x = 1 + max(seq_x)
+    sub_value_y = 1 + max(seq_y)
+    if timer is not None:
+        timer = instrument.mark("2D", "maximum", timer)
 
-# def _onestep_windows(seq, order, verbose=True):
-#     pass
+    # If all distinct windows, substitute the first one & set signal to True
+    if count == 1:
+        out_x = cast(seq_x[order - 1 :])
+        out_x[0] = sub_value_x
+
+        out_y = cast(seq_y[order - 1 :])
+        out_y[0] = sub_value_y
+
+        signal = True
+        if timer is not None:
+            instrument.mark("2D", "cast", timer)
+    # Else, substitute all instances of the frequent window
+    else:
+        out_x, out_y = core.substitute_windows(
+            seq_x, seq_y, order, window_x, window_y, sub_value_x, sub_value_y
+        )
+        if timer is not None:
+            timer = instrument.mark("2D", "substitute", timer)
+        out_x = cast(out_x)
+        out_y = cast(out_y)
+        if timer is not None:
+            instrument.mark("2D", "cast", timer)
+
+    # Completion timer
+    after = perf_counter()
+
+    # If verbose, return more things
+    if verbose:
+        time_taken = after - before
+        return out_x, out_y, signal, window_x, window_y, count, time_taken
+
+    # Else return bare essentials
+    return out_x, out_y, signal
 
 
 def _onestep(seq_x, seq_y, order, verbose=True):
@@ -269,8 +396,8 @@ def _onestep(seq_x, seq_y, order, verbose=True):
     """
     if order == 2:
         return _onestep_pairs(seq_x[:], seq_y[:], verbose)
-    # if order > 2:
-    #     return _onestep_windows(seq_x[:], seq_y[:], order, verbose)
+    if order > 2:
+        return _onestep_windows(seq_x[:], seq_y[:], order, verbose)
 
 
 def onestep(seq_x, seq_y, order, verbose=True, check=True):
@@ -14,9 +14,12 @@ from random import choices
 from multiprocessing import Pool
 
 # Import local modules
-import ETC
+from ETC.seq.IO import read
 from ETC.seq.process import entropy
-from ETC.helper.compute_markov_transition_probs import sample_sequence
+from ETC.seq.recode import recode_lexical
+from ETC.seq.markov import sample_sequence
+from ETC.NSRWS.x1D.etc import compute as compute_1D
+from ETC.NSRWS.x2D.etc import compute as compute_2D
 
 # Function definitions
 def _compute_two_files_truncated(files, order=2):
@@ -37,8 +40,8 @@ def _compute_two_files_truncated(files, order=2):
     """
     # Read file as a sequence
     filepath1, filepath2 = files
-    seq1 = ETC.helper.IO.read(filepath1)
-    seq2 = ETC.helper.IO.read(filepath2)
+    seq1 = recode_lexical(read(filepath1))
+    seq2 = recode_lexical(read(filepath2))
 
     if len(seq1) > len(seq2):
         seq1 = seq1[: len(seq2)]
@@ -49,11 +52,11 @@ def _compute_two_files_truncated(files, order=2):
     out = {"seq1": filepath1.stem, "seq2": filepath2.stem, "length": len(seq1)}
 
     # Compute ETC, write to file and update output dictionary
-    out.update(ETC.compute_2D(seq1, seq2, order=order, truncate=True, verbose=False))
-    seq1etc = ETC.compute_1D(seq1, order=order, truncate=True, verbose=False)["ETC1D"]
+    out.update(compute_2D(seq1, seq2, order=order, truncate=True, verbose=False))
+    seq1etc = compute_1D(seq1, order=order, truncate=True, verbose=False)["ETC1D"]
     out.update({"ETC1D_seq1": seq1etc})
 
-    seq2etc = ETC.compute_1D(seq2, order=order, truncate=True, verbose=False)["ETC1D"]
+    seq2etc = compute_1D(seq2, order=order, truncate=True, verbose=False)["ETC1D"]
     out.update({"ETC1D_seq2": seq2etc})
 
     return out
@@ -78,8 +81,8 @@ def _compute_two_files_markov(files, markov_order, order=2):
     """
     # Read file as a sequence
     filepath1, filepath2 = files
-    seq1 = ETC.helper.IO.read(filepath1, recode=False)
-    seq2 = ETC.helper.IO.read(filepath2, recode=False)
+    seq1 = recode_lexical(read(filepath1))
+    seq2 = recode_lexical(read(filepath2))
 
     lseq1 = len(seq1)
     lseq2 = len(seq2)
@@ -100,8 +103,8 @@ def _compute_two_files_markov(files, markov_order, order=2):
 
     assert len(seq1) == len(seq2)
 
-    seq1 = ETC.helper.IO.recode_to_int(seq1)
-    seq2 = ETC.helper.IO.recode_to_int(seq2)
+    seq1 = recode_lexical(seq1)
+    seq2 = recode_lexical(seq2)
 
     # Filename for writing output of ETC computation
     # fname = filepath1.with_name(filepath1.stem + '_&_'+ filepath2.stem + f"_etc_order{order}_markov_order{markov_order}.csv")
@@ -110,11 +113,11 @@ def _compute_two_files_markov(files, markov_order, order=2):
     out = {"seq1": filepath1.stem, "seq2": filepath2.stem, "length": len(seq1)}
 
     # Compute ETC, write to file and update output dictionary
-    out.update(ETC.compute_2D(seq1, seq2, order=order, truncate=True, verbose=False))
-    seq1etc = ETC.compute_1D(seq1, order=order, truncate=True, verbose=False)["ETC1D"]
+    out.update(compute_2D(seq1, seq2, order=order, truncate=True, verbose=False))
+    seq1etc = compute_1D(seq1, order=order, truncate=True, verbose=False)["ETC1D"]
     out.update({"ETC1D_seq1": seq1etc})
 
-    seq2etc = ETC.compute_1D(seq2, order=order, truncate=True, verbose=False)["ETC1D"]
+    seq2etc = compute_1D(seq2, order=order, truncate=True, verbose=False)["ETC1D"]
     out.update({"ETC1D_seq2": seq2etc})
 
     return out
@@ -207,7 +210,7 @@ def _compute_single_seq(seq):
     out = {"item": seq[0], "length": len(seq[1]), "entropy": entropy(seq[1])}
 
     # Compute ETC and update output dictionary
-    out.update(ETC.compute(seq[1], order=2, verbose=False, truncate=True))
+    out.update(compute_1D(seq[1], order=2, verbose=False, truncate=True))
 
     return out
 
@@ -0,0 +1,7 @@
+#
+from ETC import _submodule
+
+
+def __getattr__(name):
+    # Load modules of this package on first access
+    return _submodule(__name__, name)
@@ -0,0 +1,101 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, nonecheck=False, emit_code_comments=True, cdivision=True, embedsignature=True
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+
+@author: Pranay S. Yadav
+"""
+# Import stuff
+from cpython cimport array
+from libc.stdlib cimport malloc, free
+cimport cython
+import array
+
+from ETC.NSRWS.common cimport HASH_BASE, HASH_SPREAD
+
+# Function for mapping columns of a matrix to joint symbols
+cpdef array.array joint_symbols(const unsigned int[:, ::1] matrix):
+    """
+    INPUT
+    -----
+    matrix : np.ndarray
+        2D array of uint32, one sequence per row & at least one column.
+
+    OUTPUT
+    ------
+    out : array.array
+        Array object containing 32-bit unsigned integers, one per column of matrix.
+        Identical columns get identical symbols, numbered from 1 in order of first
+        occurrence.
+
+    Columns are hashed into an open-addressing table, with every hash match confirmed
+    element-wise, so that no tuples are created and symbols never overflow.
+    """
+    # Get shape of input
+    cdef Py_ssize_t n_rows = matrix.shape[0]
+    cdef Py_ssize_t n_cols = matrix.shape[1]
+
+    # Table size: smallest power of 2 at least twice the number of columns
+    cdef int shift = 64
+    cdef Py_ssize_t capacity = 1
+    while capacity < 2 * n_cols:
+        capacity <<= 1
+        shift -= 1
+    cdef Py_ssize_t slot_mask = capacity - 1
+
+    # Table slots: hash & first column with it, -1 if empty
+    cdef unsigned long long *hashes = <unsigned long long *> malloc(
+        capacity * sizeof(unsigned long long)
+    )
+    cdef Py_ssize_t *first = <Py_ssize_t *> malloc(capacity * sizeof(Py_ssize_t))
+
+    # Initialize output of zeros
+    cdef array.array int_template = array.array('I', [])
+    cdef array.array out = array.clone(int_template, n_cols, zero=True)
+    cdef unsigned int[:] out_view = out
+
+    # Initialize looping variables
+    cdef Py_ssize_t n, m, slot
+    cdef unsigned long long h
+    cdef unsigned int label = 0
+
+    try:
+        if not (hashes and first):
+            raise MemoryError()
+
+        for slot in range(capacity):
+            first[slot] = -1
+
+        for n in range(n_cols):
+
+            # Hash of this column
+            h = 0
+            for m in range(n_rows):
+                h = h * HASH_BASE + matrix[m, n]
+
+            # Find slot of this column, probing linearly past collisions
+            slot = <Py_ssize_t> ((h * HASH_SPREAD) >> shift)
+            while first[slot] != -1:
+                if hashes[slot] == h:
+                    m = 0
+                    while m < n_rows and matrix[m, first[slot]] == matrix[m, n]:
+                        m += 1
+                    if m == n_rows:
+                        break
+                slot = (slot + 1) & slot_mask
+
+            # New column gets the next symbol, repeated one the symbol of its first
+            if first[slot] == -1:
+                hashes[slot] = h
+                first[slot] = n
+                label += 1
+                out_view[n] = label
+            else:
+                out_view[n] = out_view[first[slot]]
+
+    finally:
+        free(hashes)
+        free(first)
+
+    return out
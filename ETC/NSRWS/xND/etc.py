@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Joint Effort-To-Compress of several aligned sequences.
+
+Each column of a (k x n) matrix, i.e. the k symbols at one time point, is treated as a
+single joint symbol. Columns are mapped natively to joint symbols numbered in order of
+first occurrence, after which NSRWS runs on the resulting 1D sequence. Substituting a
+window in every row with new symbols yields a joint symbol that is also new, so this
+gives the same estimate as substituting in all k sequences together, as compute_2D
+does for k = 2.
+
+@author: Pranay S. Yadav
+"""
+import numpy as np
+
+from ETC.NSRWS.x1D.etc import compute as compute_1D
+from ETC.NSRWS.xND.core import joint_symbols
+
+
+def joint(matrix):
+    """
+    Map each column of a matrix of sequences to a single joint symbol
+
+    Parameters
+    ----------
+    matrix : np.ndarray or list of sequences
+        2D array of non-negative integers, one sequence per row, all of equal length.
+
+    Returns
+    -------
+    array.array
+        Joint symbols as 32-bit unsigned integers, numbered from 1 in order of first
+        occurrence, one per column of matrix.
+
+    """
+    matrix = np.asarray(matrix)
+
+    assert matrix.ndim == 2, "ERROR: Input should be 2D, one sequence per row!"
+    assert matrix.shape[1] > 1, "ERROR: Sequences should have at least 2 elements!"
+    assert np.issubdtype(matrix.dtype, np.integer) and (
+        matrix.min() >= 0 and matrix.max() <= np.iinfo("uint32").max
+    ), "ERROR: Sequences should contain non-negative 32-bit integers!"
+
+    # Copy into C-contiguous uint32 only if needed
+    return joint_symbols(np.ascontiguousarray(matrix, dtype="uint32"))
+
+
+def compute(
+    matrix, order=2, verbose=False, truncate=True, max_steps=None, stop_when=None
+):
+    """
+    Estimate the joint Effort-To-Compress of several aligned sequences.
+
+    Parameters
+    ----------
+    matrix : np.ndarray or list of sequences
+        2D array of non-negative integers, one sequence per row, all of equal length.
+    order : int, optional
+        Number of elements in window for substitution.
+        The default is 2 for pairs.
+    verbose : bool, optional
+        Whether to compute additional metrics. The default is False.
+    truncate: bool, optional
+        Whether to halt iterative estimation once fully saturated 'axiom' has been reached
+    max_steps : int, optional
+        Largest number of steps to take before stopping early. Only available with
+        verbose=False. The default is None, for no budget.
+    stop_when : int, optional
+        Cutoff on ETC: stop early once the estimate is known to exceed it or not.
+        Only available with verbose=False. The default is None, for no cutoff.
+
+    Returns
+    -------
+    dict
+        ETCND (int), NETCND (float) & optionally, trajectory of algorithm if
+        verbose=True, with entropy & windows in terms of joint symbols. If max_steps
+        or stop_when is given, also Stopped & Bounds as returned by compute_1D.
+
+    """
+    out = compute_1D(joint(matrix), order, verbose, truncate, max_steps, stop_when)
+
+    result = {"ETCND": out.pop("ETC1D"), "NETCND": out.pop("NETC1D")}
+    result.update(out)
+
+    return result
@@ -1,33 +1,94 @@
 # -*- coding: utf-8 -*-
+"""
+Effort-To-Compress (ETC) of symbolic sequences.
 
-__import__("pkg_resources").declare_namespace(__name__)
+Public functions are resolved lazily on first access (PEP 562), so that importing the
+package doesn't pull in NumPy, the compiled kernels, multiprocessing or any of the
+causality modules until they are actually used. Subpackages and their modules are also
+loaded on first attribute access, e.g. ETC.CCC, ETC.seq or ETC.seq.recode.
 
-from ETC.seq.IO import read, save
-from ETC.seq.process import generate, entropy
-from ETC.seq.recode import cast, recode_lexical, partition, partition_numpy
-from ETC.seq import check
+@author: Pranay S. Yadav
+"""
+from importlib import import_module
 
-from ETC.NSRWS.x1D.etc import compute as compute_1D
+# Public name -> (module, attribute) from which it is loaded on first access, where an
+# attribute of None stands for the module itself
+_LAZY = {
+    "read": ("ETC.seq.IO", "read"),
+    "save": ("ETC.seq.IO", "save"),
+    "generate": ("ETC.seq.process", "generate"),
+    "entropy": ("ETC.seq.process", "entropy"),
+    "cast": ("ETC.seq.recode", "cast"),
+    "recode_lexical": ("ETC.seq.recode", "recode_lexical"),
+    "partition": ("ETC.seq.recode", "partition"),
+    "partition_numpy": ("ETC.seq.recode", "partition_numpy"),
+    "check": ("ETC.seq.check", None),
+    "compute_1D": ("ETC.NSRWS.x1D.etc", "compute"),
+    "compute_2D": ("ETC.NSRWS.x2D.etc", "compute"),
+    "compute_ND": ("ETC.NSRWS.xND.etc", "compute"),
+    "pcompute_multiple_seq": ("ETC.NSRWS.x1D.parallel", "pcompute_multiple_seq"),
+    "pcompute_single": ("ETC.NSRWS.x1D.parallel", "pcompute_single"),
+    "pcompute_files": ("ETC.NSRWS.x1D.parallel", "pcompute_files"),
+    "pcompute_numpy": ("ETC.NSRWS.x1D.parallel", "pcompute_numpy"),
+    "LZC": ("ETC.LZ76.lzc", "compute_complexity"),
+    "CCM_causality": ("ETC.CCMC.pairs", "CCM_causality"),
+    "CCM_causality_parallel": ("ETC.CCMC.pairs_parallel", "parallelized"),
+    "get_rowpairs": ("ETC.CCMC.pairs_parallel", "get_rowpairs"),
+}
 
-# from ETC.NSRWS.x1D.etc import compute_save as compute_save_1D
-# from ETC.NSRWS.x1D.onestep import onestep as onestep_1D
+# Subpackages loaded on first attribute access
+_SUBPACKAGES = ("CCC", "CCMC", "LZ76", "NCA", "NSRWS", "seq")
 
-from ETC.NSRWS.x2D.etc import compute as compute_2D
+__all__ = list(_LAZY)
 
-# from ETC.NSRWS.x2D.etc import compute_save as compute_save_2D
-# from ETC.NSRWS.x2D.onestep import onestep as onestep_2D
 
-# from ETC.CCC.compute_CCC import compute as compute_CCC
+def _submodule(package, name):
+    """
+    Import a module of a package on attribute access, for use by __getattr__
 
+    Parameters
+    ----------
+    package : str
+        Full name of the package, i.e. __name__ of the caller.
+    name : str
+        Attribute being accessed.
 
-from ETC.NSRWS.x1D.parallel import (
-    pcompute_multiple_seq,
-    pcompute_single,
-    pcompute_files,
-    pcompute_numpy,
-)
+    Returns
+    -------
+    module
+        The module package.name, which importing also binds to the package.
 
-from ETC.LZ76.lzc import compute_complexity as LZC
-from ETC.CCMC.pairs import CCM_causality
-from ETC.CCMC.pairs_parallel import parallelized as CCM_causality_parallel
-from ETC.CCMC.pairs_parallel import get_rowpairs
+    """
+    # Private & special names are never modules, e.g. probes for __wrapped__
+    if not name.startswith("_"):
+        try:
+            return import_module(f"{package}.{name}")
+        except ModuleNotFoundError as error:
+            # Only a missing module is a missing attribute, not a missing dependency
+            if error.name != f"{package}.{name}":
+                raise
+
+    raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+
+def __getattr__(name):
+    # Load a public function and bind it to the package, so this runs once per name
+    if name in _LAZY:
+        module, attribute = _LAZY[name]
+        value = import_module(module)
+        if attribute is not None:
+            value = getattr(value, attribute)
+
+    # Load a subpackage
+    elif name in _SUBPACKAGES:
+        value = _submodule(__name__, name)
+
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY) | set(_SUBPACKAGES))
@@ -3,14 +3,55 @@
 """
 This module contains helper functions for reading and writing files.
 
+Besides read(), which loads a whole file as text, stream() reads sequence content
+in fixed-size blocks without holding the file in memory. FASTA headers, FASTQ
+quality lines & whitespace are dropped on the fly, and gzip/bz2/xz compressed
+files are decompressed transparently. read_recoded() builds on stream() to recode
+a file straight into a preallocated NumPy array or memmap.
+
+write_store() and open_store() handle a binary format for recoded sequences that
+opens as a zero-copy, read-only np.memmap:
+    8 bytes     magic string b"ETCSEQ01"
+    4 bytes     length of JSON header, little-endian uint32
+    n bytes     JSON header with "dtype", "length" and "alphabet"
+    padding     zeros up to the next multiple of 64 bytes
+    data        raw little-endian symbol array
+
 @author: Pranay S. Yadav
 """
 
+import bz2
+import gzip
+import json
+import lzma
 from csv import DictWriter
+from functools import partial
+from multiprocessing import Pool
 
 # Import functions from standard library modules
 from pathlib import Path
 
+import numpy as np
+
+from ETC.seq.recode import byte_table
+
+# Openers for compressed files, by suffix
+OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open, ".lzma": lzma.open}
+
+# Bytes treated as whitespace when streaming
+WHITESPACE = b" \t\r\n\v\f"
+
+# Default size of blocks read from disk, in bytes
+CHUNK_SIZE = 2 ** 20
+
+# Suffixes of sequence formats, dropped from inputs when naming their stores
+SEQUENCE_SUFFIXES = (".fa", ".fasta", ".fna", ".ffn", ".faa", ".fq", ".fastq", ".txt")
+
+# Magic string, suffix and data alignment of the binary sequence store
+STORE_MAGIC = b"ETCSEQ01"
+STORE_SUFFIX = ".etcseq"
+STORE_ALIGN = 64
+
 
 def populate_files(filepath, suffix="*.txt"):
     if not isinstance(filepath, Path):
@@ -34,6 +75,667 @@ def read(filepath, delimiter=None):
     return text
 
 
+def _open(filepath):
+    """
+    Open a file for reading in binary mode, decompressing it based on its suffix
+
+    Parameters
+    ----------
+    filepath : Path object
+        Valid path to a plain or gzip/bz2/xz compressed file.
+
+    Returns
+    -------
+    file object
+        Binary file handle.
+
+    """
+    return OPENERS.get(filepath.suffix.lower(), open)(filepath, "rb")
+
+
+def _detect_format(filepath):
+    """
+    Guess whether a file is FASTA, FASTQ or plain text from its first character
+
+    Parameters
+    ----------
+    filepath : Path object
+        Valid path to a plain or compressed file.
+
+    Returns
+    -------
+    str
+        One of "fasta", "fastq" or "text".
+
+    """
+    with _open(filepath) as handle:
+        head = handle.read(1024).lstrip()
+
+    if head.startswith(b">"):
+        return "fasta"
+    if head.startswith(b"@"):
+        return "fastq"
+    return "text"
+
+
+def _lines(handle, chunk_size):
+    """
+    Read a binary file in blocks and split them into complete lines
+
+    Parameters
+    ----------
+    handle : file object
+        Binary file handle.
+    chunk_size : int
+        Number of bytes read at a time.
+
+    Yields
+    ------
+    list of bytes
+        Complete lines from each block, without line endings.
+
+    """
+    # Pieces of the last, possibly incomplete, line, joined once it is complete
+    carry = []
+    for chunk in iter(partial(handle.read, chunk_size), b""):
+        lines = chunk.split(b"\n")
+        if len(lines) == 1:
+            carry.append(chunk)
+            continue
+
+        lines[0] = b"".join(carry + [lines[0]])
+        carry = [lines.pop()]
+        yield lines
+
+    carry = b"".join(carry)
+    if carry:
+        yield [carry]
+
+
+def stream(filepath, chunk_size=CHUNK_SIZE, fmt="auto", delimiter=None):
+    """
+    Stream the sequence content of a file in blocks, without loading it whole.
+
+    Parameters
+    ----------
+    filepath : str or Path object
+        Valid path to a plain or gzip/bz2/xz compressed file.
+    chunk_size : int, optional
+        Number of bytes read from disk at a time. The default is 2**20.
+    fmt : str, optional
+        One of:
+            "fasta" - drop header lines starting with ">" and all whitespace
+            "fastq" - keep only the sequence line of each 4-line record
+            "text" - drop all whitespace
+            "raw" - keep everything except occurrences of delimiter, as read()
+            "auto" - detect FASTA/FASTQ from the first character, else "text"
+        The default is "auto".
+    delimiter : str, optional
+        Delimiter to remove in "raw" format. The default is None.
+
+    Yields
+    ------
+    bytes
+        Successive non-empty blocks of sequence content.
+
+    """
+    if not isinstance(filepath, Path):
+        filepath = Path(filepath)
+
+    if fmt == "auto":
+        fmt = _detect_format(filepath)
+
+    assert fmt in ("fasta", "fastq", "text", "raw"), f"ERROR: Unknown format {fmt}"
+
+    with _open(filepath) as handle:
+
+        # FASTA: drop header lines, join the rest & strip whitespace. Each block is
+        # split into pieces of lines as they come, carrying over only whether the
+        # open line is a header (None until its first byte is read), such that long
+        # unwrapped sequence lines are never held whole
+        if fmt == "fasta":
+            header = None
+            for chunk in iter(partial(handle.read, chunk_size), b""):
+                keep = []
+                for n, piece in enumerate(chunk.split(b"\n")):
+                    if n:
+                        header = None
+                    if header is None and piece:
+                        header = piece.startswith(b">")
+                    if piece and not header:
+                        keep.append(piece)
+                out = b"".join(keep).translate(None, WHITESPACE)
+                if out:
+                    yield out
+
+        # FASTQ: keep the 2nd line of every record of 4 lines. The first piece of
+        # each block continues the open line, which has index count
+        elif fmt == "fastq":
+            count = 0
+            for chunk in iter(partial(handle.read, chunk_size), b""):
+                pieces = chunk.split(b"\n")
+                out = b"".join(pieces[(1 - count) % 4 :: 4]).translate(None, WHITESPACE)
+                count += len(pieces) - 1
+                if out:
+                    yield out
+
+        # Text: strip whitespace from each block
+        elif fmt == "text":
+            for chunk in iter(partial(handle.read, chunk_size), b""):
+                out = chunk.translate(None, WHITESPACE)
+                if out:
+                    yield out
+
+        # Raw: remove delimiter, holding back a tail that may be the start of one.
+        # Only the last len(delimiter) - 1 bytes can be, so the tail stays bounded
+        # even if the delimiter is rare or absent.
+        else:
+            delimiter = delimiter.encode() if delimiter else b""
+            keep = max(len(delimiter) - 1, 0)
+            carry = b""
+            for chunk in iter(partial(handle.read, chunk_size), b""):
+                if not delimiter:
+                    yield chunk
+                    continue
+                pieces = (carry + chunk).split(delimiter)
+                split = max(len(pieces[-1]) - keep, 0)
+                carry = pieces[-1][split:]
+                pieces[-1] = pieces[-1][:split]
+                out = b"".join(pieces)
+                if out:
+                    yield out
+            if carry:
+                yield carry
+
+
+def records(filepath, chunk_size=CHUNK_SIZE, fmt="auto"):
+    """
+    Iterate over the records of a FASTA or FASTQ file one at a time.
+
+    Parameters
+    ----------
+    filepath : str or Path object
+        Valid path to a plain or gzip/bz2/xz compressed file.
+    chunk_size : int, optional
+        Number of bytes read from disk at a time. The default is 2**20.
+    fmt : str, optional
+        One of "fasta", "fastq" or "auto". The default is "auto".
+
+    Yields
+    ------
+    tuple
+        (name, sequence) of each record, name as str & sequence as bytes.
+
+    """
+    if not isinstance(filepath, Path):
+        filepath = Path(filepath)
+
+    if fmt == "auto":
+        fmt = _detect_format(filepath)
+
+    assert fmt in ("fasta", "fastq"), "ERROR: Records need a FASTA or FASTQ file"
+
+    name, parts, count = None, [], 0
+    with _open(filepath) as handle:
+        for lines in _lines(handle, chunk_size):
+            for line in lines:
+
+                # FASTA: a header starts a new record
+                if fmt == "fasta":
+                    if line.startswith(b">"):
+                        if name is not None:
+                            yield name, b"".join(parts).translate(None, WHITESPACE)
+                        name, parts = line[1:].decode().strip(), []
+                    else:
+                        parts.append(line)
+
+                # FASTQ: records are 4 lines each, the 2nd holds the sequence
+                else:
+                    if count % 4 == 0:
+                        name = line[1:].decode().strip()
+                    elif count % 4 == 1:
+                        yield name, line.translate(None, WHITESPACE)
+                    count += 1
+
+    if fmt == "fasta" and name is not None:
+        yield name, b"".join(parts).translate(None, WHITESPACE)
+
+
+def _lookup_table(counts, recoder):
+    """
+    Build a 256-entry table mapping bytes to symbols for a given recoding scheme
+
+    Parameters
+    ----------
+    counts : np.ndarray
+        Number of occurrences of each byte value in the input.
+    recoder : str
+        One of:
+            "lexical" - symbols 1, 2, ... in sorted order of distinct characters,
+                as ETC.seq.recode.recode_lexical
+            "dna" - purines (A, G) to 1 & pyrimidines (C, T) to 2, as
+                ETC.seq.recode.recode_dna
+
+    Returns
+    -------
+    np.ndarray or None
+        Table of uint32 symbols, 0 for bytes that are not mapped. None if the input
+        contains bytes that the scheme cannot recode.
+
+    """
+    present = counts > 0
+
+    # Multi-byte characters would not sort as their code points
+    if recoder == "lexical" and present[128:].any():
+        print("> ERROR: Streaming lexical recoding supports ASCII input only")
+        return None
+
+    return byte_table(present, recoder)
+
+
+def read_recoded(
+    filepath,
+    recoder="lexical",
+    fmt="auto",
+    chunk_size=CHUNK_SIZE,
+    out=None,
+    dtype="uint32",
+    return_alphabet=False,
+    delimiter=None,
+):
+    """
+    Read a file in blocks and recode its sequence content into a NumPy array.
+
+    The file is streamed twice: once to count characters & length, and once to
+    recode each block directly into its slot of the output, such that no full
+    copy of the text is ever held in memory.
+
+    Parameters
+    ----------
+    filepath : str or Path object
+        Valid path to a plain or gzip/bz2/xz compressed file.
+    recoder : str, optional
+        "lexical" or "dna", see _lookup_table(). The default is "lexical".
+    fmt : str, optional
+        File format, see stream(). The default is "auto".
+    chunk_size : int, optional
+        Number of bytes read from disk at a time. The default is 2**20.
+    out : np.ndarray or np.memmap, optional
+        Preallocated 1D output, of the same length as the sequence content. The
+        default is None, allocating a new array.
+    dtype : str, optional
+        Type of the allocated output, "uint8" or "uint32". The default is "uint32",
+        which ETC estimators take without conversion.
+    return_alphabet : bool, optional
+        Whether to also return a dict mapping each character to its symbol.
+        The default is False.
+    delimiter : str, optional
+        Removed from the content of "raw" files, see stream(). The default is None.
+
+    Returns
+    -------
+    np.ndarray or tuple or None
+        Recoded sequence, with its alphabet if return_alphabet is True.
+
+    """
+    scanned = _scan(filepath, recoder, fmt, chunk_size, delimiter)
+    if scanned is None:
+        return None
+    counts, table = scanned
+
+    # Allocate or check output
+    length = int(counts.sum())
+    if out is None:
+        out = np.empty(length, dtype=dtype)
+    elif len(out) != length:
+        print(f"> ERROR: Output should have length {length}")
+        return None
+
+    if _recode_into(filepath, table, fmt, chunk_size, out, delimiter) is None:
+        return None
+
+    if return_alphabet:
+        return out, _alphabet(counts, table)
+
+    return out
+
+
+def _scan(filepath, recoder, fmt, chunk_size, delimiter=None):
+    """
+    First pass of read_recoded(): count occurrences of each byte value in a file
+
+    Returns
+    -------
+    tuple or None
+        (counts, lookup table) as np.ndarray, None if the file cannot be recoded.
+
+    """
+    counts = np.zeros(256, dtype="int64")
+    for chunk in stream(filepath, chunk_size, fmt, delimiter):
+        counts += np.bincount(np.frombuffer(chunk, dtype="uint8"), minlength=256)
+
+    table = _lookup_table(counts, recoder)
+    if table is None:
+        return None
+
+    return counts, table
+
+
+def _recode_into(filepath, table, fmt, chunk_size, out, delimiter=None):
+    """
+    Second pass of read_recoded(): recode each block of a file into its slot of out
+
+    Returns
+    -------
+    np.ndarray or np.memmap or None
+        out, None if it can't hold all symbols of table.
+
+    """
+    if table.max() > np.iinfo(out.dtype).max:
+        print(f"> ERROR: Too many distinct characters for {out.dtype}")
+        return None
+
+    table = table.astype(out.dtype)
+    pos = 0
+    for chunk in stream(filepath, chunk_size, fmt, delimiter):
+        block = np.frombuffer(chunk, dtype="uint8")
+        np.take(table, block, out=out[pos : pos + len(block)])
+        pos += len(block)
+
+    return out
+
+
+def _alphabet(counts, table):
+    """
+    Map each character present in a file to its symbol in a lookup table
+    """
+    return {chr(x): int(table[x]) for x in np.flatnonzero(counts)}
+
+
+def write_store(seq, filepath, alphabet=None):
+    """
+    Write a recoded sequence to disk in the binary sequence store format.
+
+    Parameters
+    ----------
+    seq : array.array, np.ndarray, list or tuple
+        Sequence of positive integers. NumPy arrays keep their unsigned dtype, all
+        else is stored as uint32.
+    filepath : str or Path object
+        Path to the output file.
+    alphabet : dict, optional
+        Mapping of original characters to symbols, stored in the header. The default
+        is None.
+
+    Returns
+    -------
+    Path object
+        Path to the written file.
+
+    """
+    if not isinstance(filepath, Path):
+        filepath = Path(filepath)
+
+    # Keep compact unsigned dtypes, else store as uint32
+    seq = np.asarray(seq)
+    if seq.dtype.kind != "u":
+        seq = seq.astype("uint32")
+    seq = seq.astype(seq.dtype.newbyteorder("<"), copy=False)
+
+    with open(filepath, "wb") as fileout:
+        _write_store_header(fileout, seq.dtype, len(seq), alphabet)
+
+        # Write from the buffer of the array, without another copy
+        fileout.write(np.ascontiguousarray(seq).data)
+
+    return filepath
+
+
+def _write_store_header(fileout, dtype, length, alphabet):
+    """
+    Write magic string, header & padding of a binary sequence store
+
+    Parameters
+    ----------
+    fileout : file object
+        Binary file handle, positioned at the start of the file.
+    dtype : np.dtype
+        Unsigned little-endian type of the data.
+    length : int
+        Number of symbols in the data.
+    alphabet : dict or None
+        Mapping of original characters to symbols.
+
+    Returns
+    -------
+    int
+        Offset of the data in bytes, at which the handle is left.
+
+    """
+    # Serialize header and pad it such that data starts on an aligned offset
+    header = json.dumps(
+        {"dtype": np.dtype(dtype).name, "length": length, "alphabet": alphabet}
+    ).encode()
+    offset = len(STORE_MAGIC) + 4 + len(header)
+    padding = -offset % STORE_ALIGN
+
+    fileout.write(STORE_MAGIC)
+    fileout.write(len(header).to_bytes(4, "little"))
+    fileout.write(header)
+    fileout.write(bytes(padding))
+
+    return offset + padding
+
+
+def _read_store_header(filepath):
+    """
+    Read & validate the header of a binary sequence store
+
+    Parameters
+    ----------
+    filepath : Path object
+        Valid path to a file written by write_store().
+
+    Returns
+    -------
+    tuple or None
+        (header dict, offset of data in bytes), None if the file is not a store.
+
+    """
+    with open(filepath, "rb") as filein:
+        if filein.read(len(STORE_MAGIC)) != STORE_MAGIC:
+            return None
+        size = int.from_bytes(filein.read(4), "little")
+        header = json.loads(filein.read(size))
+
+    offset = len(STORE_MAGIC) + 4 + size
+    return header, offset + (-offset % STORE_ALIGN)
+
+
+def open_store(filepath, return_header=False):
+    """
+    Open a binary sequence store as a read-only memory map, without copying.
+
+    uint32 stores can be passed on directly to compute_1D, LZC, CCC & the batch APIs.
+
+    Parameters
+    ----------
+    filepath : str or Path object
+        Valid path to a file written by write_store().
+    return_header : bool, optional
+        Whether to also return the header with dtype, length & alphabet.
+        The default is False.
+
+    Returns
+    -------
+    np.memmap or tuple or None
+        Sequence, with its header if return_header is True.
+
+    """
+    if not isinstance(filepath, Path):
+        filepath = Path(filepath)
+
+    out = _read_store_header(filepath)
+    if out is None:
+        print("> ERROR: Not a sequence store ...")
+        return None
+    header, offset = out
+
+    dtype = np.dtype(header["dtype"]).newbyteorder("<")
+    if header["length"] == 0:
+        seq = np.zeros(0, dtype=dtype)
+    else:
+        seq = np.memmap(
+            filepath, dtype=dtype, mode="r", offset=offset, shape=(header["length"],)
+        )
+
+    if return_header:
+        return seq, header
+
+    return seq
+
+
+def _convert_single_file(
+    filepath, outdir=None, recoder="lexical", fmt="auto", delimiter=None
+):
+    """
+    This function operates on a single file - streams & recodes its sequence and
+    writes it as a binary sequence store.
+
+    Parameters
+    ----------
+    filepath : Path object
+        Valid path to a plain or compressed file containing a sequence.
+    outdir : Path object, optional
+        Directory for the output. The default is None, writing next to the input.
+    recoder : str, optional
+        "lexical" or "dna", see read_recoded(). The default is "lexical".
+    fmt : str, optional
+        File format, see stream(). The default is "auto".
+    delimiter : str, optional
+        Removed from the content of "raw" files, see stream(). The default is None.
+
+    Returns
+    -------
+    dict
+        Input filename, output path & length of sequence (None if not recoded).
+
+    """
+    target = _store_path(filepath, outdir)
+
+    out = {"file": filepath.name, "store": None, "length": None}
+
+    scanned = _scan(filepath, recoder, fmt, CHUNK_SIZE, delimiter)
+    if scanned is None:
+        return out
+    counts, table = scanned
+    length = int(counts.sum())
+
+    # Write the header, then recode straight into a memmap of the data on disk
+    dtype = np.dtype("uint32").newbyteorder("<")
+    with open(target, "wb") as fileout:
+        offset = _write_store_header(fileout, dtype, length, _alphabet(counts, table))
+        fileout.truncate(offset + length * dtype.itemsize)
+
+    if length:
+        seq = np.memmap(target, dtype=dtype, mode="r+", offset=offset, shape=(length,))
+        _recode_into(filepath, table, fmt, CHUNK_SIZE, seq, delimiter)
+        seq.flush()
+        del seq
+
+    out.update({"store": target, "length": length})
+
+    return out
+
+
+def _store_path(filepath, outdir=None):
+    """
+    Get the path of the store for an input, dropping its compression & format suffixes
+
+    Only known suffixes are dropped, e.g. "chr1.v2.fa.gz" gives "chr1.v2.etcseq".
+
+    Parameters
+    ----------
+    filepath : Path object
+        Path to a plain or compressed file containing a sequence.
+    outdir : Path object, optional
+        Directory for the output. The default is None, for the directory of the input.
+
+    Returns
+    -------
+    Path object
+        Path to the store.
+
+    """
+    name = filepath.name
+    for suffixes in (OPENERS, SEQUENCE_SUFFIXES):
+        suffix = Path(name).suffix
+        if suffix.lower() in suffixes:
+            name = name[: -len(suffix)]
+
+    return (filepath.parent if outdir is None else outdir) / (name + STORE_SUFFIX)
+
+
+def convert_files(
+    filelist, outdir=None, recoder="lexical", fmt="auto", delimiter=None
+):
+    """
+    This function operates concurrently on a list of files. Streams & recodes each
+    and writes it to disk as a binary sequence store.
+
+    CAUTION: main module is unguarded, do not run these functions as is,
+        particularly on Windows.
+
+    Parameters
+    ----------
+    filelist : list/tuple/generator
+        Collection of paths to plain or compressed files, e.g. from populate_files().
+    outdir : str or Path object, optional
+        Directory for the output. The default is None, writing next to each input.
+    recoder : str, optional
+        "lexical" or "dna", see read_recoded(). The default is "lexical".
+    fmt : str, optional
+        File format, see stream(). The default is "auto".
+    delimiter : str, optional
+        Removed from the content of "raw" files, see stream(). The default is None.
+
+    Returns
+    -------
+    list of dict elements
+        Each dictionary element contains filename, path to store & length.
+
+    """
+    filelist = [Path(filepath) for filepath in filelist]
+
+    if outdir is not None:
+        outdir = Path(outdir)
+        outdir.mkdir(parents=True, exist_ok=True)
+
+    # Distinct inputs must not overwrite each other's store
+    targets = [_store_path(filepath, outdir) for filepath in filelist]
+    assert len(set(targets)) == len(targets), "ERROR: Inputs map to the same store!"
+
+    # Initialize pool of parallel workers
+    pool = Pool()
+    func = partial(
+        _convert_single_file,
+        outdir=outdir,
+        recoder=recoder,
+        fmt=fmt,
+        delimiter=delimiter,
+    )
+
+    # Map-execute function across files
+    out = pool.map_async(func, filelist)
+
+    # Graceful exit
+    pool.close()
+    pool.join()
+
+    # Return collected results
+    return out.get()
+
+
 def save(out, filename):
 
     with open(filename, "w") as fileout:
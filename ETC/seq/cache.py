@@ -0,0 +1,535 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Opt-in persistent cache for estimates returned by causality estimators.
+
+Estimates are stored in a SQLite database on disk, keyed by a blake2b digest of the
+input sequences together with the estimator name, its parameters and the package
+version. Estimates are pickled, so that stored ones compare equal to freshly computed
+ones, and only databases from trusted sources should be enabled. The database is
+bounded in size: once full, least recently used estimates are evicted first. Access
+times of hits are written in batches, so that concurrent readers don't queue up for
+the write lock on every hit. Processes & threads share the cache safely through
+SQLite's own locking, each with its own connection, and the location is passed on to
+worker processes through environment variables. Settings are read from the environment
+of the process running the estimator, so workers that are already running, such as the
+reusable ones of joblib, keep whatever was set when they started. Pass settings() to
+such workers and run estimators within applied() to use the current ones.
+
+Usage:
+    from ETC.seq import cache
+    cache.enable("~/.cache/ETC/estimates.db", max_size=2**30)
+    ...
+    cache.disable()
+
+or, for a limited scope:
+    with cache.using("estimates.db"):
+        ...
+
+@author: Pranay S. Yadav
+"""
+# Import calls
+import json
+import os
+import pickle
+import sqlite3
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from hashlib import blake2b
+from importlib.metadata import PackageNotFoundError, version
+from inspect import signature
+from pathlib import Path
+from time import time
+
+import numpy as np
+
+# Environment variables holding the cache location and size, inherited by workers
+ENV_PATH = "ETC_CACHE_PATH"
+ENV_SIZE = "ETC_CACHE_MAXSIZE"
+
+# Default upper bound on the total size of stored estimates, in bytes
+DEFAULT_MAXSIZE = 2 ** 30
+
+# Number of hits whose access times are held back & then written together
+TOUCH_BATCH = 64
+
+# Connections opened by the current thread, keyed by (process id, path)
+_local = threading.local()
+
+
+class _Connection(sqlite3.Connection):
+    """
+    Connection to the cache database, with access times of hits not yet written
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.touched = {}
+
+
+def _package_version():
+    """
+    Get the installed version of the package, used as part of every cache key
+
+    Returns
+    -------
+    str
+        Version string, or "unknown" if running from an uninstalled source tree.
+
+    """
+    try:
+        return version("ETCPy")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def enable(filepath, max_size=DEFAULT_MAXSIZE):
+    """
+    Turn on the persistent cache for this process and any worker process it starts
+
+    Parameters
+    ----------
+    filepath : str or Path object
+        Path to the cache database on disk, created if it doesn't exist.
+    max_size : int, optional
+        Upper bound in bytes on the total size of stored estimates. The default is
+        2**30 (1 GiB).
+
+    Returns
+    -------
+    None.
+
+    """
+    assert (
+        isinstance(max_size, int) and max_size > 0
+    ), "ERROR: max_size should be a positive integer"
+
+    os.environ[ENV_PATH] = str(Path(filepath).expanduser().resolve())
+    os.environ[ENV_SIZE] = str(max_size)
+
+
+def disable():
+    """
+    Turn off the persistent cache. Stored estimates are left on disk.
+
+    Returns
+    -------
+    None.
+
+    """
+    os.environ.pop(ENV_PATH, None)
+    os.environ.pop(ENV_SIZE, None)
+
+
+@contextmanager
+def using(filepath, max_size=DEFAULT_MAXSIZE):
+    """
+    Context manager that enables the persistent cache within its scope
+
+    Parameters
+    ----------
+    filepath : str or Path object
+        Path to the cache database on disk, created if it doesn't exist.
+    max_size : int, optional
+        Upper bound in bytes on the total size of stored estimates. The default is
+        2**30 (1 GiB).
+
+    Yields
+    ------
+    None.
+
+    """
+    previous = settings()
+    enable(filepath, max_size)
+    try:
+        yield
+    finally:
+        # Restore whatever was enabled before entering the context
+        _apply(previous)
+
+
+def settings():
+    """
+    Get the cache settings of this process, for passing on to running workers
+
+    Returns
+    -------
+    dict
+        Values of the environment variables holding the cache location and size,
+        None for those that are not set.
+
+    """
+    return {name: os.environ.get(name) for name in (ENV_PATH, ENV_SIZE)}
+
+
+def _apply(values):
+    """
+    Set the cache settings of this process
+
+    Parameters
+    ----------
+    values : dict
+        Settings as returned by settings(). Those that are None are unset.
+
+    Returns
+    -------
+    None.
+
+    """
+    for name, value in values.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+
+@contextmanager
+def applied(values):
+    """
+    Context manager that applies given cache settings within its scope
+
+    Used in worker processes that may have started before the cache was enabled,
+    disabled or moved in the process that dispatches work to them.
+
+    Parameters
+    ----------
+    values : dict
+        Settings as returned by settings() in the dispatching process.
+
+    Yields
+    ------
+    None.
+
+    """
+    previous = settings()
+    _apply(values)
+    try:
+        yield
+    finally:
+        _apply(previous)
+
+
+def _connect(filepath):
+    """
+    Get a connection to the cache database, reusing one within the same thread
+
+    SQLite connections can't be shared across threads, nor across forked processes.
+
+    Parameters
+    ----------
+    filepath : str
+        Path to the cache database on disk.
+
+    Returns
+    -------
+    sqlite3.Connection
+        Open connection to the cache database.
+
+    """
+    identifier = (os.getpid(), filepath)
+
+    if not hasattr(_local, "connections"):
+        _local.connections = {}
+    _connections = _local.connections
+
+    if identifier not in _connections:
+        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+
+        # Autocommit mode, transactions are managed explicitly
+        conn = sqlite3.connect(
+            filepath, timeout=60, isolation_level=None, factory=_Connection
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS estimates ("
+            "key TEXT PRIMARY KEY, "
+            "estimator TEXT NOT NULL, "
+            "value BLOB NOT NULL, "
+            "size INTEGER NOT NULL, "
+            "accessed REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS by_access ON estimates (accessed)"
+        )
+        _connections[identifier] = conn
+
+    return _connections[identifier]
+
+
+def digest(seq):
+    """
+    Compute a content digest of a sequence, independent of its container type
+
+    Integer sequences are hashed as 64-bit integers and everything else as 64-bit
+    floats, such that a list, an array.array and a NumPy array holding the same
+    values have the same digest.
+
+    Parameters
+    ----------
+    seq : array.array, np.ndarray, list or tuple
+        Sequence of numbers.
+
+    Returns
+    -------
+    str
+        Hexadecimal blake2b digest of the sequence.
+
+    """
+    arr = np.asarray(seq)
+    if arr.dtype.kind in "biu":
+        arr = arr.astype("int64")
+    else:
+        arr = arr.astype("float64")
+
+    return blake2b(np.ascontiguousarray(arr).tobytes(), digest_size=32).hexdigest()
+
+
+def _key(estimator, digests, params):
+    """
+    Combine everything that determines an estimate into a single cache key
+
+    Parameters
+    ----------
+    estimator : str
+        Name of the estimator function.
+    digests : list of str
+        Digests of the input sequences, in order.
+    params : dict
+        Remaining arguments passed to the estimator.
+
+    Returns
+    -------
+    str
+        Hexadecimal blake2b digest used as the cache key.
+
+    """
+    identity = {
+        "estimator": estimator,
+        "inputs": digests,
+        "params": params,
+        "version": _package_version(),
+        "serializer": "pickle",
+    }
+    serialized = json.dumps(identity, sort_keys=True, default=str)
+    return blake2b(serialized.encode(), digest_size=32).hexdigest()
+
+
+def _lookup(conn, key):
+    """
+    Fetch a stored estimate and mark it as recently used, writing access times to
+    disk once TOUCH_BATCH hits have accumulated
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        Open connection to the cache database.
+    key : str
+        Cache key.
+
+    Returns
+    -------
+    object or None
+        Stored estimate, None if not present.
+
+    """
+    row = conn.execute("SELECT value FROM estimates WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return None
+
+    conn.touched[key] = time()
+    if len(conn.touched) >= TOUCH_BATCH:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            _touch(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    return pickle.loads(row[0])
+
+
+def _touch(conn):
+    """
+    Write held back access times of hits, within a transaction of the caller
+
+    Parameters
+    ----------
+    conn : _Connection
+        Open connection to the cache database.
+
+    Returns
+    -------
+    None.
+
+    """
+    conn.executemany(
+        "UPDATE estimates SET accessed = ? WHERE key = ?",
+        [(accessed, key) for key, accessed in conn.touched.items()],
+    )
+    conn.touched.clear()
+
+
+def _store(conn, key, estimator, value, max_size):
+    """
+    Store an estimate and evict least recently used ones beyond max_size bytes
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        Open connection to the cache database.
+    key : str
+        Cache key.
+    estimator : str
+        Name of the estimator function.
+    value : object
+        Picklable estimate.
+    max_size : int
+        Upper bound in bytes on the total size of stored estimates.
+
+    Returns
+    -------
+    None.
+
+    """
+    serialized = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # Take the write lock up front so concurrent writers don't interleave eviction
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Recent hits must count before anything is evicted
+        _touch(conn)
+
+        conn.execute(
+            "INSERT OR REPLACE INTO estimates VALUES (?, ?, ?, ?, ?)",
+            (key, estimator, serialized, len(serialized), time()),
+        )
+
+        # Evict least recently used estimates until the total fits within bounds
+        total = conn.execute("SELECT SUM(size) FROM estimates").fetchone()[0]
+        excess = total - max_size
+        if excess > 0:
+            stale = []
+            for old_key, size in conn.execute(
+                "SELECT key, size FROM estimates ORDER BY accessed ASC"
+            ):
+                if excess <= 0:
+                    break
+                stale.append((old_key,))
+                excess -= size
+            conn.executemany("DELETE FROM estimates WHERE key = ?", stale)
+
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def cached(estimator, sequences=("x", "y")):
+    """
+    Decorator that routes calls to an estimator through the persistent cache
+
+    When the cache is disabled, the estimator is called directly. When enabled, the
+    arguments named in sequences are digested, all other arguments are taken as
+    parameters, and a stored estimate is returned if present. Estimates of None,
+    returned on invalid input, are never stored.
+
+    Parameters
+    ----------
+    estimator : str
+        Name of the estimator, part of the cache key.
+    sequences : tuple of str, optional
+        Names of the arguments holding input sequences. The default is ("x", "y").
+
+    Returns
+    -------
+    function
+        Decorator to apply on the estimator function.
+
+    """
+
+    def decorator(func):
+
+        sig = signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+
+            # Short-circuit if the cache has not been enabled
+            filepath = os.environ.get(ENV_PATH)
+            if filepath is None:
+                return func(*args, **kwargs)
+
+            # Separate input sequences from parameters
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+
+            # Inputs that can't be digested are left for the estimator to report
+            try:
+                digests = [digest(bound.arguments[name]) for name in sequences]
+            except (TypeError, ValueError):
+                return func(*args, **kwargs)
+
+            params = {
+                name: value
+                for name, value in bound.arguments.items()
+                if name not in sequences
+            }
+            key = _key(estimator, digests, params)
+
+            # Return stored estimate if available
+            conn = _connect(filepath)
+            value = _lookup(conn, key)
+            if value is not None:
+                return value
+
+            # Else compute, store and return
+            value = func(*args, **kwargs)
+            if value is not None:
+                max_size = int(os.environ.get(ENV_SIZE, DEFAULT_MAXSIZE))
+                _store(conn, key, estimator, value, max_size)
+
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def info():
+    """
+    Summarize the contents of the persistent cache, if enabled
+
+    Returns
+    -------
+    dict or None
+        Path, number of stored estimates and their total size in bytes. None if the
+        cache is disabled.
+
+    """
+    filepath = os.environ.get(ENV_PATH)
+    if filepath is None:
+        return None
+
+    entries, size = _connect(filepath).execute(
+        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM estimates"
+    ).fetchone()
+
+    return {"path": filepath, "entries": entries, "size": size}
+
+
+def clear():
+    """
+    Remove all stored estimates from the persistent cache, if enabled
+
+    Returns
+    -------
+    None.
+
+    """
+    filepath = os.environ.get(ENV_PATH)
+    if filepath is not None:
+        conn = _connect(filepath)
+        conn.touched.clear()
+        conn.execute("DELETE FROM estimates")
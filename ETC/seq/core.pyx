@@ -0,0 +1,153 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, nonecheck=False, emit_code_comments=True, cdivision=True, embedsignature=True
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+
+@author: Pranay S. Yadav
+"""
+# Import stuff
+cimport cython
+
+
+# Function for sampling a Markov chain from cumulative transition tables
+cpdef void markov_chain(
+    const long long[::1] contexts,
+    const double[:, ::1] cumulative,
+    const double[::1] marginal,
+    const double[::1] uniforms,
+    long long[::1] chain,
+    unsigned int k,
+    unsigned int sigma,
+):
+    """
+    INPUT
+    -----
+    contexts : np.ndarray
+        Sorted base-sigma integer codes of observed contexts (k-mers), as int64.
+    cumulative : np.ndarray
+        Cumulative transition probabilities, one row per context and one column per
+        symbol, each row ending in 1.
+    marginal : np.ndarray
+        Cumulative marginal probabilities of symbols, used for unobserved contexts.
+    uniforms : np.ndarray
+        Uniform random numbers in [0, 1), one per symbol to be sampled.
+    chain : np.ndarray
+        Symbol codes (0 to sigma-1), as int64. The first k elements hold the initial
+        context, the remaining len(uniforms) elements are filled in place.
+    k : int
+        Length of context.
+    sigma : int
+        Size of alphabet.
+
+    OUTPUT
+    ------
+    None
+    """
+    # Initialize loop bounds
+    cdef Py_ssize_t n, lo, hi, mid, j
+    cdef Py_ssize_t size = uniforms.shape[0]
+    cdef Py_ssize_t n_contexts = contexts.shape[0]
+
+    # Place value of the leading symbol of a context, for dropping it when rolling
+    cdef long long lead = 1
+    for j in range(k - 1):
+        lead *= sigma
+
+    # Code of the initial context
+    cdef long long ctx = 0
+    for j in range(k):
+        ctx = ctx * sigma + chain[j]
+
+    cdef const double[::1] row
+    cdef double u
+
+    for n in range(size):
+
+        # Binary search for the current context among observed ones
+        lo = 0
+        hi = n_contexts
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if contexts[mid] < ctx:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        # Fall back to marginal probabilities for unobserved contexts
+        if lo < n_contexts and contexts[lo] == ctx:
+            row = cumulative[lo]
+        else:
+            row = marginal
+
+        # Inverse transform sampling: first symbol whose cumulative exceeds u
+        u = uniforms[n]
+        j = 0
+        while j < sigma - 1 and row[j] <= u:
+            j += 1
+
+        # Store symbol and roll context over by one symbol
+        chain[k + n] = j
+        ctx = (ctx % lead) * sigma + j
+
+
+# Unsigned integer types for symbols
+ctypedef fused symbol_t:
+    unsigned char
+    unsigned short
+    unsigned int
+
+
+# Function for mapping delay-embedded vectors to ordinal pattern symbols
+cpdef void ordinal_patterns(
+    const double[:, ::1] x,
+    symbol_t[:, ::1] out,
+    unsigned int dim,
+    unsigned int lag,
+):
+    """
+    INPUT
+    -----
+    x : np.ndarray
+        2D array of float64, one series per row.
+    out : np.ndarray
+        2D array of uint8, uint16 or uint32 with as many rows as x and
+        x.shape[1] - (dim - 1) * lag columns, filled in place.
+    dim : int
+        Embedding dimension, length of each pattern, from 2 to 12.
+    lag : int
+        Spacing between elements of each pattern.
+
+    OUTPUT
+    ------
+    None
+    """
+    # Initialize loop bounds
+    cdef Py_ssize_t row, t, i, j
+    cdef Py_ssize_t n_rows = out.shape[0]
+    cdef Py_ssize_t size = out.shape[1]
+
+    # Factorial weights of Lehmer code digits
+    cdef unsigned int weights[12]
+    weights[dim - 1] = 1
+    for i in range(dim - 2, -1, -1):
+        weights[i] = weights[i + 1] * (dim - 1 - i)
+
+    cdef unsigned int code, smaller
+    cdef double value
+
+    for row in range(n_rows):
+        for t in range(size):
+
+            # Lehmer code: count later values strictly smaller than each value
+            code = 0
+            for i in range(dim - 1):
+                value = x[row, t + i * lag]
+                smaller = 0
+                for j in range(i + 1, dim):
+                    if x[row, t + j * lag] < value:
+                        smaller += 1
+                code += smaller * weights[i]
+
+            # Symbols start from 1
+            out[row, t] = <symbol_t>(code + 1)
@@ -10,7 +10,7 @@ import numpy as np
 from libc.math cimport log2
 cimport numpy as np
 
-cpdef double entropy(unsigned int[::1] x):
+cpdef double entropy(const unsigned int[::1] x):
 
     # cdef np.ndarray[np.npy_int64, ndim=1] counts = np.bincount(x)
     cdef long int[:] counts_view = np.bincount(x)
@@ -6,14 +6,24 @@ nucleotide sequence stored as text files.
 
 compute() is the main function that wraps around smaller modular functions.
 
+Transition counts are estimated on integer codes: each symbol is mapped to its rank
+in the sorted alphabet, k-mers are indexed by a rolling base-sigma integer and
+transitions are counted with bincount into a dense (or scipy.sparse) matrix. The
+string-based helpers _generate_overlaps & _compute_transition_probs are kept for
+reference and as a fallback for k-mer spaces too large for 64-bit indices.
+
 @author: pranay
 """
 
 # Import calls
 from pathlib import Path
-from random import choices, seed
 import numpy as np
-import pandas as pd
+
+from ETC.seq import core
+
+# Largest number of possible k-mers for which observed ones are found via bincount
+DENSE_LIMIT = 2 ** 22
+
 
 # Function Definitions
 def _read_sequence(filepath):
@@ -102,6 +112,9 @@ def _compute_transition_probs(sequence, compact=True, flatten=False):
         2 columns, 1 each for the (n-1)th and nth state.
 
     """
+    # Import pandas here, it is only needed for tabulation and is slow to import
+    import pandas as pd
+
     # If compact requested, use only the last alphabet of the next subsequence.
     # The Nth element will only differ from the (N-1)th in shift by 1
     if compact:
@@ -144,6 +157,302 @@ def _compute_transition_probs(sequence, compact=True, flatten=False):
     return df
 
 
+def _encode(sequence):
+    """
+    Map each character of a string to its rank in the sorted alphabet of the string
+
+    Parameters
+    ----------
+    sequence : string
+        String containing nucleotide sequence.
+
+    Returns
+    -------
+    codes : np.ndarray
+        Integer code (0 to sigma-1) of each character, as int64.
+    alphabet : np.ndarray
+        Sorted unicode code points of the distinct characters, as uint32.
+
+    """
+    # View the string as an array of unicode code points without per-character loops
+    points = np.frombuffer(sequence.encode("utf-32-le"), dtype="uint32")
+
+    # Sorted distinct code points & the rank of each character among them
+    alphabet, codes = np.unique(points, return_inverse=True)
+
+    return codes.astype("int64"), alphabet
+
+
+def _kmer_codes(codes, sigma, k, count):
+    """
+    Compute base-sigma integer indices of the first count overlapping k-mers
+
+    Indices preserve lexicographic order, such that sorting them sorts the k-mers.
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        Integer code (0 to sigma-1) of each character, as int64.
+    sigma : int
+        Size of alphabet.
+    k : int
+        Length of k-mers.
+    count : int
+        Number of k-mers, starting from position 0.
+
+    Returns
+    -------
+    np.ndarray
+        Index of each k-mer, as int64.
+
+    """
+    # Roll the index: shift left by one digit & add the next character
+    out = codes[:count].copy()
+    for idx in range(1, k):
+        out *= sigma
+        out += codes[idx : idx + count]
+
+    return out
+
+
+def _decode_kmers(kmers, alphabet, k):
+    """
+    Convert base-sigma integer indices of k-mers back to strings
+
+    Parameters
+    ----------
+    kmers : np.ndarray
+        Indices of k-mers, as int64.
+    alphabet : np.ndarray
+        Sorted unicode code points of the distinct characters, as uint32.
+    k : int
+        Length of k-mers.
+
+    Returns
+    -------
+    np.ndarray
+        Array of k-mer strings.
+
+    """
+    sigma = len(alphabet)
+
+    # Extract digits from the most significant one, as code points
+    points = np.empty((len(kmers), k), dtype="uint32")
+    rest = kmers.copy()
+    for idx in range(k - 1, -1, -1):
+        rest, digit = np.divmod(rest, sigma)
+        points[:, idx] = alphabet[digit]
+
+    # Reinterpret each row of k code points as a single string of length k
+    return points.view(f"<U{k}").ravel()
+
+
+def _factorize(values, size):
+    """
+    Find distinct values in sorted order and the position of each value among them
+
+    Uses bincount when the space of possible values is small, else sorting.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Non-negative integers, as int64.
+    size : int
+        Number of possible values.
+
+    Returns
+    -------
+    labels : np.ndarray
+        Sorted distinct values.
+    inverse : np.ndarray
+        Position of each element of values in labels.
+
+    """
+    if size <= DENSE_LIMIT:
+        present = np.bincount(values, minlength=size) > 0
+        ranks = np.cumsum(present) - 1
+        return np.flatnonzero(present), ranks[values]
+
+    return np.unique(values, return_inverse=True)
+
+
+def _count_codes(codes, sigma, k, compact=True, sparse=False):
+    """
+    Count transitions between overlapping k-mers of an integer-coded sequence
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        Integer code (0 to sigma-1) of each character, as int64.
+    sigma : int
+        Size of alphabet.
+    k : int
+        Length of k-mers, order + 1.
+    compact : bool, optional
+        Whether to count transitions to the next character only (True) or to the
+        next overlapping k-mer (False). The default is True.
+    sparse : bool, optional
+        Whether to return counts as a scipy.sparse CSR matrix. The default is False.
+
+    Returns
+    -------
+    counts : np.ndarray or scipy.sparse.csr_matrix
+        Matrix of transition counts between observed states.
+    rows : np.ndarray
+        Sorted base-sigma indices of observed previous k-mers.
+    cols : np.ndarray
+        Sorted codes of observed next characters or indices of next k-mers.
+
+    """
+    # Same subsequences as _generate_overlaps: positions 0 to len - k - 1
+    count = len(codes) - k
+    kmers = _kmer_codes(codes, sigma, k, count)
+
+    # Pair each subsequence with the next character or the next subsequence
+    if compact:
+        previous, following = kmers[:-1], codes[k : k + count - 1]
+        size_next = sigma
+    else:
+        previous, following = kmers[:-1], kmers[1:]
+        size_next = sigma ** k
+
+    # Find observed states and the position of each transition among them
+    rows, row_idx = _factorize(previous, sigma ** k)
+    cols, col_idx = _factorize(following, size_next)
+
+    # Count transitions
+    if sparse:
+        from scipy.sparse import coo_matrix
+
+        counts = coo_matrix(
+            (np.ones(len(row_idx), dtype="int64"), (row_idx, col_idx)),
+            shape=(len(rows), len(cols)),
+        ).tocsr()
+    else:
+        counts = np.bincount(
+            row_idx * len(cols) + col_idx, minlength=len(rows) * len(cols)
+        ).reshape(len(rows), len(cols))
+
+    return counts, rows, cols
+
+
+def transition_counts(sequence, order, compact=True, sparse=False):
+    """
+    This function counts transitions between overlapping subsequences of length
+    order + 1, using integer codes. Rows & columns are restricted to observed states
+    and sorted, as done by _compute_transition_probs.
+
+    Parameters
+    ----------
+    sequence : string
+        String containing nucleotide sequence.
+    order : int
+        Order of Markov Transition Probability Matrix for computing overlaps
+    compact : bool, optional
+        Whether to count transitions to the next character only (True) or to the
+        next overlapping subsequence (False).
+            The default is True.
+    sparse : bool, optional
+        Whether to return counts as a scipy.sparse CSR matrix instead of a dense
+        NumPy array.
+            The default is False.
+
+    Returns
+    -------
+    dict or None
+        "counts" - matrix of transition counts,
+        "previous" - array of row labels,
+        "next" - array of column labels.
+        None if the number of possible subsequences exceeds 64-bit indices.
+
+    """
+    # Length of each overlapping subsequence
+    k = order + 1
+
+    # Encode sequence as integer codes
+    codes, alphabet = _encode(sequence)
+    sigma = len(alphabet)
+
+    # Bail out if k-mer indices do not fit in 64 bits
+    if sigma ** k >= 2 ** 63:
+        print("> ERROR: Too many possible subsequences for integer indexing ...")
+        return None
+
+    # Count transitions on integer codes
+    counts, rows, cols = _count_codes(codes, sigma, k, compact, sparse)
+
+    return {
+        "counts": counts,
+        "previous": _decode_kmers(rows, alphabet, k),
+        "next": _decode_kmers(cols, alphabet, 1 if compact else k),
+    }
+
+
+def transition_probs(sequence, order, compact=True, flatten=False):
+    """
+    This function computes the transition probability matrix of given order for a
+    string, returned as a labelled dataframe identical to the one produced by
+    _compute_transition_probs on _generate_overlaps.
+
+    Parameters
+    ----------
+    sequence : string
+        String containing nucleotide sequence.
+    order : int
+        Order of Markov Transition Probability Matrix for computing overlaps
+    compact : bool, optional
+        Whether to return the full sparse matrix or to return a more compact
+        representation of it.
+            The default is True.
+    flatten : bool, optional
+        Whether to flatten (or tidy / long-form) the matrix or not.
+            The default is False.
+
+    Returns
+    -------
+    pandas DataFrame
+        Tabulated transition probabilities with row & column labels describing
+        the (n-1)th and nth state respectively.
+
+    """
+    # Count transitions on integer codes
+    out = transition_counts(sequence, order, compact=compact)
+
+    # Fall back to string-based cross-tabulation if integer indexing isn't possible
+    if out is None:
+        overlapped = _generate_overlaps(sequence, order)
+        return _compute_transition_probs(overlapped, compact=compact, flatten=flatten)
+
+    # Normalize counts row-wise to get probabilities
+    counts = out["counts"]
+    probs = counts / counts.sum(axis=1, keepdims=True)
+
+    # Import pandas here, it is only needed for tabulation and is slow to import
+    import pandas as pd
+
+    # Label rows & columns
+    df = pd.DataFrame(
+        probs,
+        index=pd.Index(out["previous"].tolist(), name="previous"),
+        columns=pd.Index(out["next"].tolist(), name="next"),
+    )
+
+    # If flatten requested, pivot all columns into a single column
+    if flatten:
+
+        # Stack all columns
+        df = df.stack()
+
+        # Set name for the Series object
+        df.name = "probability"
+
+        # Return a DataFrame by resetting the Series index
+        return df.reset_index()
+
+    # If flatten not requested, return DataFrame
+    return df
+
+
 def _check_inputs(filepath, order, compact, flatten):
     """
     This function checks the input arguments to compute() for validity based
@@ -199,8 +508,7 @@ def compute(filepath, order, compact=True, flatten=False):
     function is modular and wraps around the following 4 functions:
         _check_inputs - for validating input arguments
         _read_sequence - for reading text file containing nucleotide sequence
-        _generate_overlaps - for creating overlapped subsequences
-        _compute_transition_probs - for creating transition probability matrix
+        transition_probs - for creating transition probability matrix
 
     Parameters
     ----------
@@ -232,32 +540,146 @@ def compute(filepath, order, compact=True, flatten=False):
     if not _check_inputs(filepath, order, compact, flatten):
         return None
 
-    # Read sequence file and get tuple of overlapping subsequences
-    sequence = _generate_overlaps(_read_sequence(filepath), order)
+    # Read sequence file, compute and return transition probability matrix
+    return transition_probs(
+        _read_sequence(filepath), order, compact=compact, flatten=flatten
+    )
 
-    # Compute and return transition probability matrix
-    return _compute_transition_probs(sequence, compact=compact, flatten=flatten)
 
+def _sampling_tables(codes, sigma, k):
+    """
+    Build cumulative transition tables indexed by integer context codes
 
-def sample_sequence(sequence, order, size, sampler_seed=0):
+    Parameters
+    ----------
+    codes : np.ndarray
+        Integer code (0 to sigma-1) of each character, as int64.
+    sigma : int
+        Size of alphabet.
+    k : int
+        Length of context, order + 1.
 
-    # Read sequence file and get tuple of overlapping subsequences
-    overlapped = _generate_overlaps(sequence, order)
+    Returns
+    -------
+    contexts : np.ndarray
+        Sorted base-sigma indices of observed contexts.
+    cumulative : np.ndarray
+        Cumulative transition probabilities, one row per context & one column per
+        symbol of the alphabet.
+    marginal : np.ndarray
+        Cumulative marginal probabilities of symbols.
 
-    # Compute and return transition probability matrix
-    transition_probs = _compute_transition_probs(
-        overlapped, compact=True, flatten=False
-    )
+    """
+    # Count context to next character transitions, same as compact transition_probs
+    counts, contexts, cols = _count_codes(codes, sigma, k, compact=True)
 
-    order += 1
-    chain = sequence[-order:]
+    # Spread observed next characters over the full alphabet & accumulate
+    table = np.zeros((len(contexts), sigma), dtype="float64")
+    table[:, cols] = counts
+    cumulative = np.cumsum(table, axis=1)
+    cumulative /= cumulative[:, -1:]
+
+    # Marginal distribution of symbols for contexts that never occurred
+    marginal = np.cumsum(np.bincount(codes, minlength=sigma).astype("float64"))
+    marginal /= marginal[-1]
+
+    return contexts, np.ascontiguousarray(cumulative), marginal
+
+
+def sample_sequences(sequence, order, size, n=1, seed=0):
+    """
+    This function generates independent surrogates of a string by sampling from its
+    Markov transition probabilities of given order. Each surrogate continues from
+    the last order + 1 characters of the input.
+
+    Transition tables are built once & uniform random numbers are drawn one row per
+    surrogate from a seeded numpy.random.Generator, the chain itself runs in compiled
+    code.
+    Contexts that never occurred in the input are followed by a draw from the
+    marginal distribution of characters.
+
+    Parameters
+    ----------
+    sequence : string
+        String containing nucleotide sequence.
+    order : int
+        Order of Markov Transition Probability Matrix, as for compute()
+    size : int
+        Length of each surrogate.
+    n : int, optional
+        Number of surrogates. The default is 1.
+    seed : int, optional
+        Seed for numpy.random.default_rng. The default is 0.
+
+    Returns
+    -------
+    list or None
+        List of n strings, each of length size.
+
+    """
+    # Length of context
+    k = order + 1
 
-    seed(sampler_seed)
+    if len(sequence) < k:
+        print("> ERROR: Sequence should be longer than order ...")
+        return None
+
+    # Encode sequence as integer codes
+    codes, alphabet = _encode(sequence)
+    sigma = len(alphabet)
+
+    # Bail out if k-mer indices do not fit in 64 bits
+    if sigma ** k >= 2 ** 63:
+        print("> ERROR: Too many possible subsequences for integer indexing ...")
+        return None
+
+    if size == 0:
+        return [""] * n
+
+    # Build cumulative tables
+    contexts, cumulative, marginal = _sampling_tables(codes, sigma, k)
+    rng = np.random.default_rng(seed)
+    uniforms = np.empty(size, dtype="float64")
+
+    # Run each chain from the last context of the input
+    out = np.empty((n, size), dtype="uint32")
+    chain = np.empty(k + size, dtype="int64")
+    for idx in range(n):
+
+        # Draw uniforms for this chain only, continuing the same stream
+        rng.random(out=uniforms)
+        chain[:k] = codes[-k:]
+        core.markov_chain(contexts, cumulative, marginal, uniforms, chain, k, sigma)
+        out[idx] = alphabet[chain[k:]]
+
+    # Reinterpret each row of code points as a single string
+    return out.view(f"<U{size}").ravel().tolist()
+
+
+def sample_sequence(sequence, order, size, sampler_seed=0):
+    """
+    This function extends a string by sampling from its Markov transition
+    probabilities of given order. See sample_sequences() for details.
+
+    Parameters
+    ----------
+    sequence : string
+        String containing nucleotide sequence.
+    order : int
+        Order of Markov Transition Probability Matrix, as for compute()
+    size : int
+        Number of characters to generate.
+    sampler_seed : int, optional
+        Seed for numpy.random.default_rng. The default is 0.
+
+    Returns
+    -------
+    string or None
+        Generated string of length size.
 
-    for n in range(size):
-        last = chain[-order:]
-        probs = transition_probs.loc[last, :]
-        new = "".join(choices(population=probs.index, weights=probs.values, k=1))
-        chain += new
+    """
+    out = sample_sequences(sequence, order, size, n=1, seed=sampler_seed)
+    if out is None:
+        return None
 
-    return chain[order:]
+    return out[0]
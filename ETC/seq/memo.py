@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bounded in-process memoization for complexity estimators.
+
+Short symbolic windows recur often within a single job, for instance repeated motifs
+in CCC windows or identical epochs. When enabled, results of compute_1D, compute_2D
+and LZC are kept in a least-recently-used table keyed by a blake2b digest of the input
+buffer together with the remaining arguments (order, verbose, truncate). When disabled,
+which is the default, estimators are called directly after a single global check.
+
+Usage:
+    from ETC.seq import memo
+    memo.enable(maxsize=4096)
+    ...
+    memo.stats()
+    memo.disable()
+
+or, for a limited scope:
+    with memo.memoized(maxsize=4096):
+        ...
+
+@author: Pranay S. Yadav
+"""
+# Import calls
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from hashlib import blake2b
+from inspect import signature
+
+import numpy as np
+
+from ETC.seq.check import arraytype
+from ETC.seq.recode import cast
+
+# Default number of results held in memory
+DEFAULT_MAXSIZE = 4096
+
+# Active table, None when memoization is disabled
+_table = None
+
+# Hit and miss counters for the active table
+_counts = {"hits": 0, "misses": 0}
+
+
+def enable(maxsize=DEFAULT_MAXSIZE):
+    """
+    Turn on memoization for this process, starting from an empty table
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximum number of results held in memory. The default is 4096.
+
+    Returns
+    -------
+    None.
+
+    """
+    global _table
+
+    assert (
+        isinstance(maxsize, int) and maxsize > 0
+    ), "ERROR: maxsize should be a positive integer"
+
+    _table = {"maxsize": maxsize, "entries": OrderedDict()}
+    _counts["hits"] = _counts["misses"] = 0
+
+
+def disable():
+    """
+    Turn off memoization and release all held results
+
+    Returns
+    -------
+    None.
+
+    """
+    global _table
+    _table = None
+
+
+@contextmanager
+def memoized(maxsize=DEFAULT_MAXSIZE):
+    """
+    Context manager that enables memoization within its scope
+
+    Statistics remain available through stats() until the next call to enable().
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximum number of results held in memory. The default is 4096.
+
+    Yields
+    ------
+    None.
+
+    """
+    global _table
+
+    previous = _table
+    enable(maxsize)
+    try:
+        yield
+    finally:
+        _table = previous
+
+
+def stats():
+    """
+    Report memoization statistics since the last call to enable()
+
+    Returns
+    -------
+    dict
+        Number of hits, misses, hit rate and results currently held.
+
+    """
+    hits, misses = _counts["hits"], _counts["misses"]
+    total = hits + misses
+
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / total if total else 0.0,
+        "entries": 0 if _table is None else len(_table["entries"]),
+    }
+
+
+def clear():
+    """
+    Drop all held results and reset statistics, keeping memoization enabled
+
+    Returns
+    -------
+    None.
+
+    """
+    if _table is not None:
+        _table["entries"].clear()
+    _counts["hits"] = _counts["misses"] = 0
+
+
+def _fingerprint(seq):
+    """
+    Compute a digest of the raw buffer of a sequence
+
+    Parameters
+    ----------
+    seq : array.array, np.ndarray, list or tuple
+        Sequence of positive integers.
+
+    Returns
+    -------
+    bytes or None
+        blake2b digest of the uint32 buffer, None if seq cannot be cast.
+
+    """
+    # Coerce input to appropriate array type, if not possible bail out
+    if not arraytype(seq):
+        seq = cast(seq)
+        if seq is None:
+            return None
+
+    # Strided views, e.g. slices with a step, are hashed from a contiguous copy
+    return blake2b(np.ascontiguousarray(seq), digest_size=16).digest()
+
+
+def memoize(estimator, sequences=("seq",)):
+    """
+    Decorator that routes calls to an estimator through the in-process memo table
+
+    Parameters
+    ----------
+    estimator : str
+        Name of the estimator, part of the key.
+    sequences : tuple of str, optional
+        Names of the arguments holding input sequences. The default is ("seq",).
+
+    Returns
+    -------
+    function
+        Decorator to apply on the estimator function.
+
+    """
+
+    def decorator(func):
+
+        sig = signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+
+            # Short-circuit if memoization has not been enabled
+            if _table is None:
+                return func(*args, **kwargs)
+
+            # Separate input sequences from parameters
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            digests = tuple(_fingerprint(bound.arguments[name]) for name in sequences)
+
+            # Invalid input, let the estimator report it
+            if None in digests:
+                return func(*args, **kwargs)
+
+            params = tuple(
+                (name, value)
+                for name, value in bound.arguments.items()
+                if name not in sequences
+            )
+            key = (estimator, digests, params)
+
+            # Return held result if available, marking it as recently used
+            entries = _table["entries"]
+            if key in entries:
+                entries.move_to_end(key)
+                _counts["hits"] += 1
+                value = entries[key]
+                return dict(value) if isinstance(value, dict) else value
+
+            # Else compute and hold, evicting the least recently used result if full
+            _counts["misses"] += 1
+            value = func(*args, **kwargs)
+            if value is not None:
+                entries[key] = value
+                if len(entries) > _table["maxsize"]:
+                    entries.popitem(last=False)
+                value = dict(value) if isinstance(value, dict) else value
+
+            return value
+
+        return wrapper
+
+    return decorator
@@ -10,8 +10,9 @@ from math import log2
 from random import choices
 from random import seed as seedvalue
 from ETC.seq import estimates, recode
-from array import array
+from ETC.seq.check import arraytype
 import re
+import numpy as np
 
 
 def sanitize(text, whitespace=False, lowercase=False):
@@ -30,10 +31,67 @@ def sanitize(text, whitespace=False, lowercase=False):
     return text
 
 
-def generate(size=10, partitions=2, seed=None):
+# Number of rows drawn from each spawned random stream by generate()
+BLOCK_ROWS = 256
+
+
+def spawn_seeds(seed, n):
+    """
+    Spawn independent seed sequences, e.g. one per worker process.
+
+    Parameters
+    ----------
+    seed : int, np.random.SeedSequence or None
+        Root seed. None draws fresh entropy from the OS.
+    n : int
+        Number of seed sequences to spawn.
+
+    Returns
+    -------
+    list of np.random.SeedSequence
+        Independent child seed sequences, each usable as seed for generate() or
+        np.random.default_rng().
+
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+
+    return seed.spawn(n)
+
+
+def _block_rng(seed, block):
+    """
+    Get the random generator for a block of rows in generate()
+
+    Parameters
+    ----------
+    seed : np.random.SeedSequence
+        Root seed sequence.
+    block : int
+        Index of block of BLOCK_ROWS rows.
+
+    Returns
+    -------
+    np.random.Generator
+        Generator for the block, independent of all other blocks.
+
+    """
+    child = np.random.SeedSequence(
+        seed.entropy, spawn_key=seed.spawn_key + (block,)
+    )
+    return np.random.default_rng(child)
+
+
+def generate(size=10, partitions=2, seed=None, n=None, dtype="uint32", start=0):
     """
     This function generates discrete random data of desired size and bins.
 
+    Without n, a single sequence is drawn with the random module, seeded globally.
+    With n, a 2D array of n sequences is drawn from numpy.random.Generator streams.
+    Rows are split into blocks of BLOCK_ROWS, each with its own stream spawned from
+    seed, such that row i is identical whichever call generates it. Workers can
+    thus produce disjoint parts of one reproducible batch by setting start & n.
+
     Parameters
     ----------
     size : int, optional
@@ -42,11 +100,20 @@ def generate(size=10, partitions=2, seed=None):
         Number of bins/paritions to create.
     seed : int, optional
         Seed value for initializing the random number generator. The default is None
+        With n, may also be a np.random.SeedSequence, e.g. from spawn_seeds().
+    n : int, optional
+        Number of sequences to generate as rows of a 2D array. The default is None,
+        generating a single sequence as array.array.
+    dtype : str, optional
+        Type of the 2D array. The default is "uint32".
+    start : int, optional
+        Index of the first row to generate, for splitting a batch across workers.
+        The default is 0.
 
     Returns
     -------
-    list
-        Collection of integers sampled from discrete uniform.
+    array.array or np.ndarray
+        Collection of integers sampled from discrete uniform, 1D or 2D (n x size).
 
     """
     if not (isinstance(partitions, int) and isinstance(size, int) and partitions >= 2):
@@ -54,10 +121,42 @@ def generate(size=10, partitions=2, seed=None):
         print(">> Number of bins is invalid ...")
         return None
 
-    if seed:
-        seedvalue(seed)
+    if n is None:
+        if seed:
+            seedvalue(seed)
+
+        return recode.cast(choices(range(1, partitions + 1), k=size))
+
+    assert isinstance(n, int) and n >= 0, "ERROR: n should be a non-negative integer"
+    assert partitions <= np.iinfo(dtype).max, f"ERROR: Too many partitions for {dtype}"
+
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+
+    # Draw only the requested rows of every block overlapping them
+    first, last = start // BLOCK_ROWS, -(-(start + n) // BLOCK_ROWS)
+    out = np.empty((n, size), dtype=dtype)
+    for block in range(first, last):
+        rng = _block_rng(seed, block)
+
+        # Overlap between this block & the requested rows
+        lo = max(block * BLOCK_ROWS, start)
+        hi = min((block + 1) * BLOCK_ROWS, start + n)
+        skip = lo - block * BLOCK_ROWS
+
+        # Streams fill rows in order, so rows past hi are never drawn while rows before
+        # lo are drawn & discarded, one at a time unless draws are buffered per call
+        if np.dtype(dtype).itemsize >= 4:
+            for _ in range(skip):
+                rng.integers(1, partitions + 1, size=size, dtype=dtype)
+            skip = 0
+
+        rows = rng.integers(
+            1, partitions + 1, size=(skip + hi - lo, size), dtype=dtype
+        )
+        out[lo - start : hi - start] = rows[skip:]
 
-    return recode.cast(choices(range(1, partitions + 1), k=size))
+    return out
 
 
 def frequencies(seq):
@@ -81,7 +180,7 @@ def entropy(seq, legacy=False):
 
     """
 
-    if isinstance(seq, array) and seq.typecode == "I" and not legacy:
+    if arraytype(seq) and not legacy:
         return estimates.entropy(seq)
 
     # Get counts from Counter, normalize by total, transform each and sum all
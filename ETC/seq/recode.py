@@ -6,10 +6,11 @@
 @author: Pranay S. Yadav
 """
 
-from string import ascii_lowercase
+from math import factorial
 from random import shuffle, choices
 from array import array
 import numpy as np
+from ETC.seq import core
 from ETC.seq.check import zeroes
 
 
@@ -62,6 +63,177 @@ def cast(seq):
     return None
 
 
+def _as_array(seq):
+    """
+    Convert a uint32 NumPy array to array.array of typecode "I" in a single copy
+
+    Parameters
+    ----------
+    seq : np.ndarray
+        Sequence of uint32 integers.
+
+    Returns
+    -------
+    array.array
+        Same sequence as array.array of typecode "I".
+
+    """
+    return array("I", seq.astype("uint32", copy=False).tobytes())
+
+
+def byte_table(present, recoder="lexical"):
+    """
+    Build a 256-entry lookup table mapping bytes (ASCII characters) to symbols.
+
+    Parameters
+    ----------
+    present : np.ndarray
+        Boolean mask of length 256, True for byte values occurring in the input.
+    recoder : str, optional
+        One of:
+            "lexical" - symbols 1, 2, ... in sorted order of the present characters
+            "alphabetical" - a/A to z/Z as 1 to 26
+            "dna" - purines (A, G) as 1 & pyrimidines (C, T) as 2, in either case
+        The default is "lexical".
+
+    Returns
+    -------
+    np.ndarray or None
+        Table of uint32 symbols, 0 for bytes that are not mapped. None if a present
+        byte cannot be recoded with the chosen scheme.
+
+    """
+    table = np.zeros(256, dtype="uint32")
+
+    if recoder == "lexical":
+        table[present] = np.arange(1, present.sum() + 1, dtype="uint32")
+        return table
+
+    if recoder == "alphabetical":
+        table[97:123] = table[65:91] = np.arange(1, 27, dtype="uint32")
+        message = "> Input contains non alphabetical characters!"
+
+    elif recoder == "dna":
+        table[list(b"AGag")] = 1
+        table[list(b"CTct")] = 2
+        message = "> ERROR: Input contains characters other than A, C, G and T"
+
+    else:
+        print(f"> ERROR: Unknown recoder {recoder}")
+        return None
+
+    if (present & (table == 0)).any():
+        print(message)
+        return None
+
+    return table
+
+
+def _ascii_bytes(text):
+    """
+    View a string as an array of bytes, if it only contains ASCII characters
+
+    Parameters
+    ----------
+    text : str
+        Input string.
+
+    Returns
+    -------
+    np.ndarray or None
+        Array of uint8 character codes, None if text is not ASCII.
+
+    """
+    try:
+        return np.frombuffer(text.encode("ascii"), dtype="uint8")
+    except UnicodeEncodeError:
+        return None
+
+
+def _code_points(text):
+    """
+    View a string as an array of its code points, as bytes if it is ASCII
+
+    Parameters
+    ----------
+    text : str
+        Input string.
+
+    Returns
+    -------
+    np.ndarray
+        Array of uint8 (ASCII) or uint32 code points, in the order of characters.
+
+    """
+    data = _ascii_bytes(text)
+    if data is not None:
+        return data
+
+    return np.frombuffer(text.encode("utf-32-le"), dtype="uint32")
+
+
+def _recode_table(text, recoder):
+    """
+    Recode an ASCII string through a 256-entry lookup table in one pass
+
+    Parameters
+    ----------
+    text : str
+        Input string.
+    recoder : str
+        Scheme passed on to byte_table().
+
+    Returns
+    -------
+    array.array or None
+        Recoded sequence, None if text is not ASCII or contains unmapped characters.
+
+    """
+    data = _ascii_bytes(text)
+    if data is None:
+        return None
+
+    table = byte_table(np.bincount(data, minlength=256) > 0, recoder)
+    if table is None:
+        return None
+
+    return _as_array(table[data])
+
+
+def _recode_values(text, values):
+    """
+    Recode a string by assigning a value to each of its distinct characters
+
+    Uses a 256-entry lookup table for ASCII input & np.unique otherwise.
+
+    Parameters
+    ----------
+    text : str
+        Input string.
+    values : function
+        Takes the number of distinct characters & returns their values, in sorted
+        order of the characters.
+
+    Returns
+    -------
+    array.array
+        Recoded sequence.
+
+    """
+    data = _ascii_bytes(text)
+
+    # ASCII input: lookup table indexed by byte value
+    if data is not None:
+        present = np.bincount(data, minlength=256) > 0
+        table = np.zeros(256, dtype="uint32")
+        table[present] = values(present.sum())
+        return _as_array(table[data])
+
+    # General input: index of each code point among the distinct ones
+    alphabet, inverse = np.unique(_code_points(text), return_inverse=True)
+    return _as_array(np.asarray(values(len(alphabet)), dtype="uint32")[inverse])
+
+
 def recode_lexical(text, case_sensitive=True):
 
     if not isinstance(text, str):
@@ -69,77 +241,203 @@ def recode_lexical(text, case_sensitive=True):
         return None
     if not case_sensitive:
         text = text.lower()
-    alphabets = sorted(set(text))
-    replacer = dict((y, x + 1) for x, y in enumerate(alphabets))
-    text = cast([replacer[x] for x in text])
-    return text
+    return _recode_values(text, lambda size: np.arange(1, size + 1))
 
 
 def recode_alphabetical(text):
 
-    text = text.lower()
-    if not set(text).issubset(ascii_lowercase):
+    out = _recode_table(text, "alphabetical")
+    if out is None and _ascii_bytes(text) is None:
         print("> Input contains non alphabetical characters!")
-        return None
-    replacer = dict((y, x + 1) for x, y in enumerate(ascii_lowercase))
-    text = cast([replacer[x] for x in text])
-    return text
+    return out
 
 
 def recode_dna(text):
 
-    replacer = {"A": 1, "G": 1, "C": 2, "T": 2}
-    text = cast([replacer[x] for x in text.upper()])
-    return text
+    out = _recode_table(text, "dna")
+    if out is None and _ascii_bytes(text) is None:
+        print("> ERROR: Input contains characters other than A, C, G and T")
+    return out
 
 
 def recode_random(text):
 
-    alphabets = list(set(text))
-    shuffle(alphabets)
-    replacer = dict((y, x + 1) for x, y in enumerate(alphabets))
-    text = cast([replacer[x] for x in text])
-    return text
+    # Non-string collections of hashable elements
+    if not isinstance(text, str):
+        alphabets = list(set(text))
+        shuffle(alphabets)
+        replacer = dict((y, x + 1) for x, y in enumerate(alphabets))
+        return cast([replacer[x] for x in text])
+
+    def values(size):
+        numbers = list(range(1, size + 1))
+        shuffle(numbers)
+        return numbers
+
+    return _recode_values(text, values)
 
 
 def recode_randint(text):
 
-    alphabets = list(set(text))
-    numbers = choices(range(1, 2 ** 20), k=len(alphabets))
-    replacer = dict(zip(alphabets, numbers))
-    text = cast([replacer[x] for x in text])
-    return text
+    # Non-string collections of hashable elements
+    if not isinstance(text, str):
+        alphabets = list(set(text))
+        numbers = choices(range(1, 2 ** 20), k=len(alphabets))
+        replacer = dict(zip(alphabets, numbers))
+        return cast([replacer[x] for x in text])
+
+    return _recode_values(text, lambda size: choices(range(1, 2 ** 20), k=size))
+
 
+def _symbol_dtype(n_symbols):
+    """
+    Get the smallest unsigned integer type that can hold symbols 1 to n_symbols
+
+    Parameters
+    ----------
+    n_symbols : int
+        Largest symbol.
+
+    Returns
+    -------
+    str
+        "uint8", "uint16" or "uint32".
+
+    """
+    for dtype in ("uint8", "uint16"):
+        if n_symbols <= np.iinfo(dtype).max:
+            return dtype
+    return "uint32"
 
-def partition(seq, n_bins):
+
+def _ordinal_numpy(x, dim, lag=1):
+    """
+    Map delay-embedded vectors along the last axis to ordinal pattern symbols
+
+    Reference implementation of the compiled kernel behind ordinal(). Each vector of
+    dim values spaced lag apart is assigned 1 + its Lehmer code, sum over i of
+    L_i * (dim - 1 - i)!, where L_i counts later values in the vector that are strictly
+    smaller than the i-th one. Ties are ranked by position.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Array of numbers, embedded along the last axis.
+    dim : int
+        Embedding dimension, length of each pattern.
+    lag : int, optional
+        Spacing between elements of each pattern. The default is 1.
+
+    Returns
+    -------
+    np.ndarray
+        Symbols from 1 to dim!, as int64, shorter by (dim - 1) * lag along the last
+        axis.
+
+    """
+    size = x.shape[-1] - (dim - 1) * lag
+
+    # Vectors of dim elements spaced by lag, as views
+    columns = [x[..., i * lag : i * lag + size] for i in range(dim)]
+
+    # Accumulate Lehmer code with factorial weights
+    code = np.zeros(x.shape[:-1] + (size,), dtype="int64")
+    for i in range(dim - 1):
+        smaller = np.zeros(code.shape, dtype="int64")
+        for j in range(i + 1, dim):
+            smaller += columns[j] < columns[i]
+        code += smaller * factorial(dim - 1 - i)
+
+    return code + 1
+
+
+def partition(seq, n_bins, method="uniform", axis=-1, out=None, dtype=None, lag=1):
     """
     This function takes an input sequence and bins it into discrete points.
 
+    Works along one axis of N-dimensional arrays (e.g. epochs x channels x time),
+    binning every series independently in one call.
+
     Parameters
     ----------
-    seq : list/tuple of float
-        Collection of floats.
+    seq : list/tuple of float or np.ndarray
+        Collection of numbers, 1D or N-dimensional.
     n_bins : int
-        Number of bins/paritions to create.
+        Number of bins/paritions to create. For method="ordinal", the embedding
+        dimension (pattern length), giving n_bins! symbols.
+    method : str, optional
+        One of:
+            "uniform" - equal-width bins between the minimum & maximum
+            "quantile" - equiprobable bins between empirical quantiles
+            "ordinal" - ordinal patterns of n_bins values spaced lag apart, see
+                ordinal(). Output is shorter by (n_bins - 1) * lag along axis.
+        The default is "uniform".
+    axis : int, optional
+        Axis along which each series runs. The default is -1.
+    out : np.ndarray, optional
+        Preallocated output of the same shape as the result. The default is None.
+    dtype : str, optional
+        Type of the output. The default is None, picking the smallest unsigned
+        integer type that holds all symbols, uint8 for up to 255 bins.
+    lag : int, optional
+        Spacing between elements of ordinal patterns. The default is 1.
 
     Returns
     -------
-    list
-        Collection of integers. Contains unique integers from 1 to n_bins.
+    np.ndarray
+        Collection of integers. Contains unique integers from 1 to n_bins (n_bins!
+        for ordinal patterns).
 
     """
     assert (
         isinstance(n_bins, int) and n_bins > 1
     ), "ERROR: Number of bins should be a positive integer"
 
-    # Get smallest value
-    a = min(seq)
+    assert method in (
+        "uniform",
+        "quantile",
+        "ordinal",
+    ), "ERROR: method should be one of uniform, quantile or ordinal"
+
+    # Move axis of series to the end
+    x = np.moveaxis(np.asarray(seq, dtype="float64"), axis, -1)
+
+    n_symbols = factorial(n_bins) if method == "ordinal" else n_bins
+    if dtype is None:
+        dtype = _symbol_dtype(n_symbols)
+
+    if method == "uniform":
+
+        # Get smallest value
+        a = x.min(axis=-1, keepdims=True)
+
+        # Compute reciprocal of peak-to-peak per bin
+        delta_inv = n_bins / (x.max(axis=-1, keepdims=True) - a + 1e-6)
+
+        # Transform each element
+        values = np.floor((x - a) * delta_inv) + 1
+
+    elif method == "quantile":
 
-    # Compute reciprocal of peak-to-peak per bin
-    delta_inv = n_bins / (max(seq) - a + 1e-6)
+        # Inner edges of equiprobable bins, for each series
+        edges = np.quantile(x, np.arange(1, n_bins) / n_bins, axis=-1, keepdims=True)
 
-    # Transform each element and return
-    return [1 + int((elem - a) * delta_inv) for elem in seq]
+        # Count edges below each element
+        values = np.ones(x.shape, dtype="int64")
+        for edge in edges:
+            values += x > edge
+
+    else:
+        values = ordinal(x.reshape(-1, x.shape[-1]), n_bins, lag)
+        values = values.reshape(x.shape[:-1] + values.shape[-1:])
+
+    # Restore axis & write to output
+    values = np.moveaxis(values, -1, axis)
+    if out is None:
+        return values.astype(dtype, copy=False)
+
+    out[...] = values
+    return out
 
 
 def partition_numpy(nparr, n_bins):
@@ -169,11 +467,54 @@ def partition_numpy(nparr, n_bins):
         isinstance(nparr, np.ndarray) and nparr.ndim == 2
     ), ">ERROR: Input must be 2D NumPy array of numbers"
 
-    # Get smallest value
-    a = nparr.min(axis=1)[:, np.newaxis]
+    # Equiwidth binning along rows
+    return partition(nparr, n_bins, axis=1, dtype="uint32")
 
-    # Compute reciprocal of peak-to-peak per bin
-    delta_inv = n_bins / (nparr.max(axis=1)[:, np.newaxis] - a + 1e-6)
 
-    # Transform each element and return
-    return 1 + ((nparr - a) * delta_inv).astype("uint32")
+def ordinal(x, dim, lag=1):
+    """
+    Map delay-embedded vectors to ordinal pattern (permutation) symbols.
+
+    Each vector (x[t], x[t + lag], ..., x[t + (dim - 1) * lag]) is assigned
+    1 + its Lehmer code, sum over i of L_i * (dim - 1 - i)!, where L_i counts later
+    values in the vector that are strictly smaller than the i-th one. Symbols run
+    from 1 to dim! in lexicographic order of the patterns. Ties are ranked by
+    position.
+
+    Parameters
+    ----------
+    x : list/tuple of float or np.ndarray
+        Series of numbers, 1D, or 2D with one series per row.
+    dim : int
+        Embedding dimension, length of each pattern, from 2 to 12.
+    lag : int, optional
+        Spacing between elements of each pattern. The default is 1.
+
+    Returns
+    -------
+    np.ndarray
+        Symbols as uint8 (dim <= 5), uint16 (dim <= 8) or uint32, shorter by
+        (dim - 1) * lag along the last axis.
+
+    """
+    assert (
+        isinstance(dim, int) and 1 < dim <= 12
+    ), "ERROR: dim should be an integer from 2 to 12"
+    assert isinstance(lag, int) and lag > 0, "ERROR: lag should be a positive integer"
+
+    x = np.ascontiguousarray(x, dtype="float64")
+
+    assert x.ndim in (1, 2), "ERROR: Input must be a 1D or 2D array of numbers"
+    assert (
+        x.shape[-1] > (dim - 1) * lag
+    ), "ERROR: Series is too short for the embedding"
+
+    # Run the compiled kernel on rows
+    rows = x.reshape(-1, x.shape[-1])
+    out = np.empty(
+        (rows.shape[0], rows.shape[1] - (dim - 1) * lag),
+        dtype=_symbol_dtype(factorial(dim)),
+    )
+    core.ordinal_patterns(rows, out, dim, lag)
+
+    return out.reshape(x.shape[:-1] + out.shape[-1:])
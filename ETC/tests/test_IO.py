@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+
+@author: Pranay S. Yadav
+"""
+
+import gzip
+
+from hypothesis import given, settings, HealthCheck
+from hypothesis.strategies import integers, lists, text
+
+from ETC.seq import IO, recode
+
+
+@settings(
+    deadline=None,
+    max_examples=50,
+    suppress_health_check=[HealthCheck.function_scoped_fixture],
+)
+@given(
+    lists(text(alphabet="ACGT", min_size=1, max_size=200), min_size=1, max_size=10),
+    integers(min_value=1, max_value=300),
+    integers(min_value=1, max_value=250),
+)
+def test_stream_records(tmp_path, seqs, chunk_size, width):
+    """
+    Test that streamed FASTA & FASTQ content matches the concatenated records
+    """
+    fasta = "".join(
+        f">seq{n} description\n"
+        + "\n".join(seq[i : i + width] for i in range(0, len(seq), width))
+        + "\n"
+        for n, seq in enumerate(seqs)
+    )
+    fastq = "".join(
+        f"@seq{n}\n{seq}\n+\n{'I' * len(seq)}\n" for n, seq in enumerate(seqs)
+    )
+
+    (tmp_path / "seqs.fa").write_text(fasta)
+    with gzip.open(tmp_path / "seqs.fq.gz", "wt") as fileout:
+        fileout.write(fastq)
+
+    full = "".join(seqs)
+    for name in ("seqs.fa", "seqs.fq.gz"):
+        assert b"".join(IO.stream(tmp_path / name, chunk_size)).decode() == full
+        assert [elem[1].decode() for elem in IO.records(tmp_path / name)] == seqs
+
+        out = IO.read_recoded(tmp_path / name, chunk_size=chunk_size)
+        assert list(out) == list(recode.recode_lexical(full))
+
+
+def test_stream_raw(tmp_path):
+    """
+    Test that raw streaming removes delimiters split across blocks, as read()
+    """
+    (tmp_path / "seq.txt").write_text("1, 2, 3, 2, 1, 10")
+
+    for chunk_size in range(1, 8):
+        out = b"".join(IO.stream(tmp_path / "seq.txt", chunk_size, "raw", ", "))
+        assert out.decode() == IO.read(tmp_path / "seq.txt", delimiter=", ")
+
+        out = IO.read_recoded(
+            tmp_path / "seq.txt", fmt="raw", chunk_size=chunk_size, delimiter=", "
+        )
+        expected = IO.read(tmp_path / "seq.txt", delimiter=", ")
+        assert list(out) == list(recode.recode_lexical(expected))
+
+
+def test_stream_raw_bounded(tmp_path):
+    """
+    Test that raw streaming without any delimiter in the file keeps blocks bounded
+    """
+    content = b"1234567890" * 1000
+    (tmp_path / "seq.txt").write_bytes(content)
+
+    for delimiter in (", ", "::::"):
+        pieces = list(IO.stream(tmp_path / "seq.txt", 64, "raw", delimiter))
+        assert b"".join(pieces) == content
+        assert max(len(piece) for piece in pieces) <= 64
+
+
+def test_stream_fasta_bounded(tmp_path):
+    """
+    Test that an unwrapped FASTA sequence streams in blocks no larger than read
+    """
+    content = "ACGT" * 5000
+    (tmp_path / "seq.fa").write_text(f">seq description\n{content}\n>next\nTT\n")
+
+    pieces = list(IO.stream(tmp_path / "seq.fa", 64))
+    assert b"".join(pieces).decode() == content + "TT"
+    assert max(len(piece) for piece in pieces) <= 64
+
+
+@settings(
+    deadline=None,
+    max_examples=30,
+    suppress_health_check=[HealthCheck.function_scoped_fixture],
+)
+@given(lists(integers(min_value=1, max_value=1000), min_size=3, max_size=500))
+def test_store_roundtrip(tmp_path, seq):
+    """
+    Test that stores open as read-only memmaps that estimators accept directly
+    """
+    import ETC
+
+    filepath = IO.write_store(seq, tmp_path / "seq.etcseq", alphabet={"a": 1})
+    out, header = IO.open_store(filepath, return_header=True)
+
+    assert not out.flags.writeable
+    assert header == {"dtype": "uint32", "length": len(seq), "alphabet": {"a": 1}}
+    assert list(out) == seq
+    assert ETC.compute_1D(out) == ETC.compute_1D(seq)
+    assert ETC.LZC(out) == ETC.LZC(seq)
+
+
+def test_convert_files(tmp_path):
+    """
+    Test that stores are named without known suffixes only and match read_recoded
+    """
+    import pytest
+
+    (tmp_path / "chr1.v1.fa").write_text(">r\nACGTTGCA\n")
+    with gzip.open(tmp_path / "chr1.v2.fa.gz", "wt") as fileout:
+        fileout.write(">r\nGGCCA\n")
+    (tmp_path / "empty.txt").write_text("")
+
+    out = IO.convert_files(sorted(tmp_path.iterdir()), outdir=tmp_path / "stores")
+    stores = {row["file"]: row["store"] for row in out}
+
+    assert stores["chr1.v1.fa"].name == "chr1.v1.etcseq"
+    assert stores["chr1.v2.fa.gz"].name == "chr1.v2.etcseq"
+
+    for row in out:
+        seq, header = IO.open_store(row["store"], return_header=True)
+        expected, alphabet = IO.read_recoded(
+            tmp_path / row["file"], return_alphabet=True
+        )
+        assert list(seq) == list(expected) and len(seq) == row["length"]
+        assert header["alphabet"] == alphabet
+
+    # Distinct inputs that would overwrite each other's store
+    (tmp_path / "chr1.v1.txt").write_text("ACGT")
+    with pytest.raises(AssertionError):
+        IO.convert_files([tmp_path / "chr1.v1.fa", tmp_path / "chr1.v1.txt"])
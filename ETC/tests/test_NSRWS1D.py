@@ -9,12 +9,13 @@
 from array import array
 from random import choice
 
-from hypothesis import given
-from hypothesis.strategies import composite, integers, lists
+from hypothesis import given, settings
+from hypothesis.strategies import composite, integers, lists, text
 
 from ETC.NSRWS.x1D import onestep
 from ETC.NSRWS.x1D import etc as cetc
 from ETC.NSRWS.x1D import core as cc
+from ETC.NSRWS.x1D import distance
 
 
 @composite
@@ -223,6 +224,122 @@ def test_mask_and_count():
     assert onestep._mask_and_count(seq, mask, 3) == (array("I", (1, 1, 1)), 1)
 
 
+@composite
+def generate_repetitive(draw):
+    """
+    Generate a sequence over a small alphabet, rich in repeated & overlapping windows
+    """
+    order = draw(integers(min_value=2, max_value=6))
+    seq = draw(lists(integers(min_value=1, max_value=3), min_size=order, max_size=300))
+
+    return seq, order
+
+
+@composite
+def generate_alphabet(draw):
+    """
+    Generate a sequence over an alphabet of any size, from a few to huge symbols
+    """
+    top = draw(integers(min_value=1, max_value=2**32 - 1))
+    seq = draw(lists(integers(min_value=1, max_value=top), min_size=2, max_size=1000))
+
+    return seq
+
+
+@given(generate_alphabet())
+@settings(max_examples=500)
+def test_count_pairs(seq):
+    """
+    Test parity of pair counting over live symbols with masking followed by counting
+    """
+    seq = array("I", seq)
+
+    start, count = cc.count_pairs(seq)
+    pair, expected = onestep._mask_and_count(seq, cc.get_mask_pairs(seq), 2)
+
+    assert seq[start : start + 2] == pair
+    assert count == expected
+
+
+@given(generate_repetitive())
+@settings(max_examples=500)
+def test_count_windows(inputs):
+    """
+    Test parity of single-pass window counting with masking followed by counting
+    """
+    seq, order = inputs
+    seq = array("I", seq)
+
+    start, count = cc.count_windows(seq, order)
+    window, expected = onestep._mask_and_count(seq, cc.get_mask_windows(seq, order), order)
+
+    assert seq[start : start + order] == window
+    assert count == expected
+
+
+@given(generate_repetitive())
+@settings(max_examples=500)
+def test_substitute_windows(inputs):
+    """
+    Test that windows are substituted left to right without overlap
+    """
+    seq, order = inputs
+    seq = array("I", seq)
+    window = seq[:order]
+    sub_value = 1 + max(seq)
+
+    # Reference: greedy scan, skipping over each substituted occurrence
+    expected, n = [], 0
+    while n < len(seq):
+        if seq[n : n + order] == window:
+            expected.append(sub_value)
+            n += order
+        else:
+            expected.append(seq[n])
+            n += 1
+
+    assert cc.substitute_windows(seq, order, window, sub_value) == expected
+
+
+@composite
+def generate_small_alphabet(draw):
+    """
+    Generate a sequence over a small alphabet, and a limit on the dense alphabet
+    """
+    size = draw(integers(min_value=1, max_value=500))
+    top = draw(integers(min_value=1, max_value=8))
+    seq = draw(lists(integers(1, top), min_size=size, max_size=size))
+    limit = draw(integers(min_value=2, max_value=256))
+
+    return seq, limit
+
+
+@given(generate_small_alphabet())
+@settings(max_examples=200, deadline=None)
+def test_dense_pairs(inputs):
+    """
+    Test parity of steps on dense pair counts with steps of the general engine
+    """
+    seq, limit = inputs
+    seq = array("I", seq)
+
+    out, steps = cc.dense_pairs(seq, limit)
+
+    # Same steps taken one at a time, none of which may find all pairs distinct
+    expected = seq
+    for _ in range(steps):
+        expected, signal = onestep._onestep_pairs(expected[:], verbose=False)
+        assert not signal
+
+    assert out == expected
+
+    # Estimates are unchanged by handing over to the general engine
+    if len(seq) > 1:
+        etc = cetc._compute_verbose_full(seq, 2)[0]
+        assert cetc._compute_compact_full(seq, 2) == etc
+        assert cetc._compute_compact_truncated(seq, 2) == etc
+
+
 @given(generate_sequence())
 def test_substitution(inputs):
     """
@@ -271,6 +388,30 @@ def test_truncation(inputs):
     assert etc_vf == etc_vt == etc_cf == etc_ct
 
 
+@given(generate_sequence(), integers(min_value=0, max_value=10_000))
+def test_compute_bounded(inputs, cutoff):
+    """
+    Test that early exit brackets the estimate and decides the cutoff
+    """
+    seq, order = inputs
+
+    etc = cetc.compute(seq, order)["ETC1D"]
+
+    # Without a budget, iteration completes & bounds collapse on the estimate
+    out = cetc.compute(seq, order, max_steps=len(seq))
+    assert out["ETC1D"] == etc and out["Bounds"] == (etc, etc) and not out["Stopped"]
+
+    # With a budget, the estimate lies within the bounds
+    out = cetc.compute(seq, order, truncate=False, max_steps=cutoff // 10)
+    lower, upper = out["Bounds"]
+    assert lower <= etc <= upper and out["ETC1D"] == lower
+
+    # With a cutoff, the bounds decide which side of it the estimate lies on
+    out = cetc.compute(seq, order, stop_when=cutoff)
+    lower, upper = out["Bounds"]
+    assert lower <= etc <= upper and (lower > cutoff or upper <= cutoff)
+
+
 def test_compute_save(tmp_path):
     """
     Test ETC estimation with write-to-disk functionality
@@ -290,3 +431,53 @@ def test_compute_save(tmp_path):
 
     # Values should be same of course
     assert etc_vf["ETC1D"] == etc_vt["ETC1D"]
+
+
+@settings(deadline=None, max_examples=20)
+@given(lists(text(alphabet="ACGT", min_size=2, max_size=60), min_size=2, max_size=5))
+def test_distance_matrix(seqs):
+    """
+    Test that condensed distances match pairwise computation with own recoding
+    """
+    out = distance.distance_matrix(seqs, n_jobs=1, joint=False)
+    expected = [
+        distance._compute_distance((0, (seqs[i], seqs[j])))["distance"]
+        for i in range(len(seqs))
+        for j in range(i + 1, len(seqs))
+    ]
+    assert list(out) == expected
+
+
+@settings(deadline=None, max_examples=10)
+@given(lists(text(alphabet="ACGT", min_size=2, max_size=60), min_size=3, max_size=8))
+def test_nearest_neighbours(seqs):
+    """
+    Test that exhaustive search agrees with the full distance matrix
+    """
+    query, references = seqs[0], seqs[1:]
+    index = distance.build_index(references, n_jobs=1)
+    out = distance.query(index, query, k=2, n_jobs=1, prune=False)
+
+    expected = distance.distance_matrix([query] + references, n_jobs=1)
+    expected = expected[: len(references)]
+    assert [elem["distance"] for elem in out] == sorted(expected)[:2]
+
+
+@settings(deadline=None, max_examples=20)
+@given(
+    lists(text(alphabet="ACGT", min_size=2, max_size=60), min_size=3, max_size=12),
+    integers(min_value=1, max_value=3),
+    integers(min_value=1, max_value=4),
+)
+def test_nearest_pruned(seqs, k, batch_size):
+    """
+    Test that pruned search returns the same neighbours as exhaustive search
+    """
+    # Query with a character absent from the references
+    query, references = seqs[0] + "N", seqs[1:]
+    index = distance.build_index(references, n_jobs=1)
+
+    pruned = distance.query(index, query, k, n_jobs=1, batch_size=batch_size)
+    exhaustive = distance.query(index, query, k, n_jobs=1, prune=False)
+
+    assert pruned == exhaustive
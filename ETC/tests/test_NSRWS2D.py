@@ -7,14 +7,18 @@
 """
 
 from array import array
+from collections import Counter
+from itertools import compress, islice
 from random import choice
 
-from hypothesis import given
+from hypothesis import given, settings
 from hypothesis.strategies import composite, integers, lists
 
 from ETC.NSRWS.x2D import onestep
 from ETC.NSRWS.x2D import core as cc
 from ETC.NSRWS.x2D import etc as cetc
+from ETC.NSRWS.x2D import parallel
+from ETC.seq.recode import recode_lexical
 
 
 @composite
@@ -267,6 +271,104 @@ def test_substitution(inputs):
     assert max(out_x) == sub_value_x and max(out_y) == sub_value_y
 
 
+@composite
+def generate_repetitive(draw):
+    """
+    Generate 2 sequences over small alphabets, rich in repeated & overlapping windows
+    """
+    order = draw(integers(min_value=2, max_value=6))
+    size = draw(integers(min_value=order, max_value=300))
+    seq_x = draw(lists(integers(1, 3), min_size=size, max_size=size))
+    seq_y = draw(lists(integers(1, 2), min_size=size, max_size=size))
+
+    return seq_x, seq_y, order
+
+
+@given(generate_repetitive())
+@settings(max_examples=500)
+def test_count_pairs(inputs):
+    """
+    Test parity of joint pair counting over live symbols with masking & counting
+    """
+    seq_x, seq_y, _ = inputs
+    seq_x = array("I", seq_x)
+    seq_y = array("I", seq_y)
+
+    start, count = cc.count_pairs(seq_x, seq_y)
+    mask = cc.get_mask_pairs(seq_x, seq_y)
+    pair_x, pair_y, expected = onestep._mask_and_count(seq_x, seq_y, mask, 2)
+
+    assert seq_x[start : start + 2] == pair_x and seq_y[start : start + 2] == pair_y
+    assert count == expected
+
+
+@given(generate_repetitive())
+@settings(max_examples=500)
+def test_count_windows(inputs):
+    """
+    Test parity of single-pass joint window counting with masking followed by counting
+    """
+    seq_x, seq_y, order = inputs
+    seq_x = array("I", seq_x)
+    seq_y = array("I", seq_y)
+
+    # Reference: count joint windows left unmasked, ties broken by first occurrence
+    mask = cc.get_mask_windows(seq_x, seq_y, order)
+    windows = zip(*(islice(zip(seq_x, seq_y), i, None) for i in range(order)))
+    window, expected = Counter(compress(windows, mask)).most_common(1)[0]
+
+    start, count = cc.count_windows(seq_x, seq_y, order)
+    found = zip(seq_x[start : start + order], seq_y[start : start + order])
+
+    assert tuple(found) == window
+    assert count == expected
+
+
+@given(generate_repetitive())
+@settings(max_examples=500)
+def test_substitute_windows(inputs):
+    """
+    Test that joint windows are substituted left to right without overlap
+    """
+    seq_x, seq_y, order = inputs
+    seq_x = array("I", seq_x)
+    seq_y = array("I", seq_y)
+    window_x, window_y = seq_x[:order], seq_y[:order]
+    sub_value_x, sub_value_y = 1 + max(seq_x), 1 + max(seq_y)
+
+    # Reference: greedy scan, skipping over each substituted occurrence
+    expected_x, expected_y, n = [], [], 0
+    while n < len(seq_x):
+        if seq_x[n : n + order] == window_x and seq_y[n : n + order] == window_y:
+            expected_x.append(sub_value_x)
+            expected_y.append(sub_value_y)
+            n += order
+        else:
+            expected_x.append(seq_x[n])
+            expected_y.append(seq_y[n])
+            n += 1
+
+    out_x, out_y = cc.substitute_windows(
+        seq_x, seq_y, order, window_x, window_y, sub_value_x, sub_value_y
+    )
+    assert out_x == expected_x and out_y == expected_y
+
+
+@given(generate_sequences())
+def test_onestep_windows_pairs(inputs):
+    """
+    Test that a step over windows of order 2 matches a step over pairs
+    """
+    seq_x, seq_y = inputs
+    seq_x = array("I", seq_x)
+    seq_y = array("I", seq_y)
+
+    out_pairs = onestep._onestep_pairs(seq_x[:], seq_y[:], verbose=False)
+    out_windows = onestep._onestep_windows(seq_x[:], seq_y[:], 2, verbose=False)
+
+    assert out_pairs == out_windows
+
+
 @given(generate_sequences())
 def test_truncation(inputs):
     """
@@ -283,6 +385,60 @@ def test_truncation(inputs):
     assert etc_vf == etc_vt == etc_cf == etc_ct
 
 
+@given(generate_repetitive())
+def test_truncation_windows(inputs):
+    """
+    Test ETC estimation from all 4 methods for higher window orders
+    """
+    seq_x, seq_y, order = inputs
+
+    etc_vf = cetc.compute(seq_x, seq_y, order, verbose=True, truncate=False)["ETC2D"]
+    etc_vt = cetc.compute(seq_x, seq_y, order, verbose=True, truncate=True)["ETC2D"]
+    etc_cf = cetc.compute(seq_x, seq_y, order, verbose=False, truncate=False)["ETC2D"]
+    etc_ct = cetc.compute(seq_x, seq_y, order, verbose=False, truncate=True)["ETC2D"]
+
+    # All 4 estimates should be identical
+    assert etc_vf == etc_vt == etc_cf == etc_ct
+
+
+@given(generate_repetitive(), integers(min_value=0, max_value=300))
+def test_compute_bounded(inputs, cutoff):
+    """
+    Test that early exit brackets the estimate and decides the cutoff
+    """
+    seq_x, seq_y, order = inputs
+
+    etc = cetc.compute(seq_x, seq_y, order, verbose=False)["ETC2D"]
+
+    # With a budget, the estimate lies within the bounds
+    out = cetc.compute(
+        seq_x, seq_y, order, verbose=False, truncate=False, max_steps=cutoff // 10
+    )
+    lower, upper = out["Bounds"]
+    assert lower <= etc <= upper and out["ETC2D"] == lower
+
+    # With a cutoff, the bounds decide which side of it the estimate lies on
+    out = cetc.compute(seq_x, seq_y, order, verbose=False, stop_when=cutoff)
+    lower, upper = out["Bounds"]
+    assert lower <= etc <= upper and (lower > cutoff or upper <= cutoff)
+
+
+def test_compute_bounded_defaults():
+    """
+    Test that a budget or cutoff switches to compact mode without verbose=False
+    """
+    seq_x, seq_y = [1, 2, 1, 2, 2, 1, 1, 2] * 4, [2, 1, 1, 2, 1, 2, 2, 1] * 4
+
+    etc = cetc.compute(seq_x, seq_y, verbose=False)["ETC2D"]
+
+    out = cetc.compute(seq_x, seq_y, max_steps=2)
+    assert out["Stopped"] and out["Bounds"][0] <= etc <= out["Bounds"][1]
+    assert "Trajectory" not in out
+
+    out = cetc.compute(seq_x, seq_y, stop_when=etc - 1)
+    assert out["Bounds"][0] <= etc <= out["Bounds"][1] and out["Bounds"][0] > etc - 1
+
+
 def test_compute_save(tmp_path):
     """
     Test ETC estimation with write-to-disk functionality
@@ -303,3 +459,21 @@ def test_compute_save(tmp_path):
 
     # Values should be same of course
     assert etc_vf["ETC2D"] == etc_vt["ETC2D"]
+
+
+def test_compute_two_files_truncated(tmp_path):
+    """
+    Test joint ETC estimation of two text files of unequal length
+    """
+    file1 = tmp_path / "first.txt"
+    file2 = tmp_path / "second.txt"
+    file1.write_text("ABAABBAB" * 10)
+    file2.write_text("BBABAABA" * 12)
+
+    out = parallel._compute_two_files_truncated((file1, file2))
+
+    seq1 = recode_lexical(file1.read_text())
+    seq2 = recode_lexical(file2.read_text())[: len(seq1)]
+    assert out["seq1"] == "first" and out["seq2"] == "second"
+    assert out["length"] == len(seq1)
+    assert out["ETC2D"] == cetc.compute(seq1, seq2, verbose=False)["ETC2D"]
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+
+@author: Pranay S. Yadav
+"""
+
+import numpy as np
+import pytest
+from hypothesis import given
+from hypothesis.strategies import composite, integers, lists
+
+from ETC.NSRWS.x1D import etc as cetc1D
+from ETC.NSRWS.x2D import etc as cetc2D
+from ETC.NSRWS.xND import etc as cetc
+
+
+@composite
+def generate_matrix(draw):
+    """
+    Generate k sequences of equal length over small alphabets, and an order param
+    """
+    rows = draw(integers(min_value=1, max_value=8))
+    size = draw(integers(min_value=3, max_value=500))
+    row = lists(integers(min_value=1, max_value=3), min_size=size, max_size=size)
+    matrix = [draw(row) for _ in range(rows)]
+
+    order = draw(integers(min_value=2, max_value=4))
+
+    return matrix, order
+
+
+@given(generate_matrix())
+def test_joint(inputs):
+    """
+    Test that joint symbols are first-occurrence labels of columns
+    """
+    matrix, _ = inputs
+
+    columns = list(zip(*matrix))
+    labels = {}
+    expected = [labels.setdefault(column, len(labels) + 1) for column in columns]
+
+    assert list(cetc.joint(matrix)) == expected
+
+
+@given(generate_matrix())
+def test_compute_1D(inputs):
+    """
+    Test that a single sequence gives the same estimate as compute_1D
+    """
+    matrix, order = inputs
+
+    etc = cetc.compute(matrix[:1], order)
+    expected = cetc1D.compute(matrix[0], order)
+
+    assert etc["ETCND"] == expected["ETC1D"] and etc["NETCND"] == expected["NETC1D"]
+
+
+@given(generate_matrix())
+def test_compute_2D(inputs):
+    """
+    Test that a pair of sequences gives the same estimate as compute_2D
+    """
+    matrix, order = inputs
+    seq_x, seq_y = matrix[0], matrix[-1]
+
+    etc = cetc.compute(np.array([seq_x, seq_y]), order)
+    expected = cetc2D.compute(seq_x, seq_y, order, verbose=False)
+
+    assert etc["ETCND"] == expected["ETC2D"]
+
+
+@given(generate_matrix())
+def test_truncation(inputs):
+    """
+    Test ETC estimation from all 4 methods based on verbosity and truncation
+    """
+    matrix, order = inputs
+
+    etc_vf = cetc.compute(matrix, order, verbose=True, truncate=False)["ETCND"]
+    etc_vt = cetc.compute(matrix, order, verbose=True, truncate=True)["ETCND"]
+    etc_cf = cetc.compute(matrix, order, verbose=False, truncate=False)["ETCND"]
+    etc_ct = cetc.compute(matrix, order, verbose=False, truncate=True)["ETCND"]
+
+    # All 4 estimates should be identical
+    assert etc_vf == etc_vt == etc_cf == etc_ct
+
+
+def test_compute_invalid():
+    """
+    Test that inputs other than 2D arrays of non-negative integers are rejected
+    """
+    with pytest.raises(AssertionError):
+        cetc.compute([1, 2, 3])
+
+    # Ragged sequences can't be stacked by NumPy
+    with pytest.raises(ValueError):
+        cetc.compute([[1, 2, 3], [1, 2]])
+
+    with pytest.raises(AssertionError):
+        cetc.compute([[1.5, 2, 3], [1, 2, 3]])
+
+    with pytest.raises(AssertionError):
+        cetc.compute([[-1, 2, 3], [1, 2, 3]])
+
+    with pytest.raises(AssertionError):
+        cetc.compute([[1], [2]])
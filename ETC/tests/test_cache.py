@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+
+@author: Pranay S. Yadav
+"""
+
+from array import array
+
+import numpy as np
+
+from ETC.seq import cache
+
+
+def test_digest_container():
+    """
+    Test that digests depend on content and not on the container type
+    """
+    seq = [1, 2, 2, 1, 3]
+
+    assert cache.digest(seq) == cache.digest(array("I", seq))
+    assert cache.digest(seq) == cache.digest(np.array(seq, dtype="uint32"))
+    assert cache.digest(seq) != cache.digest(seq[::-1])
+
+
+def test_cached_estimator(tmp_path):
+    """
+    Test that repeated calls are served from the cache and parameters are part of keys
+    """
+    calls = []
+
+    @cache.cached("dummy")
+    def estimator(x, y, scale=1):
+        calls.append(scale)
+        return {"sum": scale * (sum(x) + sum(y))}
+
+    x, y = [1, 2, 3], [4, 5, 6]
+
+    # Disabled cache: every call computes
+    estimator(x, y)
+    estimator(x, y)
+    assert len(calls) == 2
+
+    with cache.using(tmp_path / "cache.db"):
+        first = estimator(x, y)
+        second = estimator(array("I", x), np.array(y))
+        assert first == second == {"sum": 21}
+        assert len(calls) == 3
+
+        # Different parameters are stored separately
+        assert estimator(x, y, scale=2) == {"sum": 42}
+        assert len(calls) == 4
+        assert cache.info()["entries"] == 2
+
+    # Cache disabled again on exit
+    assert cache.info() is None
+
+
+def test_eviction(tmp_path):
+    """
+    Test that least recently used estimates are evicted beyond the size bound
+    """
+
+    @cache.cached("dummy", sequences=("x",))
+    def estimator(x):
+        return {"value": sum(x)}
+
+    with cache.using(tmp_path / "cache.db", max_size=200):
+        for n in range(50):
+            estimator([n])
+        assert cache.info()["size"] <= 200
+        assert 0 < cache.info()["entries"] < 50
+
+
+def test_cached_types(tmp_path):
+    """
+    Test that stored estimates compare equal to fresh ones, types included
+    """
+
+    @cache.cached("dummy", sequences=("x",))
+    def estimator(x):
+        return {1: (np.float64(0.5), "a"), "pairs": [(1, 2)], "count": np.int64(len(x))}
+
+    with cache.using(tmp_path / "cache.db"):
+        fresh = estimator([1, 2, 3])
+        stored = estimator([1, 2, 3])
+
+    assert stored == fresh
+    assert type(stored[1]) is tuple and type(stored["count"]) is np.int64
+
+
+def test_cached_threads(tmp_path):
+    """
+    Test that threads share the cache, each through its own connection
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    @cache.cached("dummy", sequences=("x",))
+    def estimator(x):
+        return sum(x)
+
+    with cache.using(tmp_path / "cache.db"):
+        with ThreadPoolExecutor(4) as pool:
+            out = list(pool.map(estimator, [[n % 10] for n in range(200)]))
+        assert cache.info()["entries"] == 10
+
+    assert out == [n % 10 for n in range(200)]
+
+
+def test_eviction_touched(tmp_path):
+    """
+    Test that hits held back from disk still protect estimates from eviction
+    """
+    calls = []
+
+    @cache.cached("dummy", sequences=("x",))
+    def estimator(x):
+        calls.append(x)
+        return sum(x)
+
+    with cache.using(tmp_path / "cache.db", max_size=50):
+        for n in range(20):
+            estimator([n])
+            estimator([0])
+        entries = cache.info()["entries"]
+
+        # Hit on [0] after every store, so it is never the least recently used
+        estimator([0])
+
+    assert 0 < entries < 20
+    assert calls == [[n] for n in range(20)]
+
+
+def test_cached_invalid(tmp_path):
+    """
+    Test that inputs which can't be digested are passed on to the estimator as is
+    """
+    from ETC.CCMC import pairs
+
+    x, y = list("abcab"), list("bcabc")
+    expected = pairs.ETC_causality(x, y)
+
+    with cache.using(tmp_path / "cache.db"):
+        assert pairs.ETC_causality(x, y) == expected is None
+        assert cache.info()["entries"] == 0
+
+
+def test_running_workers(tmp_path):
+    """
+    Test that workers started before the cache was enabled use current settings
+    """
+    from functools import partial
+
+    from joblib import Parallel, delayed
+
+    from ETC.NCA import parallelize_jl
+
+    # Start reusable workers while the cache is disabled
+    Parallel(n_jobs=2)(delayed(abs)(n) for n in range(8))
+
+    matrix = np.random.default_rng(0).integers(1, 3, size=(4, 40), dtype="uint32")
+    rowpairs = list(enumerate(parallelize_jl.get_rowpairs(matrix)))
+
+    with cache.using(tmp_path / "cache.db"):
+        kernel = partial(parallelize_jl._kernel_LZ, cache_settings=cache.settings())
+        expected = Parallel(n_jobs=2)(delayed(kernel)(elem) for elem in rowpairs)
+        assert cache.info()["entries"] == len(rowpairs)
+
+        # Stored estimates are served back unchanged
+        out = Parallel(n_jobs=2)(delayed(kernel)(elem) for elem in rowpairs)
+        assert out == expected
+
+    # Settings of workers are restored after each call
+    disabled = {cache.ENV_PATH: None, cache.ENV_SIZE: None}
+    out = Parallel(n_jobs=2)(delayed(cache.settings)() for _ in range(8))
+    assert out == [disabled] * 8
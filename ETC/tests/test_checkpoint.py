@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+
+@author: Pranay S. Yadav
+"""
+
+import sqlite3
+
+import numpy as np
+import pytest
+from pandas.testing import assert_frame_equal
+
+from ETC import NCA
+from ETC.NCA import checkpoint
+
+
+def test_params_hash():
+    """
+    Test that the parameter hash is independent of key order
+    """
+    a = checkpoint.params_hash({"LEN_past": 150, "ADD_meas": 15, "STEP_size": 20})
+    b = checkpoint.params_hash({"STEP_size": 20, "ADD_meas": 15, "LEN_past": 150})
+    c = checkpoint.params_hash({"STEP_size": 25, "ADD_meas": 15, "LEN_past": 150})
+
+    assert a == b
+    assert a != c
+
+
+def test_write_types(tmp_path):
+    """
+    Test that NumPy scalars are stored as numbers and other types are rejected
+    """
+    store = tmp_path / "store.db"
+    key = checkpoint.params_hash({"kernel": "LZ"})
+    digests = {(0, 1): checkpoint.data_hash([1], [2])}
+
+    out = {"index_pair": 0, "index_x": 0, "index_y": 1, "LZ_x": np.uint32(3)}
+    checkpoint.write(store, [out], key, digests)
+    stored = checkpoint.load(store, key)
+    assert stored == [out] and type(stored[0]["LZ_x"]) is int
+
+    with pytest.raises(TypeError):
+        checkpoint.write(store, [{**out, "LZ_x": np.array([3])}], key, digests)
+    with pytest.raises(TypeError):
+        checkpoint.params_hash({"kernel": object()})
+
+
+def test_write_and_resume(tmp_path):
+    """
+    Test that stored rowpairs are skipped on restart and merged back in order
+    """
+    store = tmp_path / "store.db"
+    key = checkpoint.params_hash({"kernel": "LZ"})
+
+    rowpairs = [(0, 1, "a", "b"), (0, 2, "a", "c"), (1, 2, "b", "c")]
+    results = [
+        {"index_pair": n, "index_x": x, "index_y": y, "LZ_x": n}
+        for n, (x, y, _, _) in enumerate(rowpairs)
+    ]
+    digests = {(x, y): checkpoint.data_hash(a, b) for x, y, a, b in rowpairs}
+
+    # Nothing stored yet
+    assert checkpoint.completed(store, key) == dict()
+
+    # Write the last rowpair, twice - second write must not duplicate it
+    checkpoint.write(store, results[2:], key, digests)
+    checkpoint.write(store, results[2:], key, digests)
+    assert checkpoint.completed(store, key) == {(1, 2): digests[(1, 2)]}
+
+    # Only the first two rowpairs are pending, with their original index_pair
+    requested = dict()
+    done = checkpoint.completed(store, key)
+    todo = list(checkpoint.pending(rowpairs, done, requested))
+    assert [elem[0] for elem in todo] == [0, 1]
+    assert requested == digests
+
+    # Write them in batches of one and check the merged output
+    for batch in checkpoint.batched(todo, 1):
+        checkpoint.write(store, [results[elem[0]] for elem in batch], key, requested)
+    assert checkpoint.load(store, key, pairs=requested) == results
+
+    # Results stored under a different parameter hash are kept separate
+    assert checkpoint.load(store, checkpoint.params_hash({"kernel": "ETC"})) == []
+
+
+def test_changed_data(tmp_path):
+    """
+    Test that rowpairs stored for different data are recomputed, not reused
+    """
+    store = tmp_path / "store.db"
+    key = checkpoint.params_hash({"kernel": "LZ"})
+
+    old = [(0, 1, np.array([1, 2]), np.array([2, 1]))]
+    new = [(0, 1, np.array([1, 2]), np.array([2, 2]))]
+
+    requested = dict()
+    list(checkpoint.pending(old, dict(), requested))
+    stale = [{"index_pair": 0, "index_x": 0, "index_y": 1}]
+    checkpoint.write(store, stale, key, requested)
+
+    # Same indices, different data: pending again and excluded from the output
+    requested = dict()
+    todo = list(checkpoint.pending(new, checkpoint.completed(store, key), requested))
+    assert [elem[0] for elem in todo] == [0]
+    assert checkpoint.load(store, key, pairs=requested) == []
+
+
+def _matrix(seed):
+    """
+    Generate a small random integer matrix for NCA runs
+    """
+    return np.random.default_rng(seed).integers(1, 3, size=(4, 60), dtype="uint32")
+
+
+def test_compute_CCM_checkpointed(tmp_path):
+    """
+    Test that checkpointed compute_CCM matches an uncheckpointed run
+    """
+    store = tmp_path / "ccm.db"
+    matrix = _matrix(0)
+    expected = NCA.compute_CCM(matrix, kernel="LZ")
+
+    # Fresh run writes everything to the store
+    assert_frame_equal(NCA.compute_CCM(matrix, kernel="LZ", checkpoint=store), expected)
+
+    # Resumed run after dropping some rowpairs from the store
+    conn = sqlite3.connect(str(store))
+    with conn:
+        conn.execute("DELETE FROM estimates WHERE index_x = 0")
+    conn.close()
+    assert_frame_equal(NCA.compute_CCM(matrix, kernel="LZ", checkpoint=store), expected)
+
+    # Same store reused with a different matrix of the same shape
+    changed = _matrix(1)
+    assert_frame_equal(
+        NCA.compute_CCM(changed, kernel="LZ", checkpoint=store),
+        NCA.compute_CCM(changed, kernel="LZ"),
+    )
+
+
+def test_compute_CCC_checkpointed(tmp_path):
+    """
+    Test that checkpointed compute_CCC matches an uncheckpointed run
+    """
+    store = tmp_path / "ccc.db"
+    params = {"LEN_past": 20, "ADD_meas": 10, "STEP_size": 10}
+    matrix = _matrix(0)
+    expected = NCA.compute_CCC(matrix, params)
+
+    # Fresh run, then a resumed run after dropping some rowpairs from the store
+    assert_frame_equal(NCA.compute_CCC(matrix, params, checkpoint=store), expected)
+    conn = sqlite3.connect(str(store))
+    with conn:
+        conn.execute("DELETE FROM estimates WHERE index_y = 3")
+    conn.close()
+    assert_frame_equal(NCA.compute_CCC(matrix, params, checkpoint=store), expected)
+
+    # Same store reused with a different matrix of the same shape
+    changed = _matrix(1)
+    assert_frame_equal(
+        NCA.compute_CCC(changed, params, checkpoint=store),
+        NCA.compute_CCC(changed, params),
+    )
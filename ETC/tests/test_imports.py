@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+
+@author: Pranay S. Yadav
+"""
+
+import subprocess
+import sys
+
+import ETC
+
+
+def _run(code):
+    """
+    Run code in a fresh interpreter and return what it writes to stdout and stderr
+    """
+    done = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return done.stdout, done.stderr
+
+
+def test_import_dependencies():
+    """
+    Test that importing the package loads no heavy dependencies
+    """
+    stdout, _ = _run("import sys, ETC; print(' '.join(sys.modules))")
+    loaded = set(stdout.split())
+
+    for heavy in ("numpy", "pandas", "matplotlib", "multiprocessing", "pkg_resources"):
+        assert heavy not in loaded
+
+
+def test_compute_skips_optional():
+    """
+    Test that computing ETC doesn't load optional dependencies
+    """
+    stdout, _ = _run(
+        "import sys, ETC; ETC.compute_1D([1, 2, 1, 2]); ETC.compute_2D([1, 2], [2, 1]);"
+        "print(' '.join(sys.modules))"
+    )
+    loaded = set(stdout.split())
+
+    for optional in ("pandas", "matplotlib", "seaborn", "scipy", "joblib", "numba"):
+        assert optional not in loaded
+
+
+def test_lazy_attributes():
+    """
+    Test that public names, subpackages & their modules resolve in a fresh interpreter
+    """
+    stdout, _ = _run(
+        "import ETC; import types;"
+        "print(all(getattr(ETC, name) is not None for name in ETC.__all__));"
+        "print(isinstance(ETC.check, types.ModuleType));"
+        "print(ETC.seq.recode.__name__, ETC.NSRWS.x1D.etc.__name__);"
+        "print(ETC.CCC.simulate_AR.__name__, ETC.CCC.coupled_AR_batch.__module__)"
+    )
+
+    assert stdout.split() == [
+        "True",
+        "True",
+        "ETC.seq.recode",
+        "ETC.NSRWS.x1D.etc",
+        "ETC.CCC.simulate_AR",
+        "ETC.CCC.simulate_AR",
+    ]
+
+    from ETC.NSRWS.x1D.etc import compute
+
+    assert ETC.compute_1D is compute
+    assert set(ETC.__all__) <= set(dir(ETC))
+
+    for package, name in ((ETC, "missing"), (ETC.seq, "missing"), (ETC.CCC, "_x")):
+        try:
+            getattr(package, name)
+        except AttributeError:
+            pass
+        else:
+            raise AssertionError("ERROR: unknown attribute should raise AttributeError")
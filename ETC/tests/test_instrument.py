@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+
+@author: Pranay S. Yadav
+"""
+
+import json
+
+import ETC
+from ETC.NSRWS import instrument
+
+
+def test_phases_recorded():
+    """
+    Test that phases are counted per scope without changing estimates
+    """
+    seq = ETC.generate(500, 4, seed=7)
+    expected_1D = ETC.compute_1D(seq, verbose=False)
+    expected_2D = ETC.compute_2D(seq, seq[::-1], verbose=False)
+
+    summaries = []
+    with instrument.recording(callback=summaries.append) as recorder:
+        assert ETC.compute_1D(seq, verbose=False) == expected_1D
+        assert ETC.compute_2D(seq, seq[::-1], verbose=False) == expected_2D
+        ETC.CCM_causality(seq[:250], seq[250:])
+
+    # Summary passed on exit, instrumentation disabled again
+    assert summaries == [instrument.summary(recorder)]
+    assert instrument.summary() == {}
+
+    out = summaries[0]
+    phases = {"equality", "count", "maximum", "substitute", "cast"}
+    assert set(out["1D"]) == phases | {"dense"} and set(out["2D"]) == phases
+    for scope in ("1D", "2D"):
+        assert out[scope]["count"]["calls"] == out[scope]["maximum"]["calls"]
+        assert out[scope]["count"]["calls"] == out[scope]["cast"]["calls"]
+    assert {"lookup", "maximum", "substitute", "cast"} <= set(out["CCMC"])
+    assert all(
+        phase["time"] >= 0 for scope in out.values() for phase in scope.values()
+    )
+
+
+def test_chrome_trace(tmp_path):
+    """
+    Test export of recorded phases as Chrome trace events
+    """
+    with instrument.recording(trace=True) as recorder:
+        ETC.compute_1D([1, 2, 1, 2, 1, 1, 2, 2], verbose=False)
+
+    trace = instrument.chrome_trace(recorder, tmp_path / "trace.json")
+    assert json.loads((tmp_path / "trace.json").read_text()) == trace
+
+    events = trace["traceEvents"]
+    calls = sum(phase["calls"] for phase in instrument.summary(recorder)["1D"].values())
+    assert len(events) == calls
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+
+    # Without trace=True, there is nothing to export
+    with instrument.recording() as recorder:
+        ETC.compute_1D([1, 2, 1, 2], verbose=False)
+    assert instrument.chrome_trace(recorder) is None
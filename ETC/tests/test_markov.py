@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+
+@author: Pranay S. Yadav
+"""
+
+import pandas as pd
+from hypothesis import given, settings
+from hypothesis.strategies import booleans, integers, text
+
+from ETC.seq import markov
+
+
+@settings(deadline=None, max_examples=100)
+@given(
+    text(alphabet="ACGT", min_size=8, max_size=200),
+    integers(min_value=0, max_value=3),
+    booleans(),
+    booleans(),
+)
+def test_transition_probs(seq, order, compact, flatten):
+    """
+    Test that integer-coded estimation matches string cross-tabulation
+    """
+    expected = markov._compute_transition_probs(
+        markov._generate_overlaps(seq, order), compact=compact, flatten=flatten
+    )
+    out = markov.transition_probs(seq, order, compact=compact, flatten=flatten)
+
+    pd.testing.assert_frame_equal(
+        out, expected, check_index_type=False, check_column_type=False
+    )
+
+
+@settings(deadline=None, max_examples=50)
+@given(
+    text(alphabet="ACGT", min_size=8, max_size=200),
+    integers(min_value=0, max_value=3),
+    integers(min_value=0, max_value=100),
+)
+def test_sample_sequences(seq, order, seed):
+    """
+    Test that surrogates are reproducible and only use observed transitions
+    """
+    out = markov.sample_sequences(seq, order, 50, n=3, seed=seed)
+
+    assert out == markov.sample_sequences(seq, order, 50, n=3, seed=seed)
+    assert out[0] == markov.sample_sequence(seq, order, 50, sampler_seed=seed)
+    assert all(len(elem) == 50 and set(elem) <= set(seq) for elem in out)
+
+    # A fully periodic sequence has a single possible continuation
+    assert markov.sample_sequence("ACGT" * 10, order, 8) == "ACGTACGT"
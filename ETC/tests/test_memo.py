@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+
+@author: Pranay S. Yadav
+"""
+
+from hypothesis import given, settings, strategies as st
+
+import ETC
+from ETC.seq import memo
+
+
+@settings(deadline=None, max_examples=50)
+@given(st.lists(st.integers(min_value=1, max_value=5), min_size=3, max_size=100))
+def test_memoized_equal(seq):
+    """
+    Test that memoized estimates match direct computation
+    """
+    expected = ETC.compute_1D(seq)
+
+    with memo.memoized(maxsize=8):
+        assert ETC.compute_1D(seq) == expected
+        assert ETC.compute_1D(tuple(seq)) == expected
+        assert memo.stats()["hits"] == 1
+
+
+def test_memo_eviction():
+    """
+    Test that the table is bounded and keyed by parameters
+    """
+    seqs = [[1, 2, 1, 2, n] for n in range(1, 11)]
+
+    with memo.memoized(maxsize=4):
+        for seq in seqs:
+            ETC.compute_1D(seq)
+        assert memo.stats()["entries"] == 4
+
+        # Recently used sequence is held, different order is not
+        ETC.compute_1D(seqs[-1])
+        ETC.compute_1D(seqs[-1], order=3)
+        assert memo.stats()["hits"] == 1
+        assert memo.stats()["misses"] == 11
+
+        # Mutating a returned result leaves the held one untouched
+        ETC.compute_1D(seqs[-1])["ETC1D"] = -1
+        assert ETC.compute_1D(seqs[-1])["ETC1D"] != -1
+
+
+def test_memoized_strided():
+    """
+    Test that strided & sliced arrays are memoized like contiguous ones
+    """
+    import numpy as np
+
+    strided = np.arange(1, 21, dtype="uint32")[::2]
+    sliced = np.arange(1, 21, dtype="uint32")[5:15]
+    expected = ETC.compute_1D(strided, verbose=False), ETC.LZC(sliced)
+
+    with memo.memoized(maxsize=8):
+        assert (ETC.compute_1D(strided, verbose=False), ETC.LZC(sliced)) == expected
+        assert ETC.compute_1D(strided.copy(), verbose=False) == expected[0]
+        assert memo.stats()["hits"] == 1
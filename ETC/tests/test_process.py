@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+
+@author: Pranay S. Yadav
+"""
+
+import numpy as np
+from hypothesis import given, settings
+from hypothesis.strategies import integers
+
+from ETC.seq import process
+
+
+@settings(deadline=None, max_examples=30)
+@given(
+    n=integers(min_value=1, max_value=1000),
+    split=integers(min_value=0, max_value=1000),
+    partitions=integers(min_value=2, max_value=10),
+)
+def test_generate_batch(n, split, partitions):
+    """
+    Test that batches are reproducible however rows are split across calls
+    """
+    split = min(split, n)
+
+    out = process.generate(20, partitions, seed=42, n=n, dtype="uint8")
+    parts = [
+        process.generate(20, partitions, seed=42, n=split, dtype="uint8"),
+        process.generate(20, partitions, seed=42, n=n - split, dtype="uint8", start=split),
+    ]
+
+    assert out.shape == (n, 20) and out.dtype == "uint8"
+    assert (out == np.vstack(parts)).all()
+    assert 1 <= out.min() and out.max() <= partitions
+
+
+def test_generate_single():
+    """
+    Test that generating one row gives the first row of a larger batch
+    """
+    one = process.generate(10 ** 6, 4, seed=1, n=1)
+    batch = process.generate(10 ** 6, 4, seed=1, n=8)
+
+    assert one.shape == (1, 10 ** 6) and (one[0] == batch[0]).all()
+
+
+@settings(deadline=None, max_examples=30)
+@given(start=integers(min_value=0, max_value=600))
+def test_generate_rows(start):
+    """
+    Test that every row is the same whether drawn alone or with the rest of a batch
+    """
+    for dtype in ("uint32", "uint8"):
+        batch = process.generate(50, 4, seed=7, n=8, dtype=dtype, start=start)
+        rows = [
+            process.generate(50, 4, seed=7, n=1, dtype=dtype, start=start + i)
+            for i in range(8)
+        ]
+
+        assert (np.vstack(rows) == batch).all()
@@ -6,6 +6,9 @@
 @author: Pranay S. Yadav
 """
 from array import array
+from itertools import permutations
+
+import numpy as np
 from hypothesis import given
 from hypothesis import strategies as st
 from ETC.seq import recode
@@ -59,4 +62,60 @@ def test_all_recodes(x):
     x4 = recode.recode_random(x)
 
     assert counts(x1) == counts(x2) == counts(x3) == counts(x4)
-    assert len(set(x1)) == len(set(x2)) == len(set(x3)) == len(set(x4))
\ No newline at end of file
+    assert len(set(x1)) == len(set(x2)) == len(set(x3)) == len(set(x4))
+
+
+@given(x=st.text(min_size=1))
+def test_recode_lexical_unicode(x):
+
+    # Symbols follow the sorted order of distinct characters, for any code point
+    replacer = dict((y, n + 1) for n, y in enumerate(sorted(set(x))))
+
+    assert list(recode.recode_lexical(x)) == [replacer[y] for y in x]
+
+
+@given(x=st.text(alphabet="ACGTacgt", min_size=1))
+def test_recode_dna(x):
+
+    replacer = {"A": 1, "G": 1, "C": 2, "T": 2}
+
+    assert list(recode.recode_dna(x)) == [replacer[y] for y in x.upper()]
+    assert recode.recode_dna(x + "N") is None
+
+
+@given(
+    x=st.lists(st.floats(min_value=-1e6, max_value=1e6), min_size=2),
+    n_bins=st.integers(min_value=2, max_value=300),
+)
+def test_partition(x, n_bins):
+
+    # Equal-width binning must match the reference per-element formula
+    a = min(x)
+    delta_inv = n_bins / (max(x) - a + 1e-6)
+    expected = [1 + int((elem - a) * delta_inv) for elem in x]
+
+    out = recode.partition(x, n_bins)
+    assert out.tolist() == expected
+    assert out.dtype == ("uint8" if n_bins < 256 else "uint16")
+
+    # Equiprobable binning stays within range
+    out = recode.partition(x, n_bins, method="quantile")
+    assert 1 <= out.min() and out.max() <= n_bins
+
+
+@given(
+    x=st.lists(st.integers(min_value=-5, max_value=5), min_size=40, max_size=200),
+    dim=st.integers(min_value=2, max_value=6),
+    lag=st.integers(min_value=1, max_value=3),
+)
+def test_ordinal(x, dim, lag):
+
+    # Compiled kernel must match the NumPy reference, including ties
+    out = recode.ordinal(x, dim, lag)
+    assert (out == recode._ordinal_numpy(np.asarray(x, dtype="float64"), dim, lag)).all()
+    assert out.dtype == ("uint8" if dim <= 5 else "uint16")
+
+    # Symbols follow lexicographic order of patterns for distinct values
+    patterns = sorted(permutations(range(dim)))
+    window = np.arange(dim)[::-1]
+    assert recode.ordinal(window, dim)[0] == patterns.index(tuple(window)) + 1
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+
+@author: Pranay S. Yadav
+"""
+
+import numpy as np
+from hypothesis import given, settings
+from hypothesis.strategies import floats, integers
+
+from ETC.CCC import simulate_AR as ar
+
+
+@settings(deadline=None, max_examples=30)
+@given(
+    realisations=integers(min_value=1, max_value=5),
+    length=integers(min_value=1, max_value=200),
+    burn=integers(min_value=0, max_value=300),
+    seed=integers(min_value=0, max_value=2 ** 31),
+    b=floats(min_value=0, max_value=0.9),
+)
+def test_batch_coupled(realisations, length, burn, seed, b):
+    """
+    Test that batches are reproducible & each realisation independent of the rest
+    """
+    a = np.linspace(0.1, 0.9, realisations)
+    out = ar.coupled_AR_batch(realisations, length, a, b, 0.7, 0.05, burn, seed)
+
+    assert out.shape == (realisations, 2, length)
+    assert np.isfinite(out).all()
+    again = ar.coupled_AR_batch(realisations, length, a, b, 0.7, 0.05, burn, seed)
+    assert (out == again).all()
+
+    # The first realisation doesn't depend on how many others are drawn with it
+    single = ar.coupled_AR_batch(1, length, a[0], b, 0.7, 0.05, burn, seed)
+    assert (out[:1] == single).all()
+
+    # Compiled kernel against plain Python
+    init = np.random.default_rng(seed).random((realisations, 2))
+    noise = np.random.default_rng(seed).normal(size=(realisations, 2, length + burn))
+    params = np.array(np.broadcast_arrays(a, b, 0.7, 0.05))
+    args = (init, noise, params, burn, burn - 1)
+    compiled = ar._kernel()(*args, np.empty_like(out))
+    reference = ar._iterate_batch(*args, np.empty_like(out))
+    assert np.allclose(compiled, reference, rtol=1e-12, atol=0)
+
+
+@settings(deadline=None, max_examples=30)
+@given(
+    realisations=integers(min_value=1, max_value=5),
+    length=integers(min_value=1, max_value=200),
+    burn=integers(min_value=0, max_value=300),
+    seed=integers(min_value=0, max_value=2 ** 31),
+    b=floats(min_value=0, max_value=0.9),
+)
+def test_batch_legacy(realisations, length, burn, seed, b):
+    """
+    Test that each realisation of a legacy batch equals coupled_AR with its seed
+    """
+    a = np.linspace(0.1, 0.9, realisations)
+    out = ar.coupled_AR_batch(
+        realisations, length, a, b, 0.7, 0.05, burn, seed, legacy=True
+    )
+
+    for r in range(realisations):
+        expected = ar.coupled_AR(length, a[r], b, 0.7, 0.05, burn, seed + r)
+        assert (out[r, 0] == expected["dependent"]).all()
+        assert (out[r, 1] == expected["independent"]).all()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+
+@author: Pranay S. Yadav
+"""
+
+import numpy as np
+import pytest
+from hypothesis import given, settings
+from hypothesis.strategies import floats, integers
+
+from ETC.CCC import simulate_TentMap as tm
+
+# Ring of 4 nodes, each driven by the previous one
+RING = 0.3 * np.roll(np.eye(4), -1, axis=0)
+
+
+def test_network_shape():
+    """
+    Test shape & type of trajectories, with & without realisations
+    """
+    single = tm.coupled_TM_network(RING, 0.49, 50, burn=10, seed=1)
+    batch = tm.coupled_TM_network(RING, 0.49, 50, burn=10, seed=1, realisations=3)
+
+    assert single.shape == (4, 50) and single.dtype == np.float64
+    assert batch.shape == (3, 4, 50) and batch.dtype == np.float64
+    assert ((0 <= batch) & (batch <= 1)).all()
+
+
+def test_network_seed():
+    """
+    Test that trajectories are reproducible for a fixed seed only
+    """
+    first = tm.coupled_TM_network(RING, 0.49, 100, seed=5, realisations=2)
+    again = tm.coupled_TM_network(RING, 0.49, 100, seed=5, realisations=2)
+    other = tm.coupled_TM_network(RING, 0.49, 100, seed=6, realisations=2)
+
+    assert (first == again).all()
+    assert not (first == other).all()
+
+
+@settings(deadline=None, max_examples=30)
+@given(
+    nodes=integers(min_value=1, max_value=6),
+    burn=integers(min_value=0, max_value=20),
+    threshold=floats(min_value=0.05, max_value=0.95),
+    seed=integers(min_value=0, max_value=2 ** 32),
+)
+def test_network_edgeless(nodes, burn, threshold, seed):
+    """
+    Test that uncoupled nodes follow independent iterations of the skew-tent map
+    """
+    length = 30
+    out = tm.coupled_TM_network(
+        np.zeros((nodes, nodes)), threshold, length, burn=burn, seed=seed
+    )
+
+    # Same initial conditions as the first realisation
+    child = np.random.SeedSequence(seed).spawn(1)[0]
+    values = np.random.default_rng(child).uniform(size=nodes)
+
+    expected = [values.copy()]
+    for _ in range(length + burn - 1):
+        values = np.array([tm._skewtent_onestep(x, threshold) for x in values])
+        expected.append(values)
+
+    assert (out == np.array(expected[burn:]).T).all()
+
+
+def test_network_csr():
+    """
+    Test that couplings in sparse row form match the dense matrix
+    """
+    rows, cols = np.nonzero(RING)
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=4))])
+
+    dense = tm.coupled_TM_network(RING, 0.49, 60, seed=3)
+    sparse = tm.coupled_TM_network((indptr, cols, RING[rows, cols]), 0.49, 60, seed=3)
+
+    assert (dense == sparse).all()
+
+
+def test_network_invalid():
+    """
+    Test that invalid couplings & lengths are rejected before iterating
+    """
+    indptr = np.array([0, 1, 2])
+    weights = np.array([0.5, 0.5])
+
+    # Out of range indices
+    for indices in ([1, 2], [-1, 0]):
+        with pytest.raises(AssertionError):
+            tm.coupled_TM_network((indptr, indices, weights), 0.49, 10)
+
+    # Pointers not rising from 0 to the number of couplings
+    for bad in ([0, 2, 1], [1, 1, 2], [0, 1, 3]):
+        with pytest.raises(AssertionError):
+            tm.coupled_TM_network((bad, [1, 0], weights), 0.49, 10)
+
+    # Self-coupling, negative & excessive couplings
+    for matrix in (np.eye(2) * 0.5, -RING, 4 * RING):
+        with pytest.raises(AssertionError):
+            tm.coupled_TM_network(matrix, 0.49, 10)
+
+    # Empty trajectories, with or without burn-in
+    for burn in (0, 5):
+        with pytest.raises(AssertionError):
+            tm.coupled_TM_network(RING, 0.49, 0, burn)
+
+
+def test_warmup():
+    """
+    Test that all kernels compile or load from cache and reproduce a known value
+    """
+    assert tm.warmup(verbose=False) is True
+
+
+def _onestep(value, threshold):
+    """
+    Skew-tent map as formerly vectorized over NumPy arrays
+    """
+    value, threshold = np.broadcast_arrays(value, threshold)
+    return np.where(
+        value < threshold, value / threshold, (1 - value) / (1 - threshold)
+    )
+
+
+@settings(deadline=None, max_examples=50)
+@given(
+    threshold=floats(min_value=0.05, max_value=0.95),
+    coupling=floats(min_value=0, max_value=1),
+    seed=integers(min_value=0, max_value=2 ** 32),
+)
+def test_skewtent_formula(threshold, coupling, seed):
+    """
+    Test that the compiled kernels match the skew-tent map formula exactly
+    """
+    values = np.random.default_rng(seed).uniform(size=100)
+    values[:3] = 0, threshold, 1
+
+    onestep = [tm._skewtent_onestep(x, threshold) for x in values]
+    assert (np.array(onestep) == _onestep(values, threshold)).all()
+
+    # Trajectory of independent, linearly & nonlinearly dependent maps
+    init, thresholds, couplings = values[3:6], np.full(3, threshold), [coupling] * 2
+    out = tm._compute_trajectory(init, thresholds, 50, np.array(couplings))
+
+    x, lin, nonlin = (np.array([value]) for value in init)
+    for idx in range(1, 50):
+        x_next = _onestep(x, threshold)
+        lin = coupling * x_next + (1 - coupling) * _onestep(lin, threshold)
+        nonlin = _onestep(coupling * x + (1 - coupling) * nonlin, threshold)
+        x = x_next
+        assert (out[:, idx] == np.concatenate([x, lin, nonlin])).all()
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+"""
+Performance benchmarks for the hot paths of ETC.
+
+Benchmarks follow the airspeed velocity (asv) conventions: classes with params and
+param_names whose time_* methods are timed and peakmem_* methods are measured for
+peak memory, after setup() has prepared inputs from fixed seeds. They can be run
+with asv (asv.conf.json at the top of the repository) or without it using:
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --compare before.json after.json
+
+@author: Pranay S. Yadav
+"""
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for ETC of single sequences and pairs, and for LZ complexity.
+
+@author: Pranay S. Yadav
+"""
+# Import calls
+import ETC
+
+from .common import ALPHABETS, ORDERS, SIZES, sequence
+
+
+class Compute1D:
+    # A single run at 10**6 takes tens of minutes
+    params = (SIZES[:4], ALPHABETS, ORDERS)
+    param_names = ("size", "alphabet", "order")
+    timeout = 600
+
+    def setup(self, size, alphabet, order):
+        self.seq = sequence(size, alphabet)
+
+    def time_compute(self, size, alphabet, order):
+        ETC.compute_1D(self.seq, order=order, verbose=False, truncate=True)
+
+    def peakmem_compute(self, size, alphabet, order):
+        ETC.compute_1D(self.seq, order=order, verbose=False, truncate=True)
+
+    def time_compute_verbose(self, size, alphabet, order):
+        ETC.compute_1D(self.seq, order=order, verbose=True, truncate=False)
+
+
+class Compute2D:
+    # A single run at 10**5 takes minutes
+    params = (SIZES[:3], ALPHABETS, ORDERS)
+    param_names = ("size", "alphabet", "order")
+    timeout = 600
+
+    def setup(self, size, alphabet, order):
+        self.seq_x = sequence(size, alphabet)
+        self.seq_y = sequence(size, alphabet, seed=size)
+
+    def time_compute(self, size, alphabet, order):
+        ETC.compute_2D(self.seq_x, self.seq_y, order=order, verbose=False)
+
+    def peakmem_compute(self, size, alphabet, order):
+        ETC.compute_2D(self.seq_x, self.seq_y, order=order, verbose=False)
+
+
+class LZC:
+    params = (SIZES[:4], ALPHABETS)
+    param_names = ("size", "alphabet")
+    timeout = 600
+
+    def setup(self, size, alphabet):
+        self.seq = sequence(size, alphabet)
+
+    def time_compute(self, size, alphabet):
+        ETC.LZC(self.seq)
+
+    def peakmem_compute(self, size, alphabet):
+        ETC.LZC(self.seq)
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for causality estimators on simulated coupled processes.
+
+@author: Pranay S. Yadav
+"""
+# Import calls
+import ETC
+from ETC.CCC.compute_CCC import compute as compute_CCC
+
+from .common import coupled_pair
+
+
+class CCC:
+    params = ((10 ** 3, 10 ** 4), (2, 4))
+    param_names = ("size", "partitions")
+    timeout = 600
+
+    def setup(self, size, partitions):
+        self.seq_x, self.seq_y = coupled_pair(size, partitions)
+
+    def time_compute(self, size, partitions):
+        compute_CCC(self.seq_x, self.seq_y, LEN_past=150, ADD_meas=15, STEP_size=20)
+
+    def peakmem_compute(self, size, partitions):
+        compute_CCC(self.seq_x, self.seq_y, LEN_past=150, ADD_meas=15, STEP_size=20)
+
+
+class CCM:
+    params = ((10 ** 2, 10 ** 3, 10 ** 4), (2, 4))
+    param_names = ("size", "partitions")
+    timeout = 600
+
+    def setup(self, size, partitions):
+        self.seq_x, self.seq_y = coupled_pair(size, partitions)
+
+    def time_causality(self, size, partitions):
+        ETC.CCM_causality(self.seq_x, self.seq_y)
+
+    def peakmem_causality(self, size, partitions):
+        ETC.CCM_causality(self.seq_x, self.seq_y)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for concurrent computation of ETC over worker counts.
+
+Memory is measured in the parent process only, so these benchmarks record time.
+
+@author: Pranay S. Yadav
+"""
+# Import calls
+import ETC
+from ETC.NSRWS.x1D import distance
+
+from .common import WORKERS, batch, sequence
+
+
+class PcomputeNumpy:
+    params = (WORKERS, (10 ** 3, 10 ** 4))
+    param_names = ("workers", "size")
+    timeout = 600
+
+    def setup(self, workers, size):
+        self.batch = batch(32, size, 4)
+
+    def time_rows(self, workers, size):
+        ETC.pcompute_numpy(self.batch, processes=workers)
+
+
+class PcomputeSingle:
+    params = (WORKERS, (100, 1000))
+    param_names = ("workers", "chunk")
+    timeout = 600
+
+    def setup(self, workers, chunk):
+        self.seq = sequence(10 ** 5, 4)
+
+    def time_chunks(self, workers, chunk):
+        ETC.pcompute_single(self.seq, chunk, offset=chunk, processes=workers)
+
+
+class DistanceMatrix:
+    params = (WORKERS,)
+    param_names = ("workers",)
+    timeout = 600
+
+    def setup(self, workers):
+        self.sequences = list(batch(16, 1000, 4))
+
+    def time_pairwise(self, workers):
+        distance.distance_matrix(self.sequences, n_jobs=workers)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for generating, recoding and summarizing sequences, and for imports.
+
+@author: Pranay S. Yadav
+"""
+# Import calls
+import subprocess
+import sys
+
+import numpy as np
+
+import ETC
+
+from .common import ALPHABETS, SEED, SIZES, sequence
+
+
+class Generate:
+    params = (SIZES, ALPHABETS)
+    param_names = ("size", "alphabet")
+
+    def time_sequence(self, size, alphabet):
+        sequence(size, alphabet)
+
+    def time_batch(self, size, alphabet):
+        ETC.generate(size=size, partitions=alphabet, seed=SEED, n=8)
+
+    def peakmem_batch(self, size, alphabet):
+        ETC.generate(size=size, partitions=alphabet, seed=SEED, n=8)
+
+
+class Entropy:
+    params = (SIZES, ALPHABETS)
+    param_names = ("size", "alphabet")
+
+    def setup(self, size, alphabet):
+        self.seq = sequence(size, alphabet)
+
+    def time_entropy(self, size, alphabet):
+        ETC.entropy(self.seq)
+
+
+class Partition:
+    params = (SIZES, ("uniform", "quantile", "ordinal"))
+    param_names = ("size", "method")
+
+    def setup(self, size, method):
+        self.x = np.random.default_rng(SEED).standard_normal(size)
+
+    def time_partition(self, size, method):
+        ETC.partition(self.x, 3, method=method)
+
+    def peakmem_partition(self, size, method):
+        ETC.partition(self.x, 3, method=method)
+
+
+class Import:
+    # Upper bound on the cumulative time taken by "import ETC", in microseconds
+    budget = 50_000
+
+    def timeraw_import(self):
+        return "import ETC"
+
+    def timeraw_import_compute(self):
+        return "import ETC; ETC.compute_1D([1, 2, 1, 2], verbose=False)"
+
+    def track_importtime(self):
+        done = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import ETC"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        # Last line of the import time report is the package itself
+        cumulative = int(done.stderr.strip().splitlines()[-1].split("|")[1])
+        assert cumulative < self.budget, f"ERROR: import ETC took {cumulative} us!"
+
+        return cumulative
+
+    track_importtime.unit = "microseconds"
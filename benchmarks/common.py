@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sweep values and seeded inputs shared by all benchmarks.
+
+@author: Pranay S. Yadav
+"""
+# Import calls
+import numpy as np
+
+import ETC
+from ETC.CCC.simulate_AR import coupled_AR
+
+# Seed for every generated input, so that results are comparable across commits
+SEED = 42
+
+# Sequence lengths, cut short per benchmark where a single run takes minutes
+SIZES = (10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)
+
+# Alphabet sizes
+ALPHABETS = (2, 4, 16)
+
+# Orders of NSRWS
+ORDERS = (2, 3)
+
+# Numbers of worker processes
+WORKERS = (1, 2, 4)
+
+
+def sequence(size, partitions, seed=SEED):
+    """
+    Generate a reproducible random symbolic sequence
+
+    Parameters
+    ----------
+    size : int
+        Length of sequence.
+    partitions : int
+        Size of alphabet.
+    seed : int, optional
+        Seed value. The default is SEED.
+
+    Returns
+    -------
+    array.array
+        Sequence of integers from 1 to partitions.
+
+    """
+    return ETC.generate(size=size, partitions=partitions, seed=seed)
+
+
+def batch(n, size, partitions, seed=SEED):
+    """
+    Generate a reproducible batch of random symbolic sequences
+
+    Parameters
+    ----------
+    n : int
+        Number of sequences.
+    size : int
+        Length of each sequence.
+    partitions : int
+        Size of alphabet.
+    seed : int, optional
+        Seed value. The default is SEED.
+
+    Returns
+    -------
+    np.ndarray
+        2D array of uint32 with one sequence per row.
+
+    """
+    return ETC.generate(size=size, partitions=partitions, seed=seed, n=n)
+
+
+def coupled_pair(size, partitions, seed=SEED):
+    """
+    Simulate a reproducible pair of coupled AR processes and bin them
+
+    Parameters
+    ----------
+    size : int
+        Length of each sequence.
+    partitions : int
+        Number of bins.
+    seed : int, optional
+        Seed value. The default is SEED.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        Binned dependent and independent processes, in that order, as uint32.
+
+    """
+    data = coupled_AR(length=size, seed=seed)
+    return tuple(
+        ETC.partition(np.asarray(data[name]), partitions, dtype="uint32")
+        for name in ("dependent", "independent")
+    )
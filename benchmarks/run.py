@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Run the benchmarks without asv, and compare results across commits.
+
+Every time_* method is timed over a few repeats after setup(), every peakmem_* method
+is measured for peak traced memory with tracemalloc, every timeraw_* method
+returns code that is timed in a fresh interpreter, and every track_* method returns
+the value to record itself, in the unit given by its unit attribute. Results are
+written as JSON together with the commit they were measured on.
+
+Usage:
+    python -m benchmarks.run --output before.json
+    python -m benchmarks.run --bench "Compute1D|LZC" --output after.json
+    python -m benchmarks.run --compare before.json after.json
+
+@author: Pranay S. Yadav
+"""
+# Import calls
+import argparse
+import importlib
+import inspect
+import json
+import pkgutil
+import platform
+import re
+import subprocess
+import sys
+import tracemalloc
+from datetime import datetime, timezone
+from itertools import product
+from pathlib import Path
+from time import perf_counter
+
+# Prefixes of benchmark methods and the unit of what they measure
+KINDS = {
+    "time_": "seconds",
+    "peakmem_": "bytes",
+    "timeraw_": "seconds",
+    "track_": "unit",
+}
+
+# Runs slower than this many seconds are not repeated
+SLOW = 1.0
+
+
+def _commit():
+    """
+    Identify the commit of the working tree being benchmarked
+
+    Returns
+    -------
+    dict
+        Hash of HEAD and whether the working tree has uncommitted changes, both None
+        if not inside a git repository.
+
+    """
+    root = Path(__file__).resolve().parent.parent
+    try:
+        sha = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=root, capture_output=True, text=True
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=root,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except OSError:
+        return {"commit": None, "dirty": None}
+
+    return {"commit": sha or None, "dirty": bool(status) if sha else None}
+
+
+def discover(pattern=None):
+    """
+    Find benchmark methods in all bench_* modules of this package
+
+    Parameters
+    ----------
+    pattern : str, optional
+        Regular expression searched for in "module.Class.method" names. The default
+        is None, selecting all benchmarks.
+
+    Yields
+    ------
+    tuple
+        Name, class and method name of each selected benchmark.
+
+    """
+    package = importlib.import_module(__package__ or "benchmarks")
+
+    for info in pkgutil.iter_modules(package.__path__):
+        if not info.name.startswith("bench_"):
+            continue
+        module = importlib.import_module(f"{package.__name__}.{info.name}")
+
+        for cls_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+
+            for method in sorted(vars(cls)):
+                if not method.startswith(tuple(KINDS)):
+                    continue
+                name = f"{info.name}.{cls_name}.{method}"
+                if pattern is None or re.search(pattern, name):
+                    yield name, cls, method
+
+
+def _combinations(cls):
+    """
+    Expand the parameter grid of a benchmark class
+
+    Parameters
+    ----------
+    cls : class
+        Benchmark class, optionally with params and param_names attributes.
+
+    Returns
+    -------
+    list of dict
+        One dict of parameter name to value per combination.
+
+    """
+    names = getattr(cls, "param_names", ())
+    if not names:
+        return [{}]
+
+    return [dict(zip(names, values)) for values in product(*cls.params)]
+
+
+def _measure(instance, method, params, repeat):
+    """
+    Measure a single benchmark method for one parameter combination
+
+    Parameters
+    ----------
+    instance : object
+        Benchmark class instance, already set up.
+    method : str
+        Name of the benchmark method.
+    params : dict
+        Parameter values, passed positionally in order.
+    repeat : int
+        Maximum number of repeats for timings.
+
+    Returns
+    -------
+    dict
+        Measured value (minimum over repeats for timings) and all raw samples.
+
+    """
+    func = getattr(instance, method)
+    args = tuple(params.values())
+
+    # Peak memory traced during a single call
+    if method.startswith("peakmem_"):
+        tracemalloc.start()
+        try:
+            func(*args)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return {"value": peak, "samples": [peak]}
+
+    # Value measured by the method itself
+    if method.startswith("track_"):
+        value = func(*args)
+        return {"value": value, "samples": [value]}
+
+    # Timing of returned code in a fresh interpreter, import included
+    if method.startswith("timeraw_"):
+        code = (
+            "from time import perf_counter as _t; _s = _t()\n"
+            f"{func(*args)}\n"
+            "print(_t() - _s)"
+        )
+        samples = []
+        for _ in range(repeat):
+            done = subprocess.run(
+                [sys.executable, "-c", code], capture_output=True, text=True, check=True
+            )
+            samples.append(float(done.stdout.split()[-1]))
+        return {"value": min(samples), "samples": samples}
+
+    # Wall-clock timing, repeated unless a single call is already slow
+    samples = []
+    for _ in range(repeat):
+        before = perf_counter()
+        func(*args)
+        samples.append(perf_counter() - before)
+        if samples[-1] > SLOW:
+            break
+
+    return {"value": min(samples), "samples": samples}
+
+
+def run(pattern=None, repeat=3, verbose=True):
+    """
+    Run selected benchmarks over their parameter grids
+
+    Parameters
+    ----------
+    pattern : str, optional
+        Regular expression for selecting benchmarks by name. The default is None.
+    repeat : int, optional
+        Maximum number of repeats for timings. The default is 3.
+    verbose : bool, optional
+        Whether to print each result as it is measured. The default is True.
+
+    Returns
+    -------
+    dict
+        Commit, environment and a list of results, one per benchmark & parameters.
+
+    """
+    from ETC.seq import cache, memo
+
+    # Results must not be served from either cache
+    cache.disable()
+    memo.disable()
+
+    import numpy
+
+    out = {
+        **_commit(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "results": [],
+    }
+
+    for name, cls, method in discover(pattern):
+        for params in _combinations(cls):
+            instance = cls()
+
+            # Setup may decline unsupported combinations, as in asv
+            try:
+                if hasattr(instance, "setup"):
+                    instance.setup(*params.values())
+            except NotImplementedError:
+                continue
+
+            result = _measure(instance, method, params, repeat)
+            if hasattr(instance, "teardown"):
+                instance.teardown(*params.values())
+
+            unit = next(KINDS[kind] for kind in KINDS if method.startswith(kind))
+            unit = getattr(getattr(cls, method), "unit", unit)
+            out["results"].append({"name": name, "params": params, "unit": unit, **result})
+
+            if verbose:
+                print(f"{name} {params}: {result['value']:.6g} {unit}", flush=True)
+
+    return out
+
+
+def compare(before, after, threshold=1.1):
+    """
+    Compare two sets of results matched by benchmark name and parameters
+
+    Parameters
+    ----------
+    before : dict
+        Results of a run on the baseline commit.
+    after : dict
+        Results of a run on the commit under test.
+    threshold : float, optional
+        Ratio of after to before beyond which a result is flagged as a regression.
+        The default is 1.1.
+
+    Returns
+    -------
+    list of dict
+        Name, parameters, both values and their ratio for every matched result.
+
+    """
+
+    def _key(result):
+        return result["name"], json.dumps(result["params"], sort_keys=True)
+
+    baseline = {_key(result): result for result in before["results"]}
+
+    rows = []
+    for result in after["results"]:
+        old = baseline.get(_key(result))
+        if old is None or not old["value"]:
+            continue
+        ratio = result["value"] / old["value"]
+        rows.append(
+            {
+                "name": result["name"],
+                "params": result["params"],
+                "before": old["value"],
+                "after": result["value"],
+                "ratio": ratio,
+                "regression": ratio > threshold,
+            }
+        )
+
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--bench", help="regular expression selecting benchmarks")
+    parser.add_argument("--repeat", type=int, default=3, help="repeats per timing")
+    parser.add_argument("--output", type=Path, help="write results to this JSON file")
+    parser.add_argument(
+        "--compare", nargs=2, type=Path, metavar=("BEFORE", "AFTER"),
+        help="compare two result files instead of running benchmarks",
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=1.1, help="ratio flagged as a regression"
+    )
+    args = parser.parse_args(argv)
+
+    # Compare previously recorded results, failing if anything regressed
+    if args.compare:
+        before, after = (json.loads(path.read_text()) for path in args.compare)
+        print(f"> {before['commit']} -> {after['commit']}")
+        rows = compare(before, after, args.threshold)
+        for row in rows:
+            flag = "!" if row["regression"] else " "
+            print(
+                f"{flag} {row['ratio']:6.2f}x  {row['name']} {row['params']}: "
+                f"{row['before']:.6g} -> {row['after']:.6g}"
+            )
+        return int(any(row["regression"] for row in rows))
+
+    out = run(args.bench, args.repeat)
+    if args.output:
+        args.output.write_text(json.dumps(out, indent=2))
+        print(f"> Results written to {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
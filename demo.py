@@ -155,6 +155,18 @@ print(out.get('NETC2D'))
 # View trajectory
 print(out.get('Trajectory'))
 
+# ---------------------------------------------
+# JOINT ETC ESTIMATION FOR SEVERAL SEQUENCES
+# ---------------------------------------------
+# Stack aligned sequences as rows, each column is then one joint symbol
+channels = np.random.randint(1, 3, size=[4, 1000])
+
+# Compute joint Effort To Compress
+out = ETC.compute_ND(channels, order=2)
+
+print(out)
+# {'ETCND': ..., 'NETCND': ...}
+
 # -----------------------------------------
 # CAUSALITY TESTING USING THE CCC FRAMEWORK
 # -----------------------------------------
@@ -13,9 +13,12 @@ import numpy
 setup(
     ext_modules=cythonize(
         [
+            "./ETC/NSRWS/common.pyx",
             "./ETC/NSRWS/x1D/core.pyx",
             "./ETC/NSRWS/x2D/core.pyx",
+            "./ETC/NSRWS/xND/core.pyx",
             "./ETC/seq/estimates.pyx",
+            "./ETC/seq/core.pyx",
             "./ETC/LZ76/core.pyx",
         ],
         annotate=False,
@@ -26,6 +29,6 @@ setup(
     version="1.3.5",
     author_email="mail@pranaysy.com",
     description="Compute the Effort-To-Compress (ETC) of a symbolic sequence",
-    packages=find_packages(),
+    packages=find_packages(exclude=("benchmarks",)),
     license="Apache License, Version 2.0",
 )